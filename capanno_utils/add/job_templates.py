@@ -0,0 +1,132 @@
+"""
+Make job file templates for many tools at once, e.g. for a batch of imported tools that don't have instances yet. By
+default each template is added as a new tool instance, as add_tool_instance does.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from capanno_utils.add.add_tools import add_tool_instance
+from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+from capanno_utils.content_maps import make_tools_map_dict
+from capanno_utils.helpers.file_management import dump_dict_to_yaml_output
+from capanno_utils.helpers.get_paths import get_tool_sources_from_metadata_path, get_tool_instances_dir_from_cwl_path, \
+    get_instance_path_from_instance_metadata_path
+from capanno_utils.repo_config import instance_file_pattern, main_tool_subtool_name
+
+
+def _has_instances(cwl_path):
+    instances_dir = get_tool_instances_dir_from_cwl_path(cwl_path)
+    if not instances_dir.exists():
+        return False
+    return any(instance_file_pattern.match(instance_file.name) for instance_file in instances_dir.iterdir())
+
+
+def get_template_cwl_paths(base_dir, cwl_statuses=('Released',), without_instances=False):
+    """
+    Get the cwl files of tools to make job templates for.
+    :param base_dir(Path): Root path of the content repo.
+    :param cwl_statuses(iterable): Only include tools whose cwlStatus is one of these.
+    :param without_instances(bool): Only include tools that don't have any instance files.
+    :return(list): Paths of cwl files.
+    """
+    base_dir = Path(base_dir)
+    cwl_paths = []
+    for identifier, values in make_tools_map_dict(base_dir=base_dir).items():
+        if values['type'] == 'parent' or values['cwlStatus'] not in cwl_statuses:
+            continue
+        cwl_path = get_tool_sources_from_metadata_path(base_dir / values['metadataPath'])['cwl']
+        if without_instances and _has_instances(cwl_path):
+            continue
+        cwl_paths.append(cwl_path)
+    return sorted(cwl_paths)
+
+
+def get_job_template_path(cwl_path, base_dir, output_dir):
+    """
+    Templates are stored in output_dir at the path of the cwl file relative to base_dir, with a .yaml suffix.
+    """
+    return Path(output_dir) / Path(cwl_path).relative_to(base_dir).with_suffix('.yaml')
+
+
+def write_job_template(cwl_path, template_path):
+    """
+    Render the job template of a cwl tool and write it to template_path if it is different from what is already there.
+    :return(dict): cwl, template, and status keys. status is 'written', 'unchanged', or 'failed'. Failures have a message.
+    """
+    result = {'cwl': str(cwl_path), 'template': str(template_path)}
+    try:
+        template_text = dump_dict_to_yaml_output(InputsSchema(cwl_path).make_template())
+        template_path = Path(template_path)
+        if template_path.exists() and template_path.read_text() == template_text:
+            result['status'] = 'unchanged'
+            return result
+        template_path.parent.mkdir(parents=True, exist_ok=True)
+        template_path.write_text(template_text)
+    except Exception as e:
+        result.update({'status': 'failed', 'message': f"{type(e).__name__}: {e}"})
+        logging.error(f"Could not make a job template for {cwl_path}. {result['message']}")
+        return result
+    result['status'] = 'written'
+    return result
+
+
+def get_tool_args_from_cwl_path(cwl_path, base_dir):
+    """
+    :return(tuple): tool name, tool version, and subtool name of a tool cwl file, as add_tool_instance takes them.
+    """
+    tool_name, tool_version, subtool_dir_name = Path(cwl_path).relative_to(base_dir).parts[1:4]
+    subtool_name = subtool_dir_name[len(tool_name) + 1:]  # Subtool directories are named tool_subtool.
+    return tool_name, tool_version, subtool_name or main_tool_subtool_name
+
+
+def add_job_template_instance(cwl_path, base_dir):
+    """
+    Add a new instance of the tool of cwl_path, with the same instance metadata and job file path as add_tool_instance,
+    and its job template as the job file. The template is made before any file is written, so a tool that fails to load
+    doesn't get an instance.
+    :return(dict): cwl, template, instanceMetadata, and status keys. status is 'written' or 'failed'. Failures have a message.
+    """
+    result = {'cwl': str(cwl_path)}
+    try:
+        template_text = dump_dict_to_yaml_output(InputsSchema(cwl_path).make_template())
+        tool_name, tool_version, subtool_name = get_tool_args_from_cwl_path(cwl_path, base_dir)
+        instance_metadata_path, _ = add_tool_instance(tool_name, tool_version, subtool_name, init_job_file=False,
+                                                      root_repo_path=base_dir)
+        template_path = get_instance_path_from_instance_metadata_path(instance_metadata_path)
+        template_path.write_text(template_text)
+    except Exception as e:
+        result.update({'status': 'failed', 'message': f"{type(e).__name__}: {e}"})
+        logging.error(f"Could not add a job template instance for {cwl_path}. {result['message']}")
+        return result
+    result.update({'template': str(template_path), 'instanceMetadata': str(instance_metadata_path), 'status': 'written'})
+    return result
+
+
+def make_job_templates(base_dir, output_dir=None, cwl_statuses=('Released',), without_instances=False, jobs=1):
+    """
+    Make job templates for every tool that matches the filters. Tools that fail to load are reported instead of stopping
+    the run.
+    :param base_dir(Path): Root path of the content repo.
+    :param output_dir(Path): Directory to write templates to instead of adding them as instances. Only templates whose
+        content changed are written.
+    :param cwl_statuses(iterable): Only include tools whose cwlStatus is one of these.
+    :param without_instances(bool): Only include tools that don't have any instance files. Always True if output_dir
+        isn't provided, so running again doesn't add a second instance to each tool.
+    :param jobs(int): Number of processes to render templates with. Rendered serially if jobs is 1.
+    :return(list): Result dicts from add_job_template_instance, or write_job_template if output_dir is provided, in order
+        of cwl path.
+    """
+    base_dir = Path(base_dir)
+    if output_dir is None:
+        cwl_paths = get_template_cwl_paths(base_dir, cwl_statuses=cwl_statuses, without_instances=True)
+        make_template, template_args = add_job_template_instance, repeat(base_dir, len(cwl_paths))
+    else:
+        cwl_paths = get_template_cwl_paths(base_dir, cwl_statuses=cwl_statuses, without_instances=without_instances)
+        make_template = write_job_template
+        template_args = [get_job_template_path(cwl_path, base_dir, output_dir) for cwl_path in cwl_paths]
+    if jobs and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(make_template, cwl_paths, template_args))
+    return [make_template(cwl_path, template_arg) for cwl_path, template_arg in zip(cwl_paths, template_args)]
@@ -11,6 +11,7 @@ from capanno_utils.add.custom_actions import keyvalueparse
 from capanno_utils.add.add_tools import add_tool, add_subtool, add_tool_instance
 from capanno_utils.add.add_scripts import add_script, add_common_script_metadata
 from capanno_utils.add.add_workflows import add_workflow
+from capanno_utils.add.job_templates import make_job_templates
 import logging
 
 logging.basicConfig(stream=sys.stderr)
@@ -61,6 +62,13 @@ def get_parser():
     addtoolinstance.add_argument('subtool_name', type=str, nargs='?', default=repo_config.main_tool_subtool_name,
                                  help="The subtool name for the instance.")
 
+    # job templates parser
+    addjobtemplates = subparsers.add_parser('job-templates', help='Make job file templates for every tool that matches the filters.')
+    addjobtemplates.add_argument('--cwl-status', nargs='+', default=['Released'], help="Only make templates for tools with one of these cwlStatus values. Defaults to Released.")
+    addjobtemplates.add_argument('--without-instances', action='store_true', help="Only make templates for tools that don't have any instances.")
+    addjobtemplates.add_argument('-o', '--output-dir', type=Path, help="Write templates to this directory instead of adding them as tool instances. Only templates whose content changed are written. By default, each tool that doesn't have instances gets a new instance with the template as its job file.")
+    addjobtemplates.add_argument('-j', '--jobs', type=int, default=1, help="Number of processes to make templates with. Defaults to 1.")
+
     # add_common_script_parser
     addscriptcommon = subparsers.add_parser('common-script', help='add script metadata that other scripts can inherit from')
     addscriptcommon.add_argument('group_name', help='The name of the group directory that the script will go into.')
@@ -110,6 +118,13 @@ def main(argsl=None):
         add_subtool(args.tool_name, args.version_name, args.subtool_name, update_featureList=args.update_featureList, init_cwl=args.init_cwl, init_wdl=args.init_wdl, init_sm=args.init_sm, init_nf=args.init_nf, root_repo_path=args.root_path, no_clobber=args.no_clobber)
     elif args.command == 'tool-instance':
         add_tool_instance(args.tool_name, args.version_name, args.subtool_name, root_repo_path=args.root_path)
+    elif args.command == 'job-templates':
+        results = make_job_templates(args.root_path, output_dir=args.output_dir, cwl_statuses=args.cwl_status,
+                                     without_instances=args.without_instances, jobs=args.jobs)
+        statuses = [result['status'] for result in results]
+        print(f"{statuses.count('written')} templates written, {statuses.count('unchanged')} unchanged, {statuses.count('failed')} failed.")
+        if 'failed' in statuses:
+            return 1
     elif args.command == 'common-script':
         add_common_script_metadata(args.group_name, args.project_name, args.script_version, args.filename, root_repo_path=args.root_path)
     elif args.command == 'script':
@@ -438,6 +438,8 @@ class CommandOutputParameterMixin:
 
 class WorkflowMixin:
 
+    get_schema_def_requirement = CommandLineToolMixin.get_schema_def_requirement
+
     def get_wf_inputs(self):
         wf_inputs = self.inputs
         inputs_dict = CommentedMap()
@@ -495,6 +497,10 @@ class WorkflowMixin:
 
 class InputParameterMixin:
 
+    # Workflow inputs have the same type field as CommandInputParameter.
+    _handle_str_input_type = CommandInputParameterMixin._handle_str_input_type
+    _handle_input_type_field = CommandInputParameterMixin._handle_input_type_field
+
     def to_dict_with_id_key(self):
         input_dict = CommentedMap()
         input_id = get_shortened_id(self.id)
@@ -0,0 +1,112 @@
+"""
+Load only the fields of a CommandLineTool or Workflow that inputs schemas and job templates are made from. Outputs,
+arguments, steps, hints, and the other fields are not loaded. The fields are loaded with the same generated loaders as
+common_workflow_language.load_document, so the loaded inputs are the same.
+"""
+
+from pathlib import Path
+from ruamel.yaml import YAML
+from ruamel.yaml.constructor import SafeConstructor
+from schema_salad.exceptions import ValidationException
+from schema_salad.sourceline import SourceLine, add_lc_filename
+from schema_salad.utils import yaml_no_ts
+from capanno_utils.classes.cwl import common_workflow_language as cwl
+
+_requirements_loader = cwl.idmap_requirements_union_of_None_type_or_array_of_union_of_InlineJavascriptRequirementLoader_or_SchemaDefRequirementLoader_or_LoadListingRequirementLoader_or_DockerRequirementLoader_or_SoftwareRequirementLoader_or_InitialWorkDirRequirementLoader_or_EnvVarRequirementLoader_or_ShellCommandRequirementLoader_or_ResourceRequirementLoader_or_WorkReuseLoader_or_NetworkAccessLoader_or_InplaceUpdateRequirementLoader_or_ToolTimeLimitLoader_or_SubworkflowFeatureRequirementLoader_or_ScatterFeatureRequirementLoader_or_MultipleInputFeatureRequirementLoader_or_StepInputExpressionRequirementLoader
+
+# class: (class, (field name, loader) in the order fromDoc of the class loads them, fields that aren't loaded).
+_inputs_field_loaders = {
+    'CommandLineTool': (cwl.CommandLineTool,
+                        (('inputs', cwl.idmap_inputs_array_of_CommandInputParameterLoader),
+                         ('requirements', _requirements_loader),
+                         ('cwlVersion', cwl.uri_union_of_None_type_or_CWLVersionLoader_False_True_None)),
+                        ('outputs',)),
+    'Workflow': (cwl.Workflow,
+                 (('inputs', cwl.idmap_inputs_array_of_WorkflowInputParameterLoader),
+                  ('requirements', _requirements_loader),
+                  ('cwlVersion', cwl.uri_union_of_None_type_or_CWLVersionLoader_False_True_None)),
+                 ('outputs', 'steps')),
+}
+
+
+class _NoTimestampConstructor(SafeConstructor):
+    pass
+
+
+_NoTimestampConstructor.add_constructor('tag:yaml.org,2002:timestamp', SafeConstructor.construct_yaml_str)  # As in yaml_no_ts.
+
+
+def _load_yaml_fast(text):
+    """
+    Parse with the C safe loader. Much faster than the round trip loader of yaml_no_ts, but there is no line and column
+    information for error messages.
+    """
+    yaml = YAML(typ='safe')
+    yaml.Constructor = _NoTimestampConstructor
+    return yaml.load(text)
+
+
+def _load_field(doc, field_name, field_loader, baseuri, loading_options, errors):
+    if field_name not in doc and field_name != 'inputs':  # inputs is the only required field.
+        return None
+    try:
+        return cwl.load_field(doc.get(field_name), field_loader, baseuri, loading_options)
+    except ValidationException as e:
+        errors.append(ValidationException(f"the `{field_name}` field is not valid because:",
+                                          SourceLine(doc, field_name, str), [e]))
+    return None
+
+
+def load_inputs_document_by_yaml(yaml, uri, loadingOptions=None):
+    """
+    Like common_workflow_language.load_document_by_yaml, but only the id, inputs, requirements, and cwlVersion of a
+    CommandLineTool or Workflow are loaded. Other fields of the returned object are None. Anything else, e.g. an
+    ExpressionTool or a $graph, is loaded completely.
+    :param yaml(CommentedMap): Document loaded with schema_salad.utils.yaml_no_ts.
+    :param uri(str): uri of the document.
+    :return(CommandLineTool|Workflow):
+    """
+    if not hasattr(yaml, 'get') or yaml.get('class') not in _inputs_field_loaders or '$graph' in yaml:
+        return cwl.load_document_by_yaml(yaml, uri, loadingOptions)
+    process_class, field_loaders, unloaded_fields = _inputs_field_loaders[yaml['class']]
+    add_lc_filename(yaml, uri)
+    if loadingOptions is None:
+        loadingOptions = cwl.LoadingOptions(fileuri=uri)
+    loadingOptions.idx[uri] = yaml
+    # Same steps as common_workflow_language._document_load and the start of CommandLineTool.fromDoc and Workflow.fromDoc.
+    doc = yaml
+    if '$namespaces' in doc or '$schemas' in doc:
+        loadingOptions = cwl.LoadingOptions(copyfrom=loadingOptions, namespaces=doc.get('$namespaces', None),
+                                            schemas=doc.get('$schemas', None))
+    baseuri = doc.get('$base', uri)
+    errors = []
+    tool_id = _load_field(doc, 'id', cwl.uri_union_of_None_type_or_strtype_True_False_None, baseuri, loadingOptions, errors)
+    if tool_id is None:
+        tool_id = baseuri
+    else:
+        baseuri = tool_id
+    fields = {field_name: _load_field(doc, field_name, field_loader, baseuri, loadingOptions, errors) for
+              field_name, field_loader in field_loaders}
+    if errors:
+        raise ValidationException(f"Trying '{yaml['class']}'", None, errors)
+    fields.update({field_name: None for field_name in unloaded_fields})
+    return process_class(id=tool_id, loadingOptions=loadingOptions, **fields)
+
+
+def load_inputs_document(cwl_path):
+    """
+    Load the inputs of the CommandLineTool or Workflow in cwl_path. See load_inputs_document_by_yaml. The file is parsed
+    with the C loader first, and parsed again with line numbers only if it is something else or it has errors.
+    :param cwl_path(str, Path):
+    :return(CommandLineTool|Workflow):
+    """
+    cwl_path = Path(cwl_path).absolute()
+    uri = cwl.file_uri(str(cwl_path))
+    text = cwl_path.read_text(encoding='utf-8')
+    try:
+        yaml = _load_yaml_fast(text)
+        if isinstance(yaml, dict) and yaml.get('class') in _inputs_field_loaders:
+            return load_inputs_document_by_yaml(yaml, uri)
+    except Exception:
+        pass  # Report the error with line numbers.
+    return load_inputs_document_by_yaml(yaml_no_ts().load(text), uri)
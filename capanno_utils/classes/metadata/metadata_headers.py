@@ -0,0 +1,151 @@
+"""
+Read only the keys of metadata files that content maps are made from. The metadata classes load parent metadata, make
+Person, Publication, and Keyword objects, and read description.md, none of which is in a map. Headers have the values
+the metadata classes would have for these keys. A file that leaves a key for the metadata class to fill in, e.g. an
+identifier that is made from the name and version, is loaded with the metadata class instead.
+"""
+
+import re
+from pathlib import Path
+from ruamel.yaml import YAML
+from capanno_utils.classes.metadata.script_metadata import ScriptMetadata
+from capanno_utils.classes.metadata.tool_metadata import ParentToolMetadata, SubtoolMetadata
+from capanno_utils.classes.metadata.workflow_metadata import WorkflowMetadata
+from capanno_utils.repo_config import parent_tool_identifier_pattern, subtool_identifier_pattern, \
+    script_identifier_pattern, worklfow_identifier_prefix
+
+allowed_statuses = ('Incomplete', 'Draft', 'Released')
+allowed_workflow_languages = ('cwl', 'wdl', 'nextflow', 'snakemake')
+
+# As WorkflowMetadata._check_identifier, which allows a longer version hash than repo_config.workflow_identifier_pattern.
+_workflow_identifier_pattern = re.compile(rf'{worklfow_identifier_prefix}_[0-9a-f]{{6}}\.[0-9a-f]{{2,3}}$')
+
+# key: default, for the keys of each header. Defaults are the same as _init_metadata of the metadata class.
+_parent_tool_status_defaults = (('metadataStatus', 'Incomplete'),)
+_subtool_status_defaults = (('metadataStatus', 'Incomplete'), ('cwlStatus', 'Incomplete'),
+                            ('nextflowStatus', 'Incomplete'), ('snakemakeStatus', 'Incomplete'),
+                            ('wdlStatus', 'Incomplete'))
+_script_status_defaults = (('metadataStatus', 'Incomplete'), ('cwlStatus', 'Incomplete'))
+_workflow_status_defaults = (('metadataStatus', 'Incomplete'), ('workflowStatus', 'Draft'))
+
+
+def _load_metadata_dict(metadata_path):
+    """
+    Parse with the C safe loader. Same values as ruamel.yaml.safe_load, which the metadata classes use, but faster.
+    """
+    yaml = YAML(typ='safe')
+    with Path(metadata_path).open('r') as file:
+        return yaml.load(file)
+
+
+def _get_version_name(metadata_dict):
+    software_version = metadata_dict.get('softwareVersion')
+    if isinstance(software_version, dict) and software_version.get('versionName'):
+        return str(software_version['versionName'])  # As SoftwareVersion.versionName
+    return None
+
+
+def _get_statuses(metadata_dict, status_defaults, metadata_path, strict):
+    statuses = {}
+    for key, default in status_defaults:
+        status = metadata_dict.get(key, default)
+        if strict and status not in allowed_statuses:
+            raise ValueError(f"{key} must be one of {allowed_statuses}, not {status} in {metadata_path}")
+        statuses[key] = status
+    return statuses
+
+
+def _check_identifier(identifier, identifier_pattern, metadata_path):
+    if not identifier_pattern.match(identifier):
+        raise ValueError(f"Identifier not formatted correctly: {identifier} in {metadata_path}")
+    return identifier
+
+
+def load_parent_tool_header(metadata_path, strict=True):
+    """
+    :param metadata_path(Path): Path of a common-metadata.yaml file.
+    :param strict(bool): Check the format of the identifier and the metadataStatus.
+    :return(dict): identifier, name, metadataStatus, and versionName.
+    """
+    metadata_dict = _load_metadata_dict(metadata_path)
+    version_name = _get_version_name(metadata_dict)
+    if not (metadata_dict.get('identifier') and metadata_dict.get('name') and version_name):
+        parent_metadata = ParentToolMetadata.load_from_file(metadata_path, check_index=False)
+        return {'identifier': parent_metadata.identifier, 'name': parent_metadata.name,
+                'metadataStatus': parent_metadata.metadataStatus,
+                'versionName': parent_metadata.softwareVersion.versionName}
+    if strict:
+        _check_identifier(metadata_dict['identifier'], parent_tool_identifier_pattern, metadata_path)
+    header = {'identifier': metadata_dict['identifier'], 'name': metadata_dict['name']}
+    header.update(_get_statuses(metadata_dict, _parent_tool_status_defaults, metadata_path, strict))
+    header['versionName'] = version_name
+    return header
+
+
+def load_subtool_header(metadata_path, strict=True):
+    """
+    Parent metadata isn't loaded unless the subtool doesn't have an identifier.
+    :param metadata_path(Path): Path of a subtool metadata file.
+    :param strict(bool): Check the format of the identifier and the statuses.
+    :return(dict): identifier, name, and metadataStatus, cwlStatus, nextflowStatus, snakemakeStatus, and wdlStatus.
+    """
+    metadata_dict = _load_metadata_dict(metadata_path)
+    if not (metadata_dict.get('identifier') and metadata_dict.get('name')):
+        subtool_metadata = SubtoolMetadata.load_from_file(metadata_path, check_index=False)
+        header = {'identifier': subtool_metadata.identifier, 'name': subtool_metadata.name}
+        header.update({key: getattr(subtool_metadata, key) for key, _ in _subtool_status_defaults})
+        return header
+    if strict:
+        _check_identifier(metadata_dict['identifier'], subtool_identifier_pattern, metadata_path)
+    header = {'identifier': metadata_dict['identifier'], 'name': metadata_dict['name']}
+    header.update(_get_statuses(metadata_dict, _subtool_status_defaults, metadata_path, strict))
+    return header
+
+
+def load_script_header(metadata_path, strict=True):
+    """
+    Common script metadata isn't loaded. None of the header keys are inherited from it.
+    :param metadata_path(Path): Path of a script metadata file.
+    :param strict(bool): Check the format of the identifier and the statuses.
+    :return(dict): identifier, name, versionName, metadataStatus, and cwlStatus.
+    """
+    metadata_dict = _load_metadata_dict(metadata_path)
+    version_name = _get_version_name(metadata_dict)
+    if not (metadata_dict.get('identifier') and metadata_dict.get('name') and version_name):
+        script_metadata = ScriptMetadata.load_from_file(metadata_path)
+        header = {'identifier': script_metadata.identifier, 'name': script_metadata.name,
+                  'versionName': script_metadata.softwareVersion.versionName}
+        header.update({key: getattr(script_metadata, key) for key, _ in _script_status_defaults})
+        return header
+    if strict:
+        _check_identifier(metadata_dict['identifier'], script_identifier_pattern, metadata_path)
+    header = {'identifier': metadata_dict['identifier'], 'name': metadata_dict['name'], 'versionName': version_name}
+    header.update(_get_statuses(metadata_dict, _script_status_defaults, metadata_path, strict))
+    return header
+
+
+def load_workflow_header(metadata_path, strict=True):
+    """
+    :param metadata_path(Path): Path of a workflow metadata file.
+    :param strict(bool): Check the format of the identifier, the statuses, and the workflowLanguage.
+    :return(dict): identifier, name, versionName, metadataStatus, workflowStatus, workflowLanguage, and workflowFile.
+    """
+    metadata_dict = _load_metadata_dict(metadata_path)
+    version_name = _get_version_name(metadata_dict)
+    if not (metadata_dict.get('identifier') and metadata_dict.get('name') and version_name):
+        workflow_metadata = WorkflowMetadata.load_from_file(metadata_path)
+        header = {'identifier': workflow_metadata.identifier, 'name': workflow_metadata.name,
+                  'versionName': workflow_metadata.softwareVersion.versionName,
+                  'workflowLanguage': workflow_metadata.workflowLanguage,
+                  'workflowFile': workflow_metadata.workflowFile}
+        header.update({key: getattr(workflow_metadata, key) for key, _ in _workflow_status_defaults})
+        return header
+    workflow_language = metadata_dict.get('workflowLanguage', 'wdl')
+    if strict:
+        _check_identifier(metadata_dict['identifier'], _workflow_identifier_pattern, metadata_path)
+        if workflow_language not in allowed_workflow_languages:
+            raise ValueError(f"workflowLanguage must be one of {allowed_workflow_languages}, not {workflow_language} in {metadata_path}")
+    header = {'identifier': metadata_dict['identifier'], 'name': metadata_dict['name'], 'versionName': version_name,
+              'workflowLanguage': workflow_language, 'workflowFile': metadata_dict.get('workflowFile')}
+    header.update(_get_statuses(metadata_dict, _workflow_status_defaults, metadata_path, strict))
+    return header
@@ -8,6 +8,8 @@ from ruamel.yaml import safe_load
 from capanno_utils.repo_config import *
 from capanno_utils.exceptions import InIndexError, NotInIndexError
 from ...helpers.get_paths import *
+from ...helpers.parent_metadata_cache import get_parent_metadata_cache
+from ...helpers.profiling import profile_stage
 from ...classes.metadata.metadata_base import MetadataBase
 from ...classes.metadata.shared_properties import CodeRepository, Person, WebSite, Keyword, IOObjectItem, IOArrayItem
 from ...helpers.get_metadata_from_biotools import make_tool_metadata_kwargs_from_biotools
@@ -164,7 +166,7 @@ class ParentToolMetadata(CommonPropsMixin, SoftwarePropsMixin, ToolMetadataBase)
         :return:
         """
         file_path = Path(file_path)
-        with file_path.open('r') as file:
+        with profile_stage('metadata.yaml', file_path), file_path.open('r') as file:
             file_dict = safe_load(file)
         file_dict.update(kwargs)
         file_dict['check_index'] = kwargs.get('check_index', True)  # If not provided in kwargs. Assume metadata loaded from a file is already in the index.
@@ -176,7 +178,9 @@ class ParentToolMetadata(CommonPropsMixin, SoftwarePropsMixin, ToolMetadataBase)
                 file_dict['root_repo_path'] = Path(*file_path.parts[:-5])  # This should be the root_repo_path relative to a parent metadata file.
         if not file_dict.get('description'):  # No description specified. Check for it in file.
             file_dict['description'] = get_description_from_file(file_path)
-        return cls(**file_dict, ignore_empties=ignore_empties)
+        with profile_stage('metadata.ParentToolMetadata', file_path):
+            parent_metadata = cls(**file_dict, ignore_empties=ignore_empties)
+        return parent_metadata
 
     @classmethod
     def create_from_biotools(cls, biotools_id, version_name, subtools, **kwargs):
@@ -277,7 +281,7 @@ class SubtoolMetadata(CommonPropsMixin, WorkflowLanguageStatusMixin, ToolMetadat
         The Subtool populates it's metadata from ParentMetadata
         """
         file_path = Path(file_path)
-        with file_path.open('r') as file:
+        with profile_stage('metadata.yaml', file_path), file_path.open('r') as file:
             file_dict = safe_load(file)
         file_dict.update(kwargs)
         file_dict['parentMetadata'] = kwargs.get('parentMetadata', SubtoolMetadata._init_metadata()['parentMetadata'])  # This needs to be set when initializing. If not specified, set to default.
@@ -304,10 +308,20 @@ class SubtoolMetadata(CommonPropsMixin, WorkflowLanguageStatusMixin, ToolMetadat
         dir_name = subtool_metadata_file_path.parent
         full_path = dir_name / self.parentMetadata
         full_path = full_path.resolve()
-        with full_path.open('r') as f:
-            parent_metadata_dict = safe_load(f)
-        parent_metadata_dict['root_repo_path'] = root_repo_path
-        self._parentMetadata = ParentToolMetadata(**parent_metadata_dict, ignore_empties=ignore_empties, check_index=check_index_parent, _in_index=parent_in_index)
+
+        def load_parent(parent_path):
+            with profile_stage('metadata.yaml', parent_path), parent_path.open('r') as f:
+                parent_metadata_dict = safe_load(f)
+            parent_metadata_dict['root_repo_path'] = root_repo_path
+            with profile_stage('metadata.ParentToolMetadata', parent_path):
+                return ParentToolMetadata(**parent_metadata_dict, ignore_empties=ignore_empties, check_index=check_index_parent, _in_index=parent_in_index)
+
+        parent_metadata_cache = get_parent_metadata_cache()
+        if parent_metadata_cache:  # Set with helpers.parent_metadata_cache.use_parent_metadata_cache.
+            load_options = (str(root_repo_path), ignore_empties, check_index_parent, parent_in_index)
+            self._parentMetadata = parent_metadata_cache.get(full_path, load_parent, options=load_options)
+        else:
+            self._parentMetadata = load_parent(full_path)
 
     def _load_attrs_from_parent(self):
         # initialize everything from parent. Will be overwritten anything supplied in kwargs. Doesn't do much anymore.
@@ -0,0 +1,179 @@
+"""
+Validate cwl job documents with plain python functions compiled from the input types of a tool, without resolving the
+document with schema-salad or building avro schemas.
+
+The checks follow schema_salad.validate.validate_ex so that a document that passes here also passes schema-salad. Types
+that aren't covered raise UnsupportedType when compiling, and documents that fail here should be validated again with
+schema-salad, which decides whether they are invalid and explains why.
+"""
+
+from collections.abc import MutableMapping, MutableSequence
+from schema_salad.schema import avro_field_name
+from schema_salad.utils import yaml_no_ts
+
+INT_MIN_VALUE = -(1 << 31)
+INT_MAX_VALUE = (1 << 31) - 1
+LONG_MIN_VALUE = -(1 << 63)
+LONG_MAX_VALUE = (1 << 63) - 1
+
+type_dict_keys = {'type', 'name', 'items', 'symbols', 'fields', 'label', 'doc', 'inputBinding'}  # Keys that don't change validation.
+
+
+class UnsupportedType(Exception):
+    """
+    Raised when an input type can't be compiled to a native validator.
+    """
+
+
+def _is_null(value):
+    return value is None
+
+
+def _is_boolean(value):
+    return isinstance(value, bool)
+
+
+def _is_string(value):
+    return isinstance(value, (str, bytes))
+
+
+def _is_int(value):
+    return isinstance(value, int) and INT_MIN_VALUE <= value <= INT_MAX_VALUE
+
+
+def _is_long(value):
+    return isinstance(value, int) and LONG_MIN_VALUE <= value <= LONG_MAX_VALUE
+
+
+def _is_float(value):
+    return isinstance(value, (int, float))
+
+
+def _check_field_name(field_name):
+    if not isinstance(field_name, str) or not field_name or ':' in field_name or field_name[0] in ('@', '$'):
+        raise UnsupportedType(f"Field name {field_name!r} may be expanded by schema-salad.")
+    return field_name
+
+
+def make_record_validator(field_validators, class_name=None):
+    """
+    :param field_validators(dict): field name: validator. Missing fields are validated as None.
+    :param class_name(str): Required value of the class field, for File and Directory.
+    """
+    def validate_record(value):
+        if not isinstance(value, MutableMapping):
+            return False
+        if class_name is not None and value.get('class') != class_name:
+            return False
+        for key in value:
+            if key not in field_validators and not (class_name is not None and key == 'class'):
+                return False  # schema-salad is strict about unknown fields.
+        for field_name, validate_field in field_validators.items():
+            if not validate_field(value.get(field_name)):
+                return False
+        return True
+
+    return validate_record
+
+
+def make_array_validator(validate_item):
+    def validate_array(value):
+        return isinstance(value, MutableSequence) and all(validate_item(item) for item in value)
+
+    return validate_array
+
+
+def make_union_validator(validators):
+    def validate_union(value):
+        return any(validate(value) for validate in validators)
+
+    return validate_union
+
+
+def make_enum_validator(symbols):
+    symbols = frozenset(symbols)
+
+    def validate_enum(value):
+        return isinstance(value, str) and value in symbols
+
+    return validate_enum
+
+
+def _make_file_and_directory_validators():
+    optional_string = make_union_validator([_is_null, _is_string])
+    validators = {}
+
+    def validate_file_or_directory(value):
+        return validators['File'](value) or validators['Directory'](value)
+
+    optional_listing = make_union_validator([_is_null, make_array_validator(validate_file_or_directory)])
+    file_fields = {field_name: optional_string for field_name in
+                   ('location', 'path', 'basename', 'dirname', 'nameroot', 'nameext', 'checksum', 'format', 'contents')}
+    file_fields['size'] = make_union_validator([_is_null, _is_long])
+    file_fields['secondaryFiles'] = optional_listing
+    validators['File'] = make_record_validator(file_fields, class_name='File')
+    directory_fields = {field_name: optional_string for field_name in ('location', 'path', 'basename')}
+    directory_fields['listing'] = optional_listing
+    validators['Directory'] = make_record_validator(directory_fields, class_name='Directory')
+    return validators
+
+
+primitive_validators = {'null': _is_null, 'boolean': _is_boolean, 'string': _is_string, 'int': _is_int,
+                        'long': _is_long, 'float': _is_float, 'double': _is_float, **_make_file_and_directory_validators()}
+
+
+def compile_type(input_type):
+    """
+    Make a validator for an input type as returned by CommandInputParameterMixin._handle_input_type_field.
+    :param input_type(str, list, dict): cwl type name, union of types, or array, enum, or record type.
+    :return(function): Takes a value from a job document and returns True if it is valid.
+    """
+    if isinstance(input_type, str):
+        if input_type not in primitive_validators:
+            raise UnsupportedType(f"Type {input_type!r} is not supported.")
+        return primitive_validators[input_type]
+    if isinstance(input_type, list):
+        return make_union_validator([compile_type(member_type) for member_type in input_type])
+    if not isinstance(input_type, dict) or not set(input_type) <= type_dict_keys:
+        raise UnsupportedType(f"Type {input_type!r} is not supported.")
+    type_name = input_type.get('type')
+    if type_name == 'array':
+        return make_array_validator(compile_type(input_type['items']))
+    if type_name == 'enum':
+        return make_enum_validator(avro_field_name(symbol) for symbol in input_type['symbols'])
+    if type_name == 'record':
+        fields = input_type.get('fields') or []
+        if not isinstance(fields, list):
+            raise UnsupportedType(f"Record fields {fields!r} are not supported.")
+        field_validators = {}
+        for field in fields:
+            if not isinstance(field, dict) or not set(field) <= type_dict_keys:
+                raise UnsupportedType(f"Record field {field!r} is not supported.")
+            field_validators[_check_field_name(avro_field_name(field['name']))] = compile_type(field['type'])
+        return make_record_validator(field_validators)
+    raise UnsupportedType(f"Type {input_type!r} is not supported.")
+
+
+class NativeInputsValidator:
+    """
+    Validates job documents against the inputs of a tool.
+    """
+
+    def __init__(self, inputs_fields):
+        """
+        :param inputs_fields(dict): input name: {'type': input type}, as in the InputsField record of an inputs schema.
+        """
+        self.validate = make_record_validator({_check_field_name(input_name): compile_type(input_field['type']) for
+                                               input_name, input_field in inputs_fields.items()})
+
+    def is_valid(self, job_document):
+        """
+        :param job_document(dict): Job document loaded from YAML.
+        :return(bool): True if the document is valid. Documents that aren't might still be valid to schema-salad.
+        """
+        return self.validate(job_document)
+
+    def is_valid_file(self, document_path):
+        with open(document_path, encoding='utf-8') as document_file:
+            job_document = yaml_no_ts().load(document_file)  # Same YAML loader as schema-salad, so values have the same types.
+        return self.is_valid(job_document)
@@ -1,15 +1,21 @@
-import tempfile
+import json
+import logging
+import threading
 from pathlib import Path
-from urllib.parse import urlparse
 from copy import deepcopy
 from ruamel.yaml.comments import CommentedMap
-from schema_salad.ref_resolver import file_uri, Loader
+from schema_salad.fetcher import DefaultFetcher
+from schema_salad.ref_resolver import Loader
+from schema_salad.sourceline import cmap
 from schema_salad.jsonld_context import salad_to_jsonld_context
 from schema_salad.schema import get_metaschema, validate_doc, collect_namespaces, make_avro, make_avro_schema_from_avro
 from capanno_utils.classes.cwl.common_workflow_language import load_document
+from capanno_utils.classes.cwl.partial_load import load_inputs_document
+from capanno_utils.classes.schema_salad.native_validator import NativeInputsValidator, UnsupportedType
 from capanno_utils.helpers.string_tools import get_shortened_id
 from capanno_utils.helpers.dict_tools import get_dict_from_list
 from capanno_utils.helpers.file_management import dump_dict_to_yaml_output
+from capanno_utils.helpers.profiling import profile_stage
 
 
 class SaladSchemaBase:
@@ -140,6 +146,86 @@ class SaladSchemaBase:
         pass
 
 
+in_memory_base_uri = 'file:///capanno-inputs-schema/'  # Documents under this uri are only in memory and never read from disk.
+metaschema_base_uri = f"{in_memory_base_uri}metaschema_base.yml"
+inputs_schema_uri = f"{in_memory_base_uri}inputs_schema.yml"
+
+
+class InMemoryFetcher(DefaultFetcher):
+    """
+    Fetcher that serves the metaschema base from memory so inputs schemas can import it without a file. Everything else
+    is fetched as usual.
+    """
+    documents = {metaschema_base_uri: SaladSchemaBase.metaschema_base}
+
+    def fetch_text(self, url, content_types=None):
+        if url in self.documents:
+            return json.dumps(self.documents[url])  # JSON is YAML, and much faster to dump than YAML.
+        return super().fetch_text(url, content_types)
+
+    def check_exists(self, url):
+        return url in self.documents or super().check_exists(url)
+
+
+class CompiledInputsSchema:
+    """
+    An inputs schema that has been validated against the metaschema and made into avro names, so that any number of job
+    documents can be validated against it without repeating those steps. Adapted from schema_salad main().
+    """
+
+    def __init__(self, schema_dict):
+        """
+        :param schema_dict(dict): Inputs schema made by InputsSchema._make_inputs_schema_dict. It is resolved in memory.
+        """
+        metaschema_names, metaschema_doc, metaschema_loader = get_metaschema()
+        schema_loader = Loader(metaschema_loader.ctx, fetcher_constructor=InMemoryFetcher)  # Don't add the schema to the shared metaschema loader.
+        schema_raw_doc = cmap(schema_dict, fn=inputs_schema_uri)
+
+        schema_doc, schema_metadata = schema_loader.resolve_all(schema_raw_doc, inputs_schema_uri)
+
+        # Validate schema against metaschema
+        validate_doc(metaschema_names, schema_doc, schema_loader, True)
+
+        # Get the json-ld context and RDFS representation from the schema
+        metactx = collect_namespaces(schema_metadata)
+        if "$base" in schema_metadata:
+            metactx["@base"] = schema_metadata["$base"]
+
+        (schema_ctx, rdfs) = salad_to_jsonld_context(
+            schema_doc, metactx)
+
+        # Create the loader that will be used to load the target documents.
+        self.document_loader = Loader(schema_ctx, skip_schemas=False)
+
+        # Make the Avro validation that will be used to validate the target documents.
+        avsc_obj = make_avro(schema_doc, self.document_loader)
+        self.avsc_names = make_avro_schema_from_avro(avsc_obj)
+        self._lock = threading.Lock()  # document_loader keeps state while a document is validated.
+
+    def validate(self, document_path):
+        """
+        Validate a job document. Raises a ValidationException if it is not valid.
+        :param document_path(str, Path):
+        """
+        strict_foreign_properties = False
+        strict = True
+        document_loader = self.document_loader
+        with self._lock:
+            keys_before = set(document_loader.idx)
+            try:
+                # Load target document and resolve refs
+                uri = str(document_path)
+                document, doc_metadata = document_loader.resolve_ref(uri, strict_foreign_properties=strict_foreign_properties,
+                                                                     checklinks=False)  # This is what's getting us around file link checking.
+
+                validate_doc(self.avsc_names, document, document_loader, strict=strict,
+                             strict_foreign_properties=strict_foreign_properties)
+            finally:
+                for key in set(document_loader.idx) - keys_before:  # Read documents again if they are validated again.
+                    del document_loader.idx[key]
+        return
+
+
 class InputsSchema:
     template_dict = {'$base': 'https://w3id.org/cwl/cwl#',
                      '$namespaces': {'cwl': 'https://w3id.org/cwl/cwl#',
@@ -212,112 +298,144 @@ class InputsSchema:
                      }
 
     def __init__(self, cwl_doc):
+        """
+        :param cwl_doc(str, Path, CommandLineTool, Workflow): Path or url of a cwl tool or workflow, or the loaded
+            document. Only the inputs and requirements of documents in local files are loaded.
+        """
+        self._compiled_schema = None
+        self._native_validator = None
+        self._native_validator_compiled = False
+        self._inputs_fields = None
         if isinstance(cwl_doc, (str, Path)):
             self.cwl_path = cwl_doc
-            cwl_document = load_document(str(self.cwl_path))
-        else:  # assume cwl_doc is CommandLineTool object.
-            cwl_document = cwl_doc
+            self._load_cwl_document()
+        else:  # assume cwl_doc is CommandLineTool or Workflow object.
+            self.cwl_path = None
+            self._cwl_inputs = cwl_doc.inputs
+            self._cwl_schema_def_requirement = cwl_doc.get_schema_def_requirement()
+
+    @classmethod
+    def from_inputs_fields(cls, inputs_fields, cwl_path=None):
+        """
+        Make an InputsSchema from the inputs_fields of another one, without loading the tool. The tool is loaded from
+        cwl_path the first time cwl_inputs or cwl_schema_def_requirement are needed, e.g. to make a template.
+        :param inputs_fields(dict): As returned by InputsSchema.inputs_fields.
+        :param cwl_path(Path): Path of the tool the fields were made from.
+        """
+        inputs_schema = cls.__new__(cls)
+        inputs_schema.cwl_path = cwl_path
+        inputs_schema._compiled_schema = None
+        inputs_schema._native_validator = None
+        inputs_schema._native_validator_compiled = False
+        inputs_schema._inputs_fields = inputs_fields
+        inputs_schema._cwl_inputs = None
+        inputs_schema._cwl_schema_def_requirement = None
+        return inputs_schema
+
+    @property
+    def inputs_fields(self):
+        """
+        :return(dict): input name: {'type': input type} for each input of the tool.
+        """
+        if self._inputs_fields is None:
+            self._inputs_fields = self._make_inputs_fields()
+        return self._inputs_fields
+
+    def _load_cwl_document(self):
+        """
+        Load the inputs and requirements of the document at cwl_path. Deferred for schemas made with from_inputs_fields.
+        """
+        if self.cwl_path is None:
+            raise ValueError("InputsSchema was made from inputs fields without a cwl_path, so it has no cwl inputs.")
+        with profile_stage('inputs.load_document', self.cwl_path):
+            if '://' in str(self.cwl_path):
+                cwl_document = load_document(str(self.cwl_path))
+            else:
+                cwl_document = load_inputs_document(self.cwl_path)
         self._cwl_inputs = cwl_document.inputs
         self._cwl_schema_def_requirement = cwl_document.get_schema_def_requirement()
+        return
 
     @property
     def cwl_inputs(self):
+        if self._cwl_inputs is None:
+            self._load_cwl_document()
         return self._cwl_inputs
 
     @property
     def cwl_schema_def_requirement(self):
-        return self._cwl_schema_def_requirement # set in __init__
+        if self._cwl_inputs is None:  # Set together with _cwl_inputs, and may be None after loading.
+            self._load_cwl_document()
+        return self._cwl_schema_def_requirement
 
-    def validate_inputs(self, document_path):
+    @property
+    def compiled_schema(self):
         """
+        Schema to validate job documents with. Made the first time it is needed and reused for every document.
+        :return(CompiledInputsSchema):
+        """
+        if self._compiled_schema is None:
+            with profile_stage('inputs.make_schema', self.cwl_path):
+                schema_dict = self._make_inputs_schema_dict()
+                import_dict, import_index = get_dict_from_list(schema_dict['$graph'], '$import', 'null')
+                schema_dict['$graph'][import_index] = {'$import': metaschema_base_uri}
+            with profile_stage('inputs.compile_schema', self.cwl_path):
+                self._compiled_schema = CompiledInputsSchema(schema_dict)
+        return self._compiled_schema
+
+    @property
+    def native_validator(self):
+        """
+        Validator for documents whose inputs only use types that NativeInputsValidator covers.
+        :return(NativeInputsValidator|None): None if some input type isn't covered.
+        """
+        if not self._native_validator_compiled:
+            self._native_validator_compiled = True
+            try:
+                with profile_stage('inputs.compile_native', self.cwl_path):
+                    self._native_validator = NativeInputsValidator(self.inputs_fields)
+            except UnsupportedType as e:
+                logging.debug(f"Validating inputs of {self.cwl_path} with schema-salad. {e}")
+        return self._native_validator
 
+    def validate_inputs(self, document_path):
+        """
+        Validate a job document. Documents are checked with the native validator first if there is one. They are only
+        validated with schema-salad if they don't pass it, so schema-salad decides which documents are invalid and why.
         :param document_path:
         :return:
         """
-        with tempfile.NamedTemporaryFile(prefix='metaschema_base', suffix='.yml') as tmp_meta_base:
-            dump_dict_to_yaml_output(SaladSchemaBase.metaschema_base, tmp_meta_base.name)  # Convenient to put it in tmp directory where inputs schema will live.
-            with tempfile.NamedTemporaryFile(prefix='inputs_schema', suffix='.yml') as tmp:
-                self._make_inputs_schema_file(tmp_meta_base.name, tmp.name)
-                self._schema_salad_validate(tmp.name, document_path)
+        native_validator = self.native_validator
+        if native_validator is not None:
+            with profile_stage('inputs.native_validate', document_path):
+                if native_validator.is_valid_file(document_path):
+                    return
+        compiled_schema = self.compiled_schema
+        with profile_stage('inputs.schema_salad_validate', document_path):
+            compiled_schema.validate(document_path)
         return
 
-    def _make_inputs_schema_dict(self):
+    def _make_inputs_fields(self):
         """
-        Make the schema from inputs to validate job file with.
-        :return (dict):
+        :return(dict): input name: {'type': input type} for each input of the tool.
         """
         inputs_fields = {}
         for input in self.cwl_inputs:  # inputs is a list of CommandInputParameter
             inputs_fields[get_shortened_id(input.id)] = {
                 'type': input._handle_input_type_field(self.cwl_schema_def_requirement)}
+        return inputs_fields
 
+    def _make_inputs_schema_dict(self):
+        """
+        Make the schema from inputs to validate job file with.
+        :return (dict):
+        """
+        inputs_fields = deepcopy(self.inputs_fields)
         schema_dict = deepcopy(InputsSchema.template_dict)
         _, inputs_field_index = get_dict_from_list(schema_dict['$graph'], 'name', 'InputsField')
         schema_dict['$graph'][inputs_field_index]['fields'] = inputs_fields
         return schema_dict
 
-    def _make_inputs_schema_file(self, metaschema_path, out_file):
-        """
-
-        :param metaschema_path:
-        :param out_file:
-        :return:
-        """
-        schema_dict = self._make_inputs_schema_dict()
-        import_dict, import_index = get_dict_from_list(schema_dict['$graph'], '$import', 'null')
-        schema_dict['$graph'][import_index] = {'$import': metaschema_path}
-        dump_dict_to_yaml_output(schema_dict, out_file)
-        return
-
-    def _schema_salad_validate(self, schema_path, document_path):
-        '''
-        Adapted from schema_salad main().
-        :param schema_path:
-        :param document_path:
-        :return:
-        '''
-
-        strict_foreign_properties = False
-        strict = True
-        metaschema_names, metaschema_doc, metaschema_loader = get_metaschema()
-        schema_uri = str(schema_path)
-        if not (urlparse(schema_uri)[0] and urlparse(schema_uri)[0] in ['http', 'https', 'file']):
-            schema_uri = file_uri(schema_uri)
-        schema_raw_doc = metaschema_loader.fetch(schema_uri)
-
-        schema_doc, schema_metadata = metaschema_loader.resolve_all(schema_raw_doc, schema_uri)
-
-        # Validate schema against metaschema
-        validate_doc(metaschema_names, schema_doc, metaschema_loader, True)
-
-        # Get the json-ld context and RDFS representation from the schema
-        metactx = collect_namespaces(schema_metadata)
-        if "$base" in schema_metadata:
-            metactx["@base"] = schema_metadata["$base"]
-
-        (schema_ctx, rdfs) = salad_to_jsonld_context(
-            schema_doc, metactx)
-
-        # Create the loader that will be used to load the target document.
-        document_loader = Loader(schema_ctx, skip_schemas=False)
-
-        # Make the Avro validation that will be used to validate the target
-        # document
-
-        avsc_obj = make_avro(schema_doc, document_loader)
-
-        avsc_names = make_avro_schema_from_avro(avsc_obj)
-
-        # Load target document and resolve refs
-        uri = str(document_path)
-        document, doc_metadata = document_loader.resolve_ref(uri, strict_foreign_properties=strict_foreign_properties,
-                                                             checklinks=False)  # This is what's getting us around file link checking.
-
-        validate_doc(avsc_names, document, document_loader, strict=strict,
-                     strict_foreign_properties=strict_foreign_properties)
-
-        return
-
     @staticmethod
     def _make_input_value_field(command_input_parameter, schema_def_requirement):
         template_param_value, comment = command_input_parameter.make_input_value_field(schema_def_requirement)
@@ -332,7 +450,7 @@ class InputsSchema:
         template = CommentedMap()
         for input in self.cwl_inputs:
             input_name = get_shortened_id(input.id)
-            template_param_value, comment = self._make_input_value_field(input, self._cwl_schema_def_requirement)
+            template_param_value, comment = self._make_input_value_field(input, self.cwl_schema_def_requirement)
             template.insert(0, input_name, template_param_value, comment)
         return template
 
@@ -1,10 +1,17 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 from ruamel.yaml import safe_load
-from capanno_utils.classes.metadata.script_metadata import ScriptMetadata
-from capanno_utils.classes.metadata.tool_metadata import ParentToolMetadata, SubtoolMetadata
-from capanno_utils.classes.metadata.workflow_metadata import WorkflowMetadata
+from capanno_utils.classes.metadata.metadata_headers import load_parent_tool_header, load_subtool_header, \
+    load_script_header, load_workflow_header
+from capanno_utils.helpers.content_catalog import ContentCatalog
+from capanno_utils.helpers.content_map_manifest import ContentMapManifest
+from capanno_utils.helpers.content_walker import ParentToolRecord, walk_tools, walk_scripts, walk_workflows
 from capanno_utils.helpers.dict_tools import no_clobber_update
 from capanno_utils.helpers.file_management import dump_dict_to_yaml_output
+from capanno_utils.helpers.parent_metadata_cache import use_parent_metadata_cache
 from capanno_utils.helpers.get_paths import *
+from capanno_utils.helpers.profiling import profile_stage
 
 
 # Todo before stable release: update function names to be consistent.
@@ -26,21 +33,128 @@ def make_tools_index(base_dir, index_path=tool_index_path):
     return index_path.resolve()
 
 
-def make_tools_map_dict(base_dir=None, specify_exists=False):
-    tools_dir = get_root_tools_dir(base_dir=base_dir)
-    tools_map = {}
+@contextmanager
+def map_executor(jobs=1):
+    """
+    :param jobs(int): Number of worker processes. No executor is made if jobs is 1.
+    :return(ProcessPoolExecutor|None): To pass to make_map_from_sources.
+    """
+    if jobs and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            yield executor
+    else:
+        yield None
+
+
+def _get_map_group(metadata_path, content_type):
+    """
+    :return(Path): The tool version, script project, or workflow project directory of metadata_path. Maps of a group
+        are made by the same worker.
+    """
+    return metadata_path.parents[2 if content_type == 'script' else 1]
+
+
+def _make_source_maps(make_map_functions):
+    with use_parent_metadata_cache():
+        return [make_map() for make_map in make_map_functions]
+
+
+def _merge_source_maps(map_sources, source_maps):
+    """
+    Combine the maps of each source in the order of map_sources.
+    :raises ValueError: If an identifier is in the maps of more than one metadata file.
+    """
+    content_map = {}
+    identifier_paths = {}
+    for (metadata_path, _, _), source_map in zip(map_sources, source_maps):
+        for identifier in source_map:
+            if identifier in identifier_paths:
+                raise ValueError(f"Duplicate identifier {identifier} found in {identifier_paths[identifier]} and {metadata_path}")
+            identifier_paths[identifier] = metadata_path
+        content_map.update(source_map)
+    return content_map
+
+
+def make_map_from_sources(map_sources, content_type, manifest=None, executor=None):
+    """
+    Make a content map from the metadata files in map_sources.
+    :param map_sources(list): (metadata path, dependencies, function that makes the map entries of the metadata file)
+        tuples, in map order.
+    :param content_type(str): 'tool' | 'script' | 'workflow'.
+    :param manifest(ContentMapManifest): If provided, entries of unchanged metadata files are taken from the manifest,
+        and new entries are stored in it.
+    :param executor(ProcessPoolExecutor): If provided, entries are made in its workers, one task per tool version or
+        script or workflow project. The map is the same as when made serially.
+    :return(dict):
+    """
+    source_maps = [manifest.get_map(metadata_path, dependencies) if manifest else None for
+                   metadata_path, dependencies, _ in map_sources]
+    missing_indices = [index for index, source_map in enumerate(source_maps) if source_map is None]
+    if executor and len(missing_indices) > 1:
+        groups = {}
+        for index in missing_indices:
+            groups.setdefault(_get_map_group(map_sources[index][0], content_type), []).append(index)
+        group_maps = executor.map(_make_source_maps,
+                                  [[map_sources[index][2] for index in indices] for indices in groups.values()])
+        for indices, maps in zip(groups.values(), group_maps):
+            for index, source_map in zip(indices, maps):
+                source_maps[index] = source_map
+    else:
+        source_maps_made = _make_source_maps([map_sources[index][2] for index in missing_indices])
+        for index, source_map in zip(missing_indices, source_maps_made):
+            source_maps[index] = source_map
+    if manifest:
+        for index in missing_indices:
+            metadata_path, dependencies, _ = map_sources[index]
+            manifest.put_map(metadata_path, content_type, source_maps[index], dependencies)
+    return _merge_source_maps(map_sources, source_maps)
 
-    for tool_dir in tools_dir.iterdir():
-        if tool_dir.name == '.DS_Store':
-            continue
-        assert tool_dir.is_dir()
-        for version_dir in tool_dir.iterdir():
-            if version_dir.name == '.DS_Store':
-                continue
-            assert version_dir.is_dir()
-            tool_map = make_tool_version_dir_map(tool_dir.name, version_dir.name, base_dir=base_dir, specify_exists=specify_exists)
-            no_clobber_update(tools_map, tool_map)
-    return tools_map
+
+def _make_content_type_map(map_sources, content_type, manifest=None, executor=None):
+    """
+    Make the map of a whole tools, scripts, or workflows directory. Entries of deleted metadata files are dropped from
+    manifest.
+    """
+    if manifest:
+        manifest.prune(content_type, [metadata_path for metadata_path, _, _ in map_sources])
+    return make_map_from_sources(map_sources, content_type, manifest=manifest, executor=executor)
+
+
+def _get_tool_map_source(record, base_dir=None, specify_exists=False):
+    """
+    Subtool entries depend on the parent metadata they inherit from, and on the workflow language files if specify_exists.
+    :param record(ParentToolRecord|SubtoolRecord): From content_walker.walk_tools.
+    :return(tuple): See make_map_from_sources.
+    """
+    if isinstance(record, ParentToolRecord):
+        return record.metadata_path, (), partial(make_parent_tool_map, record.tool_name, record.tool_version,
+                                                 base_dir=base_dir)
+    dependencies = (record.parent_metadata_path,)
+    if specify_exists:
+        dependencies += tuple(get_tool_sources_from_metadata_path(record.metadata_path).values())
+    return record.metadata_path, dependencies, partial(make_subtool_map, record.tool_name, record.tool_version,
+                                                        record.subtool_name, base_dir=base_dir,
+                                                        specify_exists=specify_exists)
+
+
+def get_tool_map_sources(base_dir=None, specify_exists=False, tool_name=None, tool_version=None):
+    """
+    Get the metadata files that a map of the tools directory is made from. See make_map_from_sources.
+    :param tool_name(str): Only include this tool.
+    :param tool_version(str): Only include this version of tool_name.
+    """
+    return [_get_tool_map_source(record, base_dir=base_dir, specify_exists=specify_exists) for record in
+            walk_tools(base_dir=base_dir, tool_name=tool_name, tool_version=tool_version)]
+
+
+def make_tools_map_dict(base_dir=None, specify_exists=False, manifest=None, jobs=1):
+    """
+    :param manifest(ContentMapManifest): If provided, only metadata that changed since the manifest was saved is loaded.
+    :param jobs(int): Number of processes to load metadata with. Loaded serially if jobs is 1.
+    """
+    map_sources = get_tool_map_sources(base_dir=base_dir, specify_exists=specify_exists)
+    with map_executor(jobs) as executor:
+        return _make_content_type_map(map_sources, 'tool', manifest=manifest, executor=executor)
 
 def make_tools_map(outfile_path=None, base_dir=None, specify_exists=False):
     """
@@ -61,81 +175,73 @@ def make_main_tool_map(tool_name, base_dir=None):
     Make a yaml file that specifies paths and attributes of tools in a single tool directory. If outfile is provided, dump contents to outfile.
 
     """
-    main_tool_map = {}
-    tool_dir = get_main_tool_dir(tool_name, base_dir=base_dir)
-    for version_dir in tool_dir.iterdir():
-        no_clobber_update(main_tool_map, make_tool_version_dir_map(tool_name, version_dir.name, base_dir=base_dir))
-    return main_tool_map
+    map_sources = get_tool_map_sources(base_dir=base_dir, tool_name=tool_name)
+    return make_map_from_sources(map_sources, 'tool')
 
 
 def make_tool_version_dir_map(tool_name, tool_version, base_dir=None, specify_exists=False):
-    tool_version_map = {}
+    map_sources = get_tool_map_sources(base_dir=base_dir, specify_exists=specify_exists, tool_name=tool_name,
+                                       tool_version=tool_version)
+    return make_map_from_sources(map_sources, 'tool')
 
-    tool_version_dir = get_tool_version_dir(tool_name, tool_version, base_dir=base_dir)
+
+def make_parent_tool_map(tool_name, tool_version, base_dir=None):
     parent_metadata_path = get_tool_metadata(tool_name, tool_version, parent=True, base_dir=base_dir)
-    parent_metadata = ParentToolMetadata.load_from_file(parent_metadata_path, check_index=False)
+    with profile_stage('map.parent', parent_metadata_path):
+        parent_header = load_parent_tool_header(parent_metadata_path)
     parent_rel_path = get_relative_path(parent_metadata_path, base_path=base_dir)
-    tool_version_map[parent_metadata.identifier] = {'metadataPath': str(parent_rel_path),
-                                                    'metadataStatus': parent_metadata.metadataStatus,
-                                                    'name': parent_metadata.name,
-                                                    'versionName': parent_metadata.softwareVersion.versionName,
-                                                    'type': 'parent'}
-    for subtool_dir in tool_version_dir.iterdir():
-        if subtool_dir.name in ['.DS_Store', 'common']:
-            continue
-        assert subtool_dir.is_dir(), subtool_dir.name+" is not a directory. You likely have an extra file."
-        tool_name_length = len(
-            tool_name)  # Use to get directory name string after 'tool_name'. In case there are underscores in tool_name.
-        subtool_name = subtool_dir.name[tool_name_length + 1:]
-        if subtool_name == '':
-            subtool_name = None
-        subdir_map = make_subtool_map(tool_name, tool_version, subtool_name, base_dir=base_dir, specify_exists=specify_exists)
-        no_clobber_update(tool_version_map, subdir_map)
-    return tool_version_map
+    parent_map = {}
+    parent_map[parent_header['identifier']] = {'metadataPath': str(parent_rel_path),
+                                               'metadataStatus': parent_header['metadataStatus'],
+                                               'name': parent_header['name'],
+                                               'versionName': parent_header['versionName'],
+                                               'type': 'parent'}
+    return parent_map
 
 
 def make_subtool_map(tool_name, tool_version, subtool_name, base_dir=None, specify_exists=False):
     subtool_metadata_path = get_tool_metadata(tool_name, tool_version, subtool_name=subtool_name, parent=False,
                                               base_dir=base_dir)
-    subtool_metadata = SubtoolMetadata.load_from_file(subtool_metadata_path, check_index=False)
+    with profile_stage('map.subtool', subtool_metadata_path):
+        subtool_header = load_subtool_header(subtool_metadata_path)
     subdir_map = {}
     subtool_rel_path = get_relative_path(subtool_metadata_path, base_path=base_dir)
     if specify_exists:
         files_exist = check_for_workflow_language_files(subtool_metadata_path)
-        subdir_map[subtool_metadata.identifier] = {'metadataPath': str(subtool_rel_path),
-                                               'name': subtool_metadata.name,
-                                               'metadataStatus': subtool_metadata.metadataStatus,
-                                               'cwlStatus': subtool_metadata.cwlStatus,
-                                               'cwlExists': files_exist['cwl'],
-                                               'nextflowStatus': subtool_metadata.nextflowStatus,
-                                               'nextflowExists': files_exist['nextflow'],
-                                               'snakemakeStatus': subtool_metadata.snakemakeStatus,
-                                               'snakemakeExists': files_exist['snakemake'],
-                                               'wdlStatus': subtool_metadata.wdlStatus,
-                                               'wdlExists': files_exist['wdl'],
-                                               'type': 'subtool'}
+        subdir_map[subtool_header['identifier']] = {'metadataPath': str(subtool_rel_path),
+                                                'name': subtool_header['name'],
+                                                'metadataStatus': subtool_header['metadataStatus'],
+                                                'cwlStatus': subtool_header['cwlStatus'],
+                                                'cwlExists': files_exist['cwl'],
+                                                'nextflowStatus': subtool_header['nextflowStatus'],
+                                                'nextflowExists': files_exist['nextflow'],
+                                                'snakemakeStatus': subtool_header['snakemakeStatus'],
+                                                'snakemakeExists': files_exist['snakemake'],
+                                                'wdlStatus': subtool_header['wdlStatus'],
+                                                'wdlExists': files_exist['wdl'],
+                                                'type': 'subtool'}
     else:
-        subdir_map[subtool_metadata.identifier] = {'metadataPath': str(subtool_rel_path),
-                                               'name': subtool_metadata.name,
-                                               'metadataStatus': subtool_metadata.metadataStatus,
-                                               'cwlStatus': subtool_metadata.cwlStatus,
-                                               'nextflowStatus': subtool_metadata.nextflowStatus,
-                                               'snakemakeStatus': subtool_metadata.snakemakeStatus,
-                                               'wdlStatus': subtool_metadata.wdlStatus,
-                                               'type': 'subtool'}
+        subdir_map[subtool_header['identifier']] = {'metadataPath': str(subtool_rel_path),
+                                                'name': subtool_header['name'],
+                                                'metadataStatus': subtool_header['metadataStatus'],
+                                                'cwlStatus': subtool_header['cwlStatus'],
+                                                'nextflowStatus': subtool_header['nextflowStatus'],
+                                                'snakemakeStatus': subtool_header['snakemakeStatus'],
+                                                'wdlStatus': subtool_header['wdlStatus'],
+                                                'type': 'subtool'}
     return subdir_map
 
 
 
 def make_tool_common_dir_map(tool_name, tool_version, base_dir):
     common_metadata_path = get_tool_common_dir(tool_name, tool_version, base_dir=base_dir) / common_tool_metadata_name
-    common_metadata = ParentToolMetadata.load_from_file(common_metadata_path, check_index=False)
+    common_header = load_parent_tool_header(common_metadata_path)
     common_dir_map = {}
-    common_dir_map[common_metadata.identifier] = {'metadataPath': str(common_metadata_path),
-                                                  'metadataStatus': common_metadata.metadataStatus,
-                                                  'name': common_metadata.name,
-                                                  'versionName': common_metadata.softwareVersion.versionName,
-                                                  'type': 'parent'}
+    common_dir_map[common_header['identifier']] = {'metadataPath': str(common_metadata_path),
+                                                   'metadataStatus': common_header['metadataStatus'],
+                                                   'name': common_header['name'],
+                                                   'versionName': common_header['versionName'],
+                                                   'type': 'parent'}
     return common_dir_map
 
 
@@ -153,14 +259,35 @@ def check_for_workflow_language_files(subtool_metadata_path):
 
 
 
-def make_scripts_map_dict(base_dir=None):
-    scripts_dir = get_root_scripts_dir(base_dir=base_dir)
+def _get_script_map_source(record, base_dir=None):
+    """
+    Script metadata can inherit from any metadata in the common directory of the script version, so all of it is a
+    dependency.
+    :param record(ScriptRecord): From content_walker.walk_scripts.
+    :return(tuple): See make_map_from_sources.
+    """
+    return record.metadata_path, record.common_metadata_paths, partial(
+        make_script_map, record.group_name, record.project_name, record.version_name, record.script_name,
+        base_dir=base_dir)
+
+
+def get_script_map_sources(base_dir=None, group_name=None, project_name=None, version_name=None):
+    """
+    Get the metadata files that a map of the scripts directory is made from. See make_map_from_sources.
+    :param group_name(str): Only include this group. project_name and version_name narrow it further.
+    """
+    return [_get_script_map_source(record, base_dir=base_dir) for record in
+            walk_scripts(base_dir=base_dir, group_name=group_name, project_name=project_name, version_name=version_name)]
+
 
-    scripts_map = {}
-    for group_dir in scripts_dir.iterdir():
-        group_script_map = make_group_script_map(group_dir.name, base_dir=base_dir)
-        no_clobber_update(scripts_map, group_script_map)
-    return scripts_map
+def make_scripts_map_dict(base_dir=None, manifest=None, jobs=1):
+    """
+    :param manifest(ContentMapManifest): If provided, only metadata that changed since the manifest was saved is loaded.
+    :param jobs(int): Number of processes to load metadata with. Loaded serially if jobs is 1.
+    """
+    map_sources = get_script_map_sources(base_dir=base_dir)
+    with map_executor(jobs) as executor:
+        return _make_content_type_map(map_sources, 'script', manifest=manifest, executor=executor)
 
 def make_script_maps(outfile_path, base_dir=None):
     scripts_map = make_scripts_map_dict(base_dir=base_dir)
@@ -169,32 +296,19 @@ def make_script_maps(outfile_path, base_dir=None):
 
 
 def make_group_script_map(group_name, base_dir=None):
-    group_script_map = {}
-    script_group_dir = get_script_group_dir(group_name, base_dir=base_dir)
-    for project_dir in script_group_dir.iterdir():
-        script_project_map = make_project_script_map(group_name, project_dir.name, base_dir=base_dir)
-        no_clobber_update(group_script_map, script_project_map)
-    return group_script_map
+    map_sources = get_script_map_sources(base_dir=base_dir, group_name=group_name)
+    return make_map_from_sources(map_sources, 'script')
 
 
 def make_project_script_map(group_name, project_name, base_dir=None):
-    script_project_map = {}
-    script_project_dir = get_script_project_dir(group_name, project_name, base_dir=base_dir)
-    for version_dir in script_project_dir.iterdir():
-        version_map = make_script_version_map(group_name, project_name, version_dir.name, base_dir=base_dir)
-        no_clobber_update(script_project_map, version_map)
-    return script_project_map
+    map_sources = get_script_map_sources(base_dir=base_dir, group_name=group_name, project_name=project_name)
+    return make_map_from_sources(map_sources, 'script')
 
 
 def make_script_version_map(group_name, project_name, version_name, base_dir=None):
-    script_version_map = {}
-    script_version_dir = get_script_version_dir(group_name, project_name, version_name, base_dir=base_dir)
-    for script_dir in script_version_dir.iterdir():
-        if script_dir.name == 'common':
-            continue
-        script_map = make_script_map(group_name, project_name, version_name, script_dir.name, base_dir=base_dir)
-        no_clobber_update(script_version_map, script_map)
-    return script_version_map
+    map_sources = get_script_map_sources(base_dir=base_dir, group_name=group_name, project_name=project_name,
+                                         version_name=version_name)
+    return make_map_from_sources(map_sources, 'script')
 
 
 def make_script_map(group_name, project_name, version_name, script_name, base_dir=None):
@@ -205,34 +319,42 @@ def make_script_map(group_name, project_name, version_name, script_name, base_di
         script_cwl_path = get_cwl_script(group_name, project_name, version_name, script_name, base_dir=base_dir)
         script_rel_path = get_relative_path(script_cwl_path, base_path=base_dir)
         metadata_path = get_metadata_path(script_cwl_path)
-        script_metadata = ScriptMetadata.load_from_file(metadata_path)
-        script_map[script_metadata.identifier] = {'path': str(script_rel_path), 'name': script_metadata.name,
-                                                  'versionName': script_metadata.softwareVersion.versionName,
-                                                  'metadataStatus': script_metadata.metadataStatus,
-                                                  'cwlStatus': script_metadata.cwlStatus}
+        with profile_stage('map.script', metadata_path):
+            script_header = load_script_header(metadata_path)
+        script_map[script_header['identifier']] = {'path': str(script_rel_path), 'name': script_header['name'],
+                                                   'versionName': script_header['versionName'],
+                                                   'metadataStatus': script_header['metadataStatus'],
+                                                   'cwlStatus': script_header['cwlStatus']}
     return script_map
 
 # Workflow maps
 
-def make_workflow_maps_dict(base_dir=None):
-    workflows_dir = get_workflows_root_dir(base_dir=base_dir)
-    master_workflow_map = {}
-    for group_dir in workflows_dir.iterdir():
-        if group_dir.name == '.DS_Store':
-            continue
-        assert group_dir.is_dir()
-        for project_dir in group_dir.iterdir():
-            if project_dir.name == '.DS_Store':
-                continue
-            assert project_dir.is_dir()
-            for version_dir in project_dir.iterdir():
-                if version_dir.name == '.DS_Store':
-                    continue
-                assert version_dir.is_dir()
-                workflow_dict = make_workflow_map(group_dir.name, project_dir.name, version_dir.name,
-                                                          base_dir=base_dir)
-                no_clobber_update(master_workflow_map, workflow_dict)
-    return master_workflow_map
+def _get_workflow_map_source(record, base_dir=None):
+    """
+    :param record(WorkflowRecord): From content_walker.walk_workflows.
+    :return(tuple): See make_map_from_sources.
+    """
+    return record.metadata_path, (), partial(make_workflow_map, record.group_name, record.project_name,
+                                               record.version_name, base_dir=base_dir)
+
+
+def get_workflow_map_sources(base_dir=None, group_name=None, project_name=None):
+    """
+    Get the metadata files that a map of the workflows directory is made from. See make_map_from_sources.
+    :param group_name(str): Only include this group. project_name narrows it further.
+    """
+    return [_get_workflow_map_source(record, base_dir=base_dir) for record in
+            walk_workflows(base_dir=base_dir, group_name=group_name, project_name=project_name)]
+
+
+def make_workflow_maps_dict(base_dir=None, manifest=None, jobs=1):
+    """
+    :param manifest(ContentMapManifest): If provided, only metadata that changed since the manifest was saved is loaded.
+    :param jobs(int): Number of processes to load metadata with. Loaded serially if jobs is 1.
+    """
+    map_sources = get_workflow_map_sources(base_dir=base_dir)
+    with map_executor(jobs) as executor:
+        return _make_content_type_map(map_sources, 'workflow', manifest=manifest, executor=executor)
 
 def make_workflow_maps(outfile_name='workflow-maps', base_dir=None):
     master_workflow_map = make_workflow_maps_dict(base_dir=base_dir)
@@ -240,20 +362,12 @@ def make_workflow_maps(outfile_name='workflow-maps', base_dir=None):
     return
 
 def make_group_workflow_map(group_name, base_dir=None):
-    group_workflow_map = {}
-    workflow_group_dir = get_workflow_group_dir(group_name, base_dir)
-    for project_dir in workflow_group_dir.iterdir():
-        workflow_project_map = make_project_workflow_map(group_name, project_dir.name, base_dir)
-        no_clobber_update(group_workflow_map, workflow_project_map)
-    return group_workflow_map
+    map_sources = get_workflow_map_sources(base_dir=base_dir, group_name=group_name)
+    return make_map_from_sources(map_sources, 'workflow')
 
 def make_project_workflow_map(group_name, project_name, base_dir=None):
-    workflow_project_map = {}
-    workflow_project_dir = get_workflow_project_dir(group_name, project_name, base_dir)
-    for version_dir in workflow_project_dir.iterdir():
-        version_map = make_workflow_map(group_name, project_name, version_dir.name, base_dir)
-        no_clobber_update(workflow_project_map, version_map)
-    return workflow_project_map
+    map_sources = get_workflow_map_sources(base_dir=base_dir, group_name=group_name, project_name=project_name)
+    return make_map_from_sources(map_sources, 'workflow')
 
 def make_version_workflow_map(group_name, project_name, version_name, base_dir=None):
     workflow_version_map = make_workflow_map(group_name, project_name, version_name, base_dir)
@@ -262,14 +376,15 @@ def make_version_workflow_map(group_name, project_name, version_name, base_dir=N
 def make_workflow_map(group_name, project_name, version, base_dir=None):
     workflow_map = {}
     workflow_metadata_path = get_workflow_metadata(group_name, project_name, version, base_dir=base_dir)
-    workflow_metadata = WorkflowMetadata.load_from_file(workflow_metadata_path)
+    with profile_stage('map.workflow', workflow_metadata_path):
+        workflow_header = load_workflow_header(workflow_metadata_path)
     workflow_metadata_rel_path = get_relative_path(workflow_metadata_path, base_path=base_dir)
-    workflow_map[workflow_metadata.identifier] = {'metadataPath': str(workflow_metadata_rel_path), 'name': workflow_metadata.name,
-                                                  'metadataStatus': workflow_metadata.metadataStatus,
-                                                  'workflowLanguage': workflow_metadata.workflowLanguage,
-                                                  'workflowStatus': workflow_metadata.workflowStatus,
-                                                  'workflowPath': workflow_metadata.workflowFile,
-                                                  'versionName': workflow_metadata.softwareVersion.versionName,
+    workflow_map[workflow_header['identifier']] = {'metadataPath': str(workflow_metadata_rel_path), 'name': workflow_header['name'],
+                                                   'metadataStatus': workflow_header['metadataStatus'],
+                                                   'workflowLanguage': workflow_header['workflowLanguage'],
+                                                   'workflowStatus': workflow_header['workflowStatus'],
+                                                   'workflowPath': workflow_header['workflowFile'],
+                                                   'versionName': workflow_header['versionName'],
                                                 }
     return workflow_map
 
@@ -285,13 +400,63 @@ def combine_yaml_files_into_dict(file_path, *file_paths):
     return combined_dict
 
 
-def make_master_map_dict(base_dir=None, specify_exists=False):
+def make_master_map_dict(base_dir=None, specify_exists=False, manifest=None, jobs=1):
+    """
+    :param manifest(ContentMapManifest): If provided, only metadata that changed since the manifest was saved is loaded.
+    :param jobs(int): Number of processes to load metadata with. The same processes are used for tools, scripts, and
+        workflows. Loaded serially if jobs is 1.
+    """
+    content_type_sources = (('tool', get_tool_map_sources(base_dir=base_dir, specify_exists=specify_exists)),
+                            ('script', get_script_map_sources(base_dir=base_dir)),
+                            ('workflow', get_workflow_map_sources(base_dir=base_dir)))
     master_map = {}
-    master_map.update(make_tools_map_dict(base_dir=base_dir, specify_exists=specify_exists))
-    master_map.update(make_scripts_map_dict(base_dir=base_dir))
-    master_map.update(make_workflow_maps_dict(base_dir=base_dir))
+    with map_executor(jobs) as executor:
+        for content_type, map_sources in content_type_sources:
+            no_clobber_update(master_map, _make_content_type_map(map_sources, content_type, manifest=manifest,
+                                                                 executor=executor))
+    return master_map
+
+def make_content_catalog(base_dir, specify_exists=False, jobs=1, manifest=None, catalog_path=None):
+    """
+    Update the SQLite catalog of the master map. Metadata is loaded incrementally with a content map manifest, and
+    only changed entries are written to the catalog.
+    :param manifest(ContentMapManifest): Saving it is left to the caller. If not provided, the manifest in the .cache
+        directory of base_dir is used and saved.
+    :param catalog_path(Path): Defaults to .cache/content_catalog.sqlite in base_dir.
+    :return(dict): The master map.
+    """
+    save_manifest = manifest is None
+    if save_manifest:
+        manifest = ContentMapManifest(base_dir)
+    master_map = make_master_map_dict(base_dir=base_dir, specify_exists=specify_exists, manifest=manifest, jobs=jobs)
+    if save_manifest:
+        manifest.save()
+    with ContentCatalog(base_dir, catalog_path=catalog_path) as catalog:
+        catalog.update(master_map)
     return master_map
 
+
+def get_subtool_map_entries(base_dir=None, specify_exists=False, use_catalog=True):
+    """
+    Get the map entries of every subtool. They are read from the content catalog made by capanno-map --index if there is
+    one, so the repo isn't walked and no metadata is loaded. The catalog is as current as the last --index run. Entries
+    whose metadata files were removed since are skipped.
+    :param specify_exists(bool): Entries need the cwlExists, wdlExists, etc. keys. The map is made if the catalog was
+        indexed without --include-exists.
+    :param use_catalog(bool): Make the map even if there is a catalog.
+    :return(dict): identifier: map entry
+    """
+    base_dir = get_base_dir(base_dir)
+    if use_catalog and (base_dir / content_catalog_path).exists():
+        with ContentCatalog(base_dir, read_only=True) as catalog:
+            subtool_entries = catalog.find(type='subtool')
+        if not specify_exists or all('cwlExists' in values for values in subtool_entries.values()):
+            return {identifier: values for identifier, values in subtool_entries.items() if
+                    (base_dir / values['metadataPath']).exists()}
+    tool_map = make_tools_map_dict(base_dir=base_dir, specify_exists=specify_exists)
+    return {identifier: values for identifier, values in tool_map.items() if values['type'] == 'subtool'}
+
+
 def make_master_map(file_name, *file_names, outfile_name="master_map"):
     file_path = config[os.environ['CONFIG_KEY']]['content_maps_dir'] / f"{file_name}.yaml"
 
@@ -316,11 +481,15 @@ def get_tool_args_from_identifier(identifier, base_dir=None):
     base_dir = get_base_dir(base_dir)
     instance_hash = None
     if tool_instance_identifier_pattern.match(identifier):
-        identifier, instance_hash = identifier[:-4], identifier[-4:]
-    if parent_tool_identifier_pattern.match(identifier) | subtool_identifier_pattern.match(identifier):
-        tools_map = make_tools_map(base_dir=base_dir)
-        tool_path = tools_map[identifier]['metadataPath']
-        tool_args = get_tool_args_from_path(tool_path)
+        identifier, instance_hash = identifier[:-5], identifier[-4:]
+    if parent_tool_identifier_pattern.match(identifier) or subtool_identifier_pattern.match(identifier):
+        tool_values = None
+        if (Path(base_dir) / content_catalog_path).exists():  # Made by capanno-map --index.
+            with ContentCatalog(base_dir, read_only=True) as catalog:
+                tool_values = catalog.get(identifier)
+        if not (tool_values and (Path(base_dir) / tool_values['metadataPath']).exists()):  # Catalog is out of date.
+            tool_values = make_tools_map_dict(base_dir=base_dir)[identifier]
+        tool_args = get_tool_args_from_path(tool_values['metadataPath'])
     else:
         raise ValueError()
     return tool_args, instance_hash
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+SQLite copy of the master content map, indexed so that identifiers, paths, and statuses can be looked up without
+walking the repo and loading metadata.
+"""
+
+import json
+import sqlite3
+from pathlib import Path
+from capanno_utils.repo_config import content_catalog_path
+from capanno_utils.helpers.string_tools import get_type_from_identifier
+
+catalog_format_version = 2
+
+# Columns that can be filtered on. Except for type, path, and parentIdentifier, they have the name of a map entry key.
+catalog_columns = ('identifier', 'type', 'path', 'parentIdentifier', 'name', 'versionName', 'metadataStatus',
+                   'cwlStatus', 'nextflowStatus', 'snakemakeStatus', 'wdlStatus', 'workflowStatus', 'workflowLanguage')
+
+_create_statements = (
+    "CREATE TABLE IF NOT EXISTS info (key TEXT PRIMARY KEY, value TEXT)",
+    f"CREATE TABLE IF NOT EXISTS content (identifier TEXT PRIMARY KEY, entry TEXT NOT NULL, "
+    f"{', '.join(f'{column} TEXT' for column in catalog_columns[1:])})",
+    "CREATE INDEX IF NOT EXISTS content_type ON content (type)",
+    "CREATE INDEX IF NOT EXISTS content_path ON content (path)",
+    "CREATE INDEX IF NOT EXISTS content_parent ON content (parentIdentifier)",
+)
+
+
+def get_parent_identifier(identifier):
+    """
+    :return(str|None): Identifier of the parent tool of a subtool identifier. Subtool identifiers are the parent
+        identifier with a subtool hash before the version hash. None for anything else.
+    """
+    if get_type_from_identifier(identifier) == 'tool' and identifier.count('_') == 2:
+        return f"{identifier[:9]}{identifier[-3:]}"
+    return None
+
+
+def make_catalog_row(identifier, entry):
+    """
+    :param entry(dict): Map entry of identifier from make_master_map_dict.
+    :return(tuple): Values of entry and catalog_columns.
+    """
+    content_type = get_type_from_identifier(identifier)
+    row_type = entry.get('type', content_type)  # Only tool entries specify parent or subtool.
+    path = entry.get('metadataPath', entry.get('path'))  # Script entries have the path of the cwl file.
+    values = {'identifier': identifier, 'type': row_type, 'path': path,
+              'parentIdentifier': get_parent_identifier(identifier)}
+    values.update({column: entry.get(column) for column in catalog_columns[4:]})
+    return (json.dumps(entry), *[values[column] for column in catalog_columns])
+
+
+class ContentCatalog:
+    """
+    Catalog of content map entries. update writes only the entries that changed, and removes entries that are no longer
+    in the map. Entries are kept in identifier order rather than map order, so adding or removing one entry doesn't
+    change any other row.
+    """
+
+    def __init__(self, base_dir, catalog_path=None, read_only=False):
+        """
+        :param base_dir(Path): Root path of the content repo.
+        :param catalog_path(Path): SQLite file of the catalog. Defaults to .cache/content_catalog.sqlite in base_dir.
+        :param read_only(bool): Open an existing catalog for lookups only. Nothing is written to the content repo, and
+            sqlite3.OperationalError is raised if the catalog doesn't exist.
+        """
+        self.base_dir = Path(base_dir)
+        self.catalog_path = Path(catalog_path) if catalog_path else self.base_dir / content_catalog_path
+        if read_only:
+            self.connection = sqlite3.connect(f"{self.catalog_path.resolve().as_uri()}?mode=ro", uri=True)
+            return
+        if not self.catalog_path.parent.exists():
+            self.catalog_path.parent.mkdir(parents=True)
+        self.connection = sqlite3.connect(str(self.catalog_path))
+        self._create_tables()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def close(self):
+        self.connection.close()
+        return
+
+    def _create_tables(self):
+        with self.connection:
+            self.connection.execute(_create_statements[0])
+            stored_format = self.connection.execute("SELECT value FROM info WHERE key = 'format'").fetchone()
+            if stored_format and stored_format[0] != str(catalog_format_version):
+                self.connection.execute("DROP TABLE IF EXISTS content")  # Rebuilt on the next update.
+            for statement in _create_statements[1:]:
+                self.connection.execute(statement)
+            self.connection.execute("INSERT OR REPLACE INTO info (key, value) VALUES ('format', ?)",
+                                    (str(catalog_format_version),))
+        return
+
+    def update(self, content_map):
+        """
+        Make the catalog match content_map.
+        :param content_map(dict): e.g. from make_master_map_dict.
+        :return(dict): Number of 'written' and 'deleted' entries.
+        """
+        stored_entries = dict(self.connection.execute("SELECT identifier, entry FROM content"))
+        rows = []
+        for identifier, entry in content_map.items():
+            row = make_catalog_row(identifier, entry)
+            if stored_entries.get(identifier) != row[0]:
+                rows.append(row)
+        deleted_identifiers = [(identifier,) for identifier in stored_entries if identifier not in content_map]
+        placeholders = ', '.join('?' for _ in range(len(catalog_columns) + 1))
+        with self.connection:
+            self.connection.executemany("DELETE FROM content WHERE identifier = ?", deleted_identifiers)
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO content (entry, {', '.join(catalog_columns)}) VALUES ({placeholders})", rows)
+        return {'written': len(rows), 'deleted': len(deleted_identifiers)}
+
+    def get(self, identifier):
+        """
+        :return(dict|None): Map entry of identifier.
+        """
+        row = self.connection.execute("SELECT entry FROM content WHERE identifier = ?", (identifier,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_by_path(self, path):
+        """
+        :param path(Path|str): Metadata path of a tool or workflow, or cwl path of a script. Relative to base_dir, or
+            absolute.
+        :return(tuple): (identifier, map entry), or (None, None) if path isn't in the catalog.
+        """
+        path = Path(path)
+        if path.is_absolute():
+            path = path.relative_to(self.base_dir)
+        row = self.connection.execute("SELECT identifier, entry FROM content WHERE path = ?", (str(path),)).fetchone()
+        return (row[0], json.loads(row[1])) if row else (None, None)
+
+    def find(self, **filters):
+        """
+        e.g. find(type='subtool', cwlStatus=('Draft', 'Incomplete'))
+        :param filters: column name: value, or tuple or list of values any of which can match. Column names are in
+            catalog_columns.
+        :return(dict): identifier: map entry of the matching entries, sorted by identifier.
+        """
+        conditions = []
+        parameters = []
+        for column, value in filters.items():
+            if column not in catalog_columns:
+                raise ValueError(f"Cannot filter on {column}. Must be one of {catalog_columns}")
+            if isinstance(value, (list, tuple)):
+                conditions.append(f"{column} IN ({', '.join('?' for _ in value)})")
+                parameters.extend(value)
+            elif value is None:
+                conditions.append(f"{column} IS NULL")
+            else:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        rows = self.connection.execute(f"SELECT identifier, entry FROM content{where} ORDER BY identifier", parameters)
+        return {identifier: json.loads(entry) for identifier, entry in rows}
+
+    def to_map(self):
+        """
+        :return(dict): The content map the catalog was last updated with, sorted by identifier.
+        """
+        return self.find()
@@ -0,0 +1,127 @@
+"""
+Persistent record of the content map entries made from each metadata file, so maps can be remade without loading
+metadata that hasn't changed.
+"""
+
+import json
+import logging
+from hashlib import sha1
+from pathlib import Path
+from capanno_utils.repo_config import content_map_manifest_path
+from capanno_utils.helpers.validation_cache import get_file_record, get_package_versions
+
+manifest_format_version = 1
+
+versioned_packages = ('capanno_utils',)
+
+
+class ContentMapManifest:
+    """
+    Map entries of each metadata file, stored with the mtime, size, and content hash of the metadata file and the files
+    its entries depend on. An entry is reused until one of those files changes. Files are only read again if their
+    mtime or size changed.
+    """
+
+    def __init__(self, base_dir, manifest_path=None):
+        """
+        :param base_dir(Path): Root path of the content repo. Paths are stored relative to it.
+        :param manifest_path(Path): File to persist the manifest to. Defaults to .cache/content_map_manifest.json in base_dir.
+        """
+        self.base_dir = Path(base_dir)
+        self.manifest_path = Path(manifest_path) if manifest_path else self.base_dir / content_map_manifest_path
+        self.versions = get_package_versions(versioned_packages)
+        self._file_records = {}  # relative path: [mtime_ns, size, sha1 hexdigest]
+        self._entries = {}  # relative metadata path: {'contentType', 'dependencies', 'key', 'map'}
+        self.load()
+
+    def load(self):
+        if not self.manifest_path.exists():
+            return
+        try:
+            with self.manifest_path.open('r') as manifest_file:
+                manifest_dict = json.load(manifest_file)
+        except ValueError:
+            logging.warning(f"Could not read content map manifest {self.manifest_path}. Making maps from scratch.")
+            return
+        if manifest_dict.get('format') != manifest_format_version or manifest_dict.get('versions') != self.versions:
+            logging.info(f"Package versions changed since {self.manifest_path} was written. Making maps from scratch.")
+            return
+        self._file_records = manifest_dict.get('files', {})
+        self._entries = manifest_dict.get('entries', {})
+        return
+
+    def save(self):
+        if not self.manifest_path.parent.exists():
+            self.manifest_path.parent.mkdir(parents=True)
+        used_paths = set(self._entries)
+        for entry in self._entries.values():
+            used_paths.update(entry['dependencies'])
+        self._file_records = {rel_path: file_record for rel_path, file_record in self._file_records.items() if
+                              rel_path in used_paths}
+        manifest_dict = {'format': manifest_format_version, 'versions': self.versions, 'files': self._file_records,
+                         'entries': self._entries}
+        tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.tmp")
+        with tmp_path.open('w') as manifest_file:
+            json.dump(manifest_dict, manifest_file)
+        tmp_path.replace(self.manifest_path)  # Don't leave a half written manifest if interrupted.
+        return self.manifest_path
+
+    def _relative_path(self, path):
+        path = Path(path)
+        try:
+            return str(path.relative_to(self.base_dir))
+        except ValueError:
+            return str(path)
+
+    def _file_hash(self, rel_path):
+        file_record = get_file_record(self.base_dir / rel_path, self._file_records.get(rel_path))
+        if file_record is None:
+            self._file_records.pop(rel_path, None)
+            return None
+        self._file_records[rel_path] = file_record
+        return file_record[2]
+
+    def _make_key(self, rel_paths):
+        key_hash = sha1()
+        for rel_path in rel_paths:
+            key_hash.update(rel_path.encode('utf-8'))
+            key_hash.update(str(self._file_hash(rel_path)).encode('utf-8'))
+        return key_hash.hexdigest()
+
+    def get_map(self, metadata_path, dependencies=()):
+        """
+        :param metadata_path(Path): Metadata file the entries were made from.
+        :param dependencies(iterable): Paths of other files that affect the entries. A missing file is recorded as missing.
+        :return(dict|None): Stored map entries, or None if they need to be made again.
+        """
+        rel_path = self._relative_path(metadata_path)
+        entry = self._entries.get(rel_path)
+        if entry is None:
+            return None
+        rel_dependencies = [self._relative_path(dependency) for dependency in dependencies]
+        if entry['dependencies'] != rel_dependencies or entry['key'] != self._make_key([rel_path, *rel_dependencies]):
+            return None
+        return entry['map']
+
+    def put_map(self, metadata_path, content_type, map_dict, dependencies=()):
+        """
+        :param content_type(str): 'tool' | 'script' | 'workflow'. Used to find entries of deleted files in prune.
+        :param map_dict(dict): Map entries made from metadata_path.
+        """
+        rel_path = self._relative_path(metadata_path)
+        rel_dependencies = [self._relative_path(dependency) for dependency in dependencies]
+        self._entries[rel_path] = {'contentType': content_type, 'dependencies': rel_dependencies,
+                                   'key': self._make_key([rel_path, *rel_dependencies]), 'map': map_dict}
+        return
+
+    def prune(self, content_type, metadata_paths):
+        """
+        Remove the entries of content_type whose metadata file isn't in metadata_paths, e.g. because it was deleted.
+        :return(list): Relative paths of the removed entries.
+        """
+        keep_paths = {self._relative_path(metadata_path) for metadata_path in metadata_paths}
+        removed_paths = [rel_path for rel_path, entry in self._entries.items() if
+                         entry['contentType'] == content_type and rel_path not in keep_paths]
+        for rel_path in removed_paths:
+            del self._entries[rel_path]
+        return removed_paths
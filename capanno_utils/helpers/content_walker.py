@@ -0,0 +1,106 @@
+"""
+Walk the tools, scripts, and workflows directories of a content repo with os.scandir. Directory entries are classified
+with the file type that scandir already read, so the walk doesn't stat each entry, and each directory is only listed
+once. Map builders make their entries from the records the walk yields.
+"""
+
+import os
+from collections import namedtuple
+from pathlib import Path
+from capanno_utils.helpers.get_paths import get_root_tools_dir, get_root_scripts_dir, get_workflows_root_dir
+from capanno_utils.repo_config import common_dir_name, common_tool_metadata_name
+
+ignored_names = ('.DS_Store',)
+
+# path is the directory of the entry, and metadata_path the metadata file its map entries are made from.
+ParentToolRecord = namedtuple('ParentToolRecord', ('tool_name', 'tool_version', 'path', 'metadata_path'))
+SubtoolRecord = namedtuple('SubtoolRecord', ('tool_name', 'tool_version', 'subtool_name', 'path', 'metadata_path',
+                                             'parent_metadata_path'))
+ScriptRecord = namedtuple('ScriptRecord', ('group_name', 'project_name', 'version_name', 'script_name', 'path',
+                                           'metadata_path', 'common_metadata_paths'))
+WorkflowRecord = namedtuple('WorkflowRecord', ('group_name', 'project_name', 'version_name', 'path', 'metadata_path'))
+
+
+def _scan_dirs(path, name=None, skip_names=()):
+    """
+    List the directories in path, in the order the filesystem returns them.
+    :param name(str): Only return the directory called name. path isn't listed.
+    :return(list): (name, path) of each directory.
+    """
+    if name is not None:
+        return [(name, os.path.join(path, name))]
+    dirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name in ignored_names or entry.name in skip_names:
+                continue
+            assert entry.is_dir(), f"{entry.path} is not a directory. You likely have an extra file."
+            dirs.append((entry.name, entry.path))
+    return dirs
+
+
+def walk_tools(base_dir=None, tool_name=None, tool_version=None):
+    """
+    Yield a ParentToolRecord for each tool version, followed by a SubtoolRecord for each subtool directory in it.
+    :param tool_name(str): Only walk this tool.
+    :param tool_version(str): Only walk this version of tool_name.
+    """
+    for tool_dir_name, tool_path in _scan_dirs(get_root_tools_dir(base_dir=base_dir), tool_name):
+        for version_name, version_path in _scan_dirs(tool_path, tool_version):
+            subtool_dirs = _scan_dirs(version_path, skip_names=(common_dir_name,))
+            common_path = Path(version_path, common_dir_name)
+            parent_metadata_path = common_path / common_tool_metadata_name
+            yield ParentToolRecord(tool_dir_name, version_name, common_path, parent_metadata_path)
+            for subtool_dir_name, subtool_path in subtool_dirs:
+                # Subtool directories are named tool_subtool. Works if there are underscores in the tool name.
+                subtool_name = subtool_dir_name[len(tool_dir_name) + 1:] or None
+                metadata_name = f"{tool_dir_name}-{subtool_name}-metadata.yaml" if subtool_name else f"{tool_dir_name}-metadata.yaml"
+                subtool_path = Path(subtool_path)
+                yield SubtoolRecord(tool_dir_name, version_name, subtool_name, subtool_path,
+                                    subtool_path / metadata_name, parent_metadata_path)
+    return
+
+
+def _scan_common_metadata(version_path):
+    """
+    :return(tuple): Sorted paths of the metadata files in the common directory of version_path.
+    """
+    common_path = os.path.join(version_path, common_dir_name)
+    try:
+        with os.scandir(common_path) as entries:
+            return tuple(sorted(Path(entry.path) for entry in entries if entry.name.endswith('-metadata.yaml') and
+                                not entry.name.startswith('.')))
+    except FileNotFoundError:
+        return ()
+
+
+def walk_scripts(base_dir=None, group_name=None, project_name=None, version_name=None):
+    """
+    Yield a ScriptRecord for each script directory. common_metadata_paths are the metadata files in the common directory
+    of the script version.
+    :param group_name(str): Only walk this group. project_name and version_name narrow the walk further.
+    """
+    for group_dir_name, group_path in _scan_dirs(get_root_scripts_dir(base_dir=base_dir), group_name):
+        for project_dir_name, project_path in _scan_dirs(group_path, project_name):
+            for version_dir_name, version_path in _scan_dirs(project_path, version_name):
+                script_dirs = _scan_dirs(version_path, skip_names=(common_dir_name,))
+                common_metadata_paths = _scan_common_metadata(version_path)
+                for script_dir_name, script_path in script_dirs:
+                    script_path = Path(script_path)
+                    yield ScriptRecord(group_dir_name, project_dir_name, version_dir_name, script_dir_name, script_path,
+                                       script_path / f"{script_dir_name}-metadata.yaml", common_metadata_paths)
+    return
+
+
+def walk_workflows(base_dir=None, group_name=None, project_name=None):
+    """
+    Yield a WorkflowRecord for each workflow version directory.
+    :param group_name(str): Only walk this group. project_name narrows the walk further.
+    """
+    for group_dir_name, group_path in _scan_dirs(get_workflows_root_dir(base_dir=base_dir), group_name):
+        for project_dir_name, project_path in _scan_dirs(group_path, project_name):
+            for version_dir_name, version_path in _scan_dirs(project_path):
+                version_path = Path(version_path)
+                yield WorkflowRecord(group_dir_name, project_dir_name, version_dir_name, version_path,
+                                     version_path / f"{project_dir_name}-metadata.yaml")
+    return
@@ -0,0 +1,97 @@
+"""
+Check that the files and directories that job files refer to exist. Job files are validated with checklinks=False, so
+without this a missing input is only found when the job is run.
+"""
+
+import os
+from collections.abc import MutableMapping, MutableSequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+default_max_workers = 32
+
+
+def _resolve_location(location, base_dir):
+    """
+    :return(tuple): (scheme, location). Local paths, relative or file://, are made absolute paths with scheme 'file'.
+    """
+    scheme = urlparse(location).scheme
+    if scheme == 'file':
+        return 'file', url2pathname(urlparse(location).path)
+    if len(scheme) > 1:  # Not a Windows drive letter.
+        return scheme, location
+    return 'file', os.path.normpath(Path(base_dir) / location)
+
+
+def collect_file_locations(job_document, job_path):
+    """
+    Get the location, or path if there's no location, of every File and Directory in a job document, including
+    secondaryFiles and Directory listings. Files given as contents only are skipped.
+    :param job_document(dict): Loaded job file.
+    :param job_path(Path): Path of the job file. Relative locations are relative to its directory.
+    :return(list): (scheme, location) tuples in document order.
+    """
+    base_dir = Path(job_path).parent
+    locations = []
+
+    def collect(value):
+        if isinstance(value, MutableMapping):
+            if value.get('class') in ('File', 'Directory'):
+                location = value.get('location') or value.get('path')
+                if isinstance(location, str):
+                    locations.append(_resolve_location(location, base_dir))
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, MutableSequence):
+            for item in value:
+                collect(item)
+        return
+
+    collect(job_document)
+    return locations
+
+
+def check_local_paths(paths, max_workers=default_max_workers):
+    """
+    stat local paths concurrently.
+    :param paths(list): Absolute paths.
+    :return(dict): path: True if it exists.
+    """
+    if len(paths) < 2:
+        return {path: os.path.exists(path) for path in paths}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+        return dict(zip(paths, executor.map(os.path.exists, paths)))
+
+
+class FileChecker:
+    """
+    Checks the existence of many locations at once. Locations are deduplicated and grouped by scheme, and each scheme's
+    checker is called once with all of its locations.
+    """
+
+    def __init__(self, scheme_checkers=None, max_workers=default_max_workers):
+        """
+        :param scheme_checkers(dict): scheme: function that takes a list of locations and returns {location: bool}.
+            Added to, or replacing, the default checker for 'file'. Locations with other schemes are not checked.
+        :param max_workers(int): Number of threads used to stat local paths.
+        """
+        self.scheme_checkers = {'file': lambda paths: check_local_paths(paths, max_workers=max_workers)}
+        self.scheme_checkers.update(scheme_checkers or {})
+
+    def check(self, locations):
+        """
+        :param locations(iterable): (scheme, location) tuples from collect_file_locations.
+        :return(dict): (scheme, location): True if it exists, False if it doesn't, None if its scheme isn't checked.
+        """
+        scheme_locations = {}
+        for scheme, location in locations:
+            scheme_locations.setdefault(scheme, {})[location] = None  # dict to deduplicate in order.
+        results = {}
+        for scheme, unique_locations in scheme_locations.items():
+            checker = self.scheme_checkers.get(scheme)
+            checked = checker(list(unique_locations)) if checker else {}
+            for location in unique_locations:
+                results[(scheme, location)] = checked.get(location)
+        return results
@@ -0,0 +1,241 @@
+"""
+Sources of file change events for the validation watcher. InotifyEvents gets changes from the Linux kernel as they
+happen. SnapshotPoller finds them by comparing the modification times and sizes of every file, and is used where
+inotify isn't available.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+# From sys/inotify.h
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_ONLYDIR = 0x01000000
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+watch_mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+event_header = struct.Struct('iIII')  # wd, mask, cookie, len
+
+_libc = None
+
+
+def _get_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+    return _libc
+
+
+def inotify_available():
+    """
+    :return(bool): True if the platform has inotify.
+    """
+    if not sys.platform.startswith('linux'):
+        return False
+    try:
+        return hasattr(_get_libc(), 'inotify_init1')
+    except OSError:
+        return False
+
+
+def walk_files(watch_path):
+    """
+    :return(tuple): Paths of directories and of files under watch_path. Hidden files and directories are skipped.
+    """
+    dir_paths = []
+    file_paths = []
+    for dir_path, dir_names, file_names in os.walk(watch_path):
+        dir_names[:] = [dir_name for dir_name in dir_names if not dir_name.startswith('.')]
+        dir_paths.append(dir_path)
+        file_paths.extend(os.path.join(dir_path, file_name) for file_name in file_names if not file_name.startswith('.'))
+    return dir_paths, file_paths
+
+
+def take_snapshot(watch_path):
+    """
+    :return(dict): path of every file under watch_path: (mtime_ns, size). Hidden files and directories are skipped.
+    """
+    snapshot = {}
+    for file_path in walk_files(watch_path)[1]:
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:  # Removed while walking.
+            continue
+        snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def get_changed_files(old_snapshot, new_snapshot):
+    """
+    :return(set): Paths that were added, removed, or modified between two snapshots.
+    """
+    changed_files = set(old_snapshot.keys() ^ new_snapshot.keys())
+    changed_files.update(path for path in old_snapshot.keys() & new_snapshot.keys() if old_snapshot[path] != new_snapshot[path])
+    return changed_files
+
+
+class SnapshotPoller:
+    """
+    Find changed files by walking the watched directories and comparing each file's mtime and size.
+    """
+
+    def __init__(self, watch_paths):
+        """
+        :param watch_paths(list): Directories to watch.
+        """
+        self.watch_paths = [str(watch_path) for watch_path in watch_paths]
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for watch_path in self.watch_paths:
+            snapshot.update(take_snapshot(watch_path))
+        return snapshot
+
+    def poll_changes(self, timeout=0):
+        """
+        :param timeout(float): Seconds to wait before looking for changes.
+        :return(set): Paths of files that changed since the last call.
+        """
+        if timeout:
+            time.sleep(timeout)
+        new_snapshot = self._take_snapshot()
+        changed_files = get_changed_files(self._snapshot, new_snapshot)
+        self._snapshot = new_snapshot
+        return changed_files
+
+    def close(self):
+        return
+
+
+class InotifyEvents:
+    """
+    Get changed files from inotify. Every directory under the watched directories is watched, including directories
+    made after the watch starts.
+    """
+
+    def __init__(self, watch_paths):
+        """
+        :param watch_paths(list): Directories to watch.
+        :raises OSError: If inotify can't be used, e.g. when the limit of watches per user is reached.
+        """
+        self.watch_paths = [str(watch_path) for watch_path in watch_paths]
+        self._libc = _get_libc()
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise self._error('inotify_init1')
+        self._dir_paths = {}  # watch descriptor: directory path
+        try:
+            for watch_path in self.watch_paths:
+                self._watch_tree(watch_path)
+        except OSError:
+            self.close()
+            raise
+
+    def _error(self, function_name, path=None):
+        error_number = ctypes.get_errno()
+        return OSError(error_number, f"{function_name} failed: {os.strerror(error_number)}", path)
+
+    def _watch_tree(self, watch_path):
+        """
+        Watch watch_path and the directories under it.
+        :return(list): Paths of the files under watch_path.
+        """
+        dir_paths, file_paths = walk_files(watch_path)
+        for dir_path in dir_paths:
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dir_path), watch_mask)
+            if wd < 0:
+                if ctypes.get_errno() in (errno.ENOENT, errno.ENOTDIR):  # Removed while walking.
+                    continue
+                raise self._error('inotify_add_watch', dir_path)
+            self._dir_paths[wd] = dir_path
+        return file_paths
+
+    def _unwatch_tree(self, dir_path):
+        """
+        Stop watching dir_path and the directories under it after they are moved away.
+        """
+        for wd, watched_path in list(self._dir_paths.items()):
+            if watched_path == dir_path or watched_path.startswith(dir_path + os.sep):
+                self._libc.inotify_rm_watch(self.fd, wd)
+                del self._dir_paths[wd]
+        return
+
+    def _read_events(self):
+        changed_files = set()
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed_files
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, name_length = event_header.unpack_from(buffer, offset)
+                offset += event_header.size
+                name = os.fsdecode(buffer[offset:offset + name_length].rstrip(b'\0'))
+                offset += name_length
+                if mask & IN_Q_OVERFLOW:
+                    logging.warning("inotify events were lost. Re-validating every watched file.")
+                    for watch_path in self.watch_paths:
+                        changed_files.update(walk_files(watch_path)[1])
+                    continue
+                if mask & IN_IGNORED:
+                    self._dir_paths.pop(wd, None)
+                    continue
+                dir_path = self._dir_paths.get(wd)
+                if dir_path is None or not name or name.startswith('.'):
+                    continue
+                path = os.path.join(dir_path, name)
+                if not mask & IN_ISDIR:
+                    changed_files.add(path)
+                elif mask & (IN_CREATE | IN_MOVED_TO):
+                    changed_files.update(self._watch_tree(path))  # Files may be written before the watch is added.
+                elif mask & IN_MOVED_FROM:
+                    self._unwatch_tree(path)
+        return changed_files
+
+    def poll_changes(self, timeout=0):
+        """
+        :param timeout(float): Seconds to wait for a change if there haven't been any since the last call.
+        :return(set): Paths of files that changed since the last call.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        return self._read_events()
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+        return
+
+
+def get_file_events(watch_paths, use_inotify=None):
+    """
+    :param watch_paths(list): Directories to watch.
+    :param use_inotify(bool): Defaults to using inotify if it is available. Falls back to polling if inotify can't
+        watch every directory.
+    :return(InotifyEvents|SnapshotPoller):
+    """
+    if use_inotify is None:
+        use_inotify = inotify_available()
+    if use_inotify:
+        try:
+            return InotifyEvents(watch_paths)
+        except OSError as e:
+            logging.warning(f"Could not watch for changes with inotify ({e}). Polling for changes instead.")
+    return SnapshotPoller(watch_paths)
@@ -169,14 +169,14 @@ def get_tool_instances_dir_from_metadata_path(metadata_path):
 
 
 def get_tool_cwl_from_instance_path(cwl_instance_path):
-    cwl_instance_path = Path(cwl_instance_path)
-    tool_instance_path_parts = Path(cwl_instance_path).parts
+    cwl_instance_path = Path(cwl_instance_path).absolute()
+    tool_instance_path_parts = cwl_instance_path.parts
     tool_name = tool_instance_path_parts[-5]
     tool_version = tool_instance_path_parts[-4]
-    subtool_name = tool_instance_path_parts[-3]
-    if subtool_name == tool_name:
+    subtool_name = tool_instance_path_parts[-3][len(tool_name) + 1:]  # Subtool directories are named tool_subtool.
+    if not subtool_name:
         subtool_name = main_tool_subtool_name
-    subtool_cwl_path = get_tool_sources(tool_name, tool_version, subtool_name)
+    subtool_cwl_path = get_tool_sources(tool_name, tool_version, subtool_name, base_dir=cwl_instance_path.parents[5])['cwl']
     return subtool_cwl_path
 
 def get_tool_instance_path(tool_name, tool_version, input_hash, subtool_name=None, base_dir=None):
@@ -206,8 +206,8 @@ def get_subtool_metadata_path_from_tool_instance_metadata_path(tool_instance_pat
     tool_instance_path_parts = Path(tool_instance_path).parts
     tool_name = tool_instance_path_parts[-5]
     tool_version = tool_instance_path_parts[-4]
-    subtool_name = tool_instance_path_parts[-3]
-    if subtool_name == tool_name:
+    subtool_name = tool_instance_path_parts[-3][len(tool_name) + 1:]  # Subtool directories are named tool_subtool.
+    if not subtool_name:
         subtool_name = main_tool_subtool_name
     subtool_metadata_path = get_tool_metadata(tool_name, tool_version, subtool_name=subtool_name, base_dir=base_dir)
     return subtool_metadata_path
@@ -299,6 +299,12 @@ def get_script_args_from_path(cwl_script_path):
     return group_name, project_name, script_version, script_name
 
 
+def get_script_cwl_from_instance_path(script_instance_path):
+    script_instance_path = Path(script_instance_path).absolute()
+    group_name, project_name, version, script_name = script_instance_path.parts[-6:-2]
+    return get_cwl_script(group_name, project_name, version, script_name, base_dir=script_instance_path.parents[6])
+
+
 def get_script_instance_path(group_name, project_name, version, script_name, instance_hash, base_dir=None):
     script_instance_dir = get_script_instance_dir(group_name, project_name, version, script_name, base_dir=base_dir)
     instance_path = script_instance_dir / f"{instance_hash}.yaml"
@@ -393,6 +399,38 @@ def get_workflow_instance_metadata(group_name, project_name, version, instance_h
     return instance_metadata_path
 
 
+def get_workflow_path_from_metadata_path(metadata_path, workflow_file=None, workflow_language=None):
+    """
+    Path of the workflow file of a workflow. This is the workflowFile of the metadata, relative to the metadata file, or
+    the file named after the metadata file for the workflowLanguage if the metadata doesn't have a workflowFile.
+    :param workflow_file(str): workflowFile of the metadata.
+    :param workflow_language(str): workflowLanguage of the metadata. Both are read from metadata_path if neither is provided.
+    """
+    metadata_path = Path(metadata_path)
+    if workflow_file is None and workflow_language is None:
+        with metadata_path.open('r') as metadata_file:
+            metadata_dict = safe_load(metadata_file)
+        workflow_file = metadata_dict.get('workflowFile')
+        workflow_language = metadata_dict.get('workflowLanguage', 'wdl')  # Default of WorkflowMetadata.
+    if workflow_file:
+        return metadata_path.parent / workflow_file
+    return get_workflow_sources_from_metadata_path(metadata_path).get(workflow_language)
+
+
+def get_workflow_cwl_from_metadata_path(metadata_path):
+    workflow_path = get_workflow_path_from_metadata_path(metadata_path)
+    if workflow_path is None or workflow_path.suffix != '.cwl':
+        raise ValueError(f"{metadata_path} is not the metadata of a cwl workflow.")
+    return workflow_path
+
+
+def get_workflow_cwl_from_instance_path(workflow_instance_path):
+    workflow_instance_path = Path(workflow_instance_path).absolute()
+    group_name, project_name, version = workflow_instance_path.parts[-5:-2]
+    metadata_path = get_workflow_metadata(group_name, project_name, version, base_dir=workflow_instance_path.parents[5])
+    return get_workflow_cwl_from_metadata_path(metadata_path)
+
+
 def get_workflow_args_from_path(workflow_path):
     workflow_path = Path(workflow_path)
     workflow_path_parts = workflow_path.parts
@@ -603,10 +641,9 @@ def get_dir_type_from_path(abs_dir_path, content_root_repo_name=content_repo_nam
         elif path_parts[-4] == workflows_dir_name:
             assert path_parts[-5] == content_root_repo_name
             dir_type = 'version_dir'
-        elif path_parts[-5] == workflows_dir_name:
+        elif path_parts[-5] == workflows_dir_name and path_parts[-1] == instances_dir_name:
             assert path_parts[-6] == content_root_repo_name
-            dir_type = 'group_dir'
-        # dir type script_dir, instances_dir
+            dir_type = 'instance_dir'
         else:
             raise NotImplementedError
     else:
@@ -0,0 +1,24 @@
+import subprocess
+from pathlib import Path
+
+
+def _run_git(args, cwd):
+    process = subprocess.run(['git', *args], cwd=str(cwd), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed in {cwd}: {process.stderr.strip()}")
+    return process.stdout
+
+
+def get_changed_paths(ref, base_dir):
+    """
+    Get the paths under base_dir that differ between ref and the working tree. Includes uncommitted, deleted and untracked
+    (but not ignored) files.
+    :param ref(str): Any git revision. e.g. 'origin/master', 'HEAD~3'
+    :param base_dir(Path): Root of the content repo. Does not have to be the root of the git repo.
+    :return(list): Sorted paths relative to base_dir.
+    """
+    diff_output = _run_git(['diff', '-z', '--name-only', '--relative', ref, '--'], base_dir)
+    untracked_output = _run_git(['ls-files', '-z', '--others', '--exclude-standard'], base_dir)
+    changed_paths = {Path(line) for line in (diff_output + untracked_output).split('\0') if line}
+    return sorted(changed_paths)
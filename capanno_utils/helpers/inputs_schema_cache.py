@@ -0,0 +1,151 @@
+"""
+Persistent cache of the inputs of cwl tools, so job files can be validated without loading the tool in every new process.
+"""
+
+import json
+import logging
+import os
+from contextlib import contextmanager
+from hashlib import sha1
+from pathlib import Path
+from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+from capanno_utils.helpers.profiling import profile_stage
+from capanno_utils.helpers.validation_cache import get_package_versions
+
+cache_format_version = 2
+
+versioned_packages = ('capanno_utils', 'schema-salad')
+
+default_max_bytes = 64 * 1024 * 1024
+
+reference_keys = (b'$import', b'$include', b'$mixin')  # Inputs of documents with these depend on other files.
+
+_active_caches = []
+
+
+class InputsSchemaCache:
+    """
+    Directory of JSON files that hold the inputs fields of an InputsSchema, which the native validator and the
+    schema-salad schema are both made from. Files are named by the hash of the resolved path and content of the cwl file
+    and the package versions the fields were made with. The path is included because inputs fields can hold URIs of
+    the file they were made from, e.g. in the names of enum symbols. Least recently used files are removed when the directory grows past max_bytes.
+    """
+
+    def __init__(self, cache_dir, max_bytes=default_max_bytes):
+        """
+        :param cache_dir(Path): Directory to store cached schemas in. Made when the first schema is stored.
+        :param max_bytes(int): Total size of cached schemas to keep.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        versions = get_package_versions(versioned_packages)
+        self._key_prefix = json.dumps({'format': cache_format_version, 'versions': versions}, sort_keys=True).encode('utf-8')
+
+    def get_key(self, cwl_path):
+        """
+        :return(str|None): Cache key of cwl_path, or None if its inputs may depend on other files.
+        """
+        cwl_path = Path(cwl_path).resolve()
+        content = cwl_path.read_bytes()
+        if any(reference_key in content for reference_key in reference_keys):
+            return None
+        return sha1(self._key_prefix + os.fsencode(cwl_path) + b'\0' + content).hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / f"{key}.json"
+
+    def get_inputs_fields(self, key):
+        """
+        :return(dict|None): Cached inputs fields, or None if there aren't any.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with entry_path.open('r') as entry_file:
+                inputs_fields = json.load(entry_file)['inputsFields']
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError):
+            logging.warning(f"Could not read cached inputs schema {entry_path}. Making it again.")
+            return None
+        os.utime(entry_path)  # mtime is the last time the entry was used.
+        return inputs_fields
+
+    def put_inputs_fields(self, key, inputs_fields):
+        if not self.cache_dir.exists():
+            self.cache_dir.mkdir(parents=True)
+        entry_path = self._entry_path(key)
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.tmp")
+        with tmp_path.open('w') as entry_file:
+            json.dump({'inputsFields': inputs_fields}, entry_file)
+        tmp_path.replace(entry_path)  # Other processes only ever see complete entries.
+        return entry_path
+
+    def evict(self):
+        """
+        Remove least recently used entries until the total size is at most max_bytes. Stats every entry, so it is called
+        once when use_inputs_schema_cache exits rather than for every entry that is stored.
+        """
+        entries = []
+        for entry_path in self.cache_dir.glob('*.json'):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:  # Removed by another process.
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+        return
+
+    def get_inputs_schema(self, cwl_path, load_tool=None):
+        """
+        Get the InputsSchema of a cwl file, from the cache if it hasn't changed.
+        :param cwl_path(Path): Path of the cwl file.
+        :param load_tool(function): Returns the CommandLineTool object of cwl_path. Only called on a cache miss.
+            The tool is loaded from cwl_path if not provided.
+        :return(InputsSchema):
+        """
+        key = self.get_key(cwl_path)
+        if key is not None:
+            with profile_stage('inputs.schema_cache_get', cwl_path):
+                inputs_fields = self.get_inputs_fields(key)
+            if inputs_fields is not None:
+                return InputsSchema.from_inputs_fields(inputs_fields, cwl_path=cwl_path)
+        inputs_schema = InputsSchema(load_tool() if load_tool else cwl_path)
+        if key is not None:
+            with profile_stage('inputs.schema_cache_put', cwl_path):
+                self.put_inputs_fields(key, inputs_schema.inputs_fields)
+        return inputs_schema
+
+
+def get_inputs_schema_cache():
+    """
+    :return(InputsSchemaCache|None): Cache set by the innermost use_inputs_schema_cache, if any.
+    """
+    return _active_caches[-1] if _active_caches else None
+
+
+@contextmanager
+def use_inputs_schema_cache(cache_dir, evict=True):
+    """
+    Use a cache in cache_dir for the inputs schemas made in the block. Does nothing if cache_dir is None.
+    :param evict(bool): Remove least recently used entries when the block exits. False for blocks that run in worker
+        processes, so the parent evicts once after all workers finish instead of workers removing each other's entries.
+    """
+    if cache_dir is None:
+        yield None
+        return
+    inputs_schema_cache = InputsSchemaCache(cache_dir)
+    _active_caches.append(inputs_schema_cache)
+    try:
+        yield inputs_schema_cache
+    finally:
+        _active_caches.remove(inputs_schema_cache)
+    if evict:
+        inputs_schema_cache.evict()
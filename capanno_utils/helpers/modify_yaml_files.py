@@ -4,9 +4,10 @@ Functions to add, delete, or modify fields in yaml files.
 
 from pathlib import Path
 from ruamel.yaml import round_trip_load, YAML
-from capanno_utils.helpers.get_paths import get_types_from_path
+from capanno_utils.helpers.get_paths import get_base_dir, get_types_from_path
 from capanno_utils.validate import validate_subtool_metadata
-from capanno_utils.content_maps import make_tools_map_dict
+from capanno_utils.content_maps import get_subtool_map_entries
+from capanno_utils.helpers.parent_metadata_cache import use_parent_metadata_cache
 
 
 def add_field_to_to_yaml_file(dict_to_add, yaml_file, after_key=None):
@@ -31,9 +32,11 @@ def add_field_to_to_yaml_file(dict_to_add, yaml_file, after_key=None):
     return
 
 
-def update_subtool_metadata_files(directory_or_file, dict_to_add, after_key=None, base_dir=None):
+def update_subtool_metadata_files(directory_or_file, dict_to_add, after_key=None, base_dir=None, use_catalog=True):
     """
     Use with caution, this can change the contents of all metadata files in a content repository.
+    :param use_catalog(bool): Get subtools from the content catalog made by capanno-map --index if there is one.
+        Otherwise the repo is walked.
     """
     base_type, specific_type = get_types_from_path(directory_or_file)
 
@@ -42,15 +45,13 @@ def update_subtool_metadata_files(directory_or_file, dict_to_add, after_key=None
             add_field_to_to_yaml_file(dict_to_add, directory_or_file, after_key=after_key)
             validate_subtool_metadata(directory_or_file)
         elif specific_type == 'base_dir':  # update all subtool metadata with new fields.
-            tool_map = make_tools_map_dict(base_dir)
-            for identifier, values in tool_map.items():
-                if values['type'] == 'subtool':
-                    metadata_path = values['metadataPath']
+            base_dir = get_base_dir(base_dir)
+            with use_parent_metadata_cache():
+                for identifier, values in get_subtool_map_entries(base_dir, use_catalog=use_catalog).items():
+                    metadata_path = Path(base_dir) / values['metadataPath']
                     # Wrap next two lines in try/except?
-                    add_field_to_to_yaml_file(dict_to_add, metadata_path,after_key=after_key)
+                    add_field_to_to_yaml_file(dict_to_add, metadata_path, after_key=after_key)
                     validate_subtool_metadata(metadata_path)
-                else: # parent metadata
-                    pass
         else:
             raise NotImplementedError
     else:
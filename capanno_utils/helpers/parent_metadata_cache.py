@@ -0,0 +1,70 @@
+"""
+In memory cache of parent tool metadata, so the common-metadata.yaml of a tool version is loaded once for all of its
+subtools instead of once per subtool.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+_active_caches = []
+
+
+class ParentMetadataCache:
+    """
+    Parent metadata keyed by the resolved path of its file and the options it was loaded with. An entry is reused until
+    the mtime or size of its file changes. Cached metadata is shared by every subtool that uses it, so it must not be
+    modified.
+    """
+
+    def __init__(self):
+        self._entries = {}  # (resolved path, options): (mtime_ns, size, parent metadata)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, parent_metadata_path, load_parent, options=()):
+        """
+        :param parent_metadata_path(Path): Path of a common-metadata.yaml file.
+        :param load_parent(function): Called with the resolved path to load the parent metadata if it isn't cached.
+        :param options(tuple): Hashable options that load_parent loads with, e.g. root_repo_path and check_index.
+            Metadata loaded with different options is cached separately.
+        :return(ParentToolMetadata):
+        """
+        parent_metadata_path = Path(parent_metadata_path).resolve()
+        stat = os.stat(parent_metadata_path)
+        key = (parent_metadata_path, options)
+        stored = self._entries.get(key)
+        if stored and stored[:2] == (stat.st_mtime_ns, stat.st_size):
+            self.hits += 1
+            return stored[2]
+        self.misses += 1
+        parent_metadata = load_parent(parent_metadata_path)
+        self._entries[key] = (stat.st_mtime_ns, stat.st_size, parent_metadata)
+        return parent_metadata
+
+    def clear(self):
+        self._entries.clear()
+        return
+
+
+def get_parent_metadata_cache():
+    """
+    :return(ParentMetadataCache|None): Cache set by the innermost use_parent_metadata_cache, if any.
+    """
+    return _active_caches[-1] if _active_caches else None
+
+
+@contextmanager
+def use_parent_metadata_cache(parent_metadata_cache=None):
+    """
+    Share parent metadata between the subtools loaded in the block.
+    :param parent_metadata_cache(ParentMetadataCache): Cache to use. Defaults to the cache that is already in use, or a
+        new one if there isn't one.
+    """
+    if parent_metadata_cache is None:
+        parent_metadata_cache = get_parent_metadata_cache() or ParentMetadataCache()
+    _active_caches.append(parent_metadata_cache)
+    try:
+        yield parent_metadata_cache
+    finally:
+        _active_caches.pop()
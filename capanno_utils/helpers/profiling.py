@@ -0,0 +1,146 @@
+"""
+Wall and CPU time of the stages of validating and mapping content.
+
+Profiling is off unless enabled, and profile_stage does nothing but yield when it is off.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class StageProfiler:
+    """
+    Records one entry per timed stage with the file it was run on, its wall time, and the CPU time of the thread it
+    ran in. Stages can be nested, so the time of an outer stage includes the time of the stages inside it.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.records = []
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+        return
+
+    def disable(self):
+        self.enabled = False
+        return
+
+    def clear(self):
+        with self._lock:
+            self.records = []
+        return
+
+    @contextmanager
+    def stage(self, stage, path=None):
+        if not self.enabled:
+            yield
+            return
+        start_time = time.time()
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            record = {'stage': stage, 'path': str(path) if path is not None else None, 'start': start_time,
+                      'wall': time.perf_counter() - start_wall, 'cpu': time.thread_time() - start_cpu,
+                      'pid': os.getpid(), 'tid': threading.get_ident()}
+            with self._lock:
+                self.records.append(record)
+        return
+
+    def pop_records(self):
+        """
+        Remove and return all records. Used to send records from worker processes back to the main process.
+        """
+        with self._lock:
+            records, self.records = self.records, []
+        return records
+
+    def add_records(self, records):
+        with self._lock:
+            self.records.extend(records)
+        return
+
+    def summary(self):
+        """
+        :return(dict): stage: dict with count, wall, and cpu totals. Ordered by total wall time, slowest first.
+        """
+        stage_totals = {}
+        for record in self.records:
+            totals = stage_totals.setdefault(record['stage'], {'count': 0, 'wall': 0.0, 'cpu': 0.0})
+            totals['count'] += 1
+            totals['wall'] += record['wall']
+            totals['cpu'] += record['cpu']
+        return dict(sorted(stage_totals.items(), key=lambda item: item[1]['wall'], reverse=True))
+
+    def slowest(self, top_n=20):
+        return sorted(self.records, key=lambda record: record['wall'], reverse=True)[:top_n]
+
+    def format_report(self, top_n=20):
+        lines = [f"{'stage':<40} {'count':>7} {'wall (s)':>10} {'cpu (s)':>10}"]
+        for stage, totals in self.summary().items():
+            lines.append(f"{stage:<40} {totals['count']:>7} {totals['wall']:>10.3f} {totals['cpu']:>10.3f}")
+        lines.append('')
+        lines.append(f"{top_n} slowest:")
+        lines.append(f"{'wall (s)':>10} {'cpu (s)':>10}  {'stage':<40} path")
+        for record in self.slowest(top_n):
+            lines.append(f"{record['wall']:>10.3f} {record['cpu']:>10.3f}  {record['stage']:<40} {record['path'] or ''}")
+        return '\n'.join(lines)
+
+    def write_trace(self, outfile_path):
+        """
+        Write records in the Chrome trace event format (viewable in chrome://tracing or Perfetto) along with the stage
+        summary.
+        """
+        outfile_path = Path(outfile_path)
+        trace_events = [{'name': record['stage'], 'ph': 'X', 'ts': round(record['start'] * 1e6),
+                         'dur': round(record['wall'] * 1e6), 'pid': record['pid'], 'tid': record['tid'],
+                         'args': {'path': record['path'], 'cpu': record['cpu']}} for record in self.records]
+        with outfile_path.open('w') as outfile:
+            json.dump({'traceEvents': trace_events, 'stages': self.summary()}, outfile)
+        return outfile_path
+
+
+profiler = StageProfiler()
+
+profile_stage = profiler.stage
+
+
+def add_profile_arguments(parser):
+    """
+    Add the options for profiling to a command line parser.
+    """
+    parser.add_argument('--profile', dest='profile', action='store_true',
+                        help="Print the wall and CPU time of each stage and the slowest files.")
+    parser.add_argument('--profile-top', dest='profile_top', type=int, default=20,
+                        help="Number of slowest files to list with --profile. Defaults to 20.")
+    parser.add_argument('--profile-trace', dest='profile_trace', type=Path,
+                        help="Write a JSON trace of every timed stage. Implies --profile.")
+    return parser
+
+
+@contextmanager
+def profile_command(args):
+    """
+    Profile the body of a command if --profile or --profile-trace was given, then print and write the results.
+    """
+    if not (args.profile or args.profile_trace):
+        yield
+        return
+    profiler.clear()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        print(profiler.format_report(args.profile_top), file=sys.stderr)  # Keep stdout for command output.
+        if args.profile_trace:
+            profiler.write_trace(args.profile_trace)
+    return
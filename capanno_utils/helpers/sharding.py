@@ -0,0 +1,71 @@
+"""
+Split validation of a content repo between CI runners so that each runner takes about the same amount of time.
+"""
+
+import argparse
+import heapq
+import json
+import logging
+from pathlib import Path
+from statistics import median
+
+default_duration = 1.0  # Seconds. Used for every item when no durations have been recorded.
+
+
+def parse_shard(shard):
+    """
+    argparse type for shards given as 'i/N', where i is the 1-based index of the shard and N is the number of shards.
+    :return(tuple): (index, count)
+    """
+    try:
+        index, count = (int(part) for part in shard.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Shard must be given as i/N, e.g. 2/4. Got '{shard}'")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"Shard index must be between 1 and {count}. Got {index}")
+    return index, count
+
+
+def load_durations(report_paths):
+    """
+    Get the time each item took to validate from the JSON reports of earlier runs. Items that had cached stages are
+    skipped because their times don't reflect a full validation. Later reports take precedence.
+    :param report_paths(iterable): Paths of reports written by capanno-validate --report-json.
+    :return(dict): identifier: seconds
+    """
+    durations = {}
+    for report_path in report_paths:
+        report_path = Path(report_path)
+        if not report_path.exists():
+            logging.warning(f"Timing report {report_path} does not exist. Skipping.")
+            continue
+        with report_path.open('r') as report_file:
+            report_dict = json.load(report_file)
+        for item in report_dict.get('items', []):
+            if not item.get('cachedStages'):
+                durations[item['identifier']] = item['wallTime']
+    return durations
+
+
+def partition_identifiers(identifiers, shard_count, durations=None):
+    """
+    Partition identifiers into shards with the longest processing time first heuristic: items are taken from longest to
+    shortest and each is added to the shard with the least total time so far. Items without a recorded duration are
+    assumed to take the median of the recorded durations. Ties are broken by identifier and shard index, so every runner
+    computes the same partition.
+    :param identifiers(iterable): Identifiers of map items, e.g. the keys of make_master_map_dict.
+    :param shard_count(int): Number of shards.
+    :param durations(dict): identifier: seconds from earlier runs.
+    :return(list): shard_count lists of identifiers.
+    """
+    durations = durations or {}
+    fallback_duration = median(durations.values()) if durations else default_duration
+    item_durations = sorted(((durations.get(identifier, fallback_duration), identifier) for identifier in identifiers),
+                            key=lambda item: (-item[0], item[1]))
+    shards = [[] for _ in range(shard_count)]
+    shard_totals = [(0.0, shard_index) for shard_index in range(shard_count)]
+    for duration, identifier in item_durations:
+        total, shard_index = heapq.heappop(shard_totals)
+        shards[shard_index].append(identifier)
+        heapq.heappush(shard_totals, (total + duration, shard_index))
+    return shards
@@ -1,11 +1,18 @@
 import logging
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urldefrag
 from schema_salad.exceptions import ValidationException
 from schema_salad.ref_resolver import file_uri
-from cwltool.load_tool import resolve_and_validate_document, fetch_document
+from schema_salad.sourceline import add_lc_filename
+from schema_salad.utils import yaml_no_ts
+from cwltool.context import LoadingContext
+from cwltool.load_tool import resolve_and_validate_document, fetch_document, default_loader
 from cwltool.main import main as cwl_tool
+from capanno_utils.classes.cwl.partial_load import load_inputs_document_by_yaml
+from capanno_utils.helpers.profiling import profile_stage
 
 
 def validate_cwl_doc_main(cwl_doc_path):
@@ -23,16 +30,227 @@ def validate_cwl_doc_main(cwl_doc_path):
     return
 
 
-def validate_cwl_doc(cwl_doc):
+def _get_document_uri(cwl_doc):
+    cwl_doc = str(cwl_doc)
+    if not (urlparse(cwl_doc)[0] and urlparse(cwl_doc)[0] in ['http', 'https', 'file']):
+        cwl_doc = file_uri(os.path.abspath(cwl_doc))
+    return cwl_doc
+
+
+def _get_file_stat(uri):
+    try:
+        stat = os.stat(urlparse(uri).path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class CwlValidationSession:
+    """
+    Validate many cwl documents with one cwltool loading context so the loader, its fetcher, and the index of documents
+    it has resolved are reused between documents instead of being rebuilt for every file.
+
+    The index entries added while validating a document belong to that document. Only the most recently validated
+    max_documents keep their entries; older documents are evicted from the index. A document's own entries are always
+    dropped before it is validated again because cwltool modifies documents as it processes them. Entries for imported
+    files are kept for other documents that share the import. Files aren't checked for changes on every validation;
+    evict_changed_files is called once per run, or per batch of changes in the watcher, to drop the entries of
+    documents whose files changed since they were read.
+    """
+
+    def __init__(self, max_documents=256):
+        """
+        :param max_documents(int): Number of documents to keep the index entries of.
+        """
+        self.max_documents = max_documents
+        self.loading_context = LoadingContext()
+        self.loading_context.loader = default_loader()
+        self._documents = OrderedDict()  # document uri: (index keys, file uris)
+        self._file_stats = {}  # file uri: (mtime_ns, size) when it was read.
+        self._lock = threading.Lock()
+
+    @property
+    def document_uris(self):
+        return list(self._documents)
+
+    def clear(self):
+        with self._lock:
+            for uri in list(self._documents):
+                self._evict_document(uri)
+            self._file_stats = {}
+        return
+
+    def _evict_document(self, uri):
+        index_keys, _ = self._documents.pop(uri, (set(), set()))
+        loader = self.loading_context.loader
+        for key in index_keys:
+            loader.idx.pop(key, None)
+            loader.cache.pop(key, None)
+        return
+
+    def evict_changed_files(self):
+        """
+        Evict the documents that read files which changed since they were read. Each file is stat'ed once.
+        """
+        with self._lock:
+            used_files = set().union(*(files for _, files in self._documents.values()))
+            self._file_stats = {file: file_stat for file, file_stat in self._file_stats.items() if file in used_files}
+            changed_files = {file for file, file_stat in self._file_stats.items() if _get_file_stat(file) != file_stat}
+            for uri, (_, files) in list(self._documents.items()):
+                if files & changed_files:
+                    self._evict_document(uri)
+            for file in changed_files:
+                del self._file_stats[file]
+        return
+
+    def _add_document(self, uri, index_keys):
+        files = {key.split('#')[0] for key in index_keys if key.startswith('file://')}
+        self._documents[uri] = (index_keys, files)
+        for file in files:
+            self._file_stats.setdefault(file, _get_file_stat(file))  # Keep the stat from when entries were first read.
+        while len(self._documents) > self.max_documents:
+            self._evict_document(next(iter(self._documents)))
+        return
+
+    def _add_to_index(self, fileuri, document):
+        """
+        Add a parsed document to the loader's index the way Loader.fetch does, so the loader uses it instead of reading
+        the file.
+        """
+        loader = self.loading_context.loader
+        missing_identifier = True
+        for identifier in loader.identifiers:
+            if identifier in document:
+                missing_identifier = False
+                loader.idx[loader.expand_url(document[identifier], fileuri, scoped_id=True)] = document
+        if missing_identifier:
+            document[loader.identifiers[0]] = fileuri
+        loader.idx[fileuri] = document
+        return
+
+    def validate(self, cwl_doc, document=None):
+        """
+        :param cwl_doc(str, Path): Path or uri of the cwl document.
+        :param document(CommentedMap): The document already parsed from cwl_doc, so cwltool doesn't read and parse it
+            again. cwltool modifies it while validating, so it shouldn't be used afterwards.
+        """
+        uri = _get_document_uri(cwl_doc)
+        with self._lock:
+            self._evict_document(uri)
+            index = self.loading_context.loader.idx
+            keys_before = set(index)
+            if document is not None:
+                self._add_to_index(urldefrag(uri)[0], document)
+            validated = False
+            try:
+                with profile_stage('cwl.fetch_document', uri):
+                    loading_context, workflow_object, document_uri = fetch_document(uri, self.loading_context)
+                with profile_stage('cwl.resolve_and_validate_document', uri):
+                    resolve_and_validate_document(loading_context, workflow_object, document_uri)
+                validated = True
+            finally:
+                index_keys = set(index) - keys_before
+                self._add_document(uri, index_keys)
+                if not validated:  # Don't let other documents reuse anything from a document that was only partly resolved.
+                    self._evict_document(uri)
+        return
+
+
+_default_session = None
+
+
+def get_default_session():
+    """
+    :return(CwlValidationSession): Session shared by validate_cwl_doc calls in this process.
+    """
+    global _default_session
+    if _default_session is None:
+        _default_session = CwlValidationSession()
+    return _default_session
+
+
+def load_cwl_yaml(uri):
+    """
+    Read and parse a cwl file the way cwltool and the generated cwl classes do, keeping line numbers for error messages.
+    :return(CommentedMap):
+    """
+    with open(urlparse(uri).path, encoding='utf-8') as cwl_file:
+        document = yaml_no_ts().load(cwl_file)
+    add_lc_filename(document, uri)
+    return document
+
+
+class CwlDocument:
+    """
+    A cwl file that is read and parsed once for both cwltool validation and the generated cwl classes (CommandLineTool)
+    that input schemas are made from.
+
+    cwltool modifies the parsed document while validating it, so the CommandLineTool object is loaded from it first.
+    Errors from loading the object are raised when the object is used, not during cwltool validation.
+    """
+
+    def __init__(self, cwl_path, session=None):
+        self.cwl_path = Path(cwl_path)
+        self.uri = _get_document_uri(cwl_path)
+        self.session = session
+        self._document = None
+        self._tool = None
+        self._tool_error = None
+
+    def _get_document(self):
+        if self._document is None:
+            with profile_stage('cwl.parse', self.cwl_path):
+                self._document = load_cwl_yaml(self.uri)
+        return self._document
+
+    def _load_tool(self):
+        if self._tool is not None or self._tool_error is not None:
+            return
+        try:
+            with profile_stage('cwl.load_tool', self.cwl_path):
+                self._tool = load_inputs_document_by_yaml(self._get_document(), self.uri)
+        except Exception as e:
+            self._tool_error = e
+        return
+
+    @property
+    def tool(self):
+        """
+        :return(CommandLineTool): Object made by the generated cwl classes. Only the fields that inputs schemas are made
+            from are loaded. See partial_load.load_inputs_document_by_yaml.
+        """
+        self._load_tool()
+        if self._tool_error is not None:
+            raise self._tool_error
+        return self._tool
+
+    def validate(self):
+        """
+        Validate with cwltool, handing it the parsed document.
+        """
+        self._load_tool()
+        try:
+            document = self._get_document()
+        except Exception:
+            document = None  # Let cwltool read it and report the error.
+        self._document = None  # Parsed again if it is needed after cwltool changes it.
+        (self.session or get_default_session()).validate(self.uri, document=document)
+        return
+
+
+def validate_cwl_doc(cwl_doc, session=None):
     """
     This is adapted from cwltool.main.main and avoids the unnecessary stuff by using cwltool.main.main directly.
-    :param cwl_doc_path:
+    :param cwl_doc(str, Path, dict): Path or uri of the cwl document, or the document itself.
+    :param session(CwlValidationSession): Session to validate paths and uris with. Defaults to one shared session per
+        process. Documents that are passed in as objects are validated with a fresh loading context.
     :return:
     """
     if isinstance(cwl_doc, (Path, str)):  # Can also be CWLObjectType
-        cwl_doc = str(cwl_doc)
-        if not (urlparse(cwl_doc)[0] and urlparse(cwl_doc)[0] in ['http', 'https', 'file']):
-            cwl_doc = file_uri(os.path.abspath(cwl_doc))
-    loading_context, workflow_object, uri = fetch_document(cwl_doc)
-    resolve_and_validate_document(loading_context, workflow_object, uri)
+        (session or get_default_session()).validate(cwl_doc)
+        return
+    with profile_stage('cwl.fetch_document'):
+        loading_context, workflow_object, uri = fetch_document(cwl_doc)
+    with profile_stage('cwl.resolve_and_validate_document', uri):
+        resolve_and_validate_document(loading_context, workflow_object, uri)
     return
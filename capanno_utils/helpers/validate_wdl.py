@@ -1,8 +1,10 @@
 
 
 from WDL import load
+from capanno_utils.helpers.profiling import profile_stage
 
 
 def validate_wdl_doc(wdl_path):
-    load(str(wdl_path))  # load works correctly for validation where parse_document and CLI.check do not.
+    with profile_stage('wdl.load', wdl_path):
+        load(str(wdl_path))  # load works correctly for validation where parse_document and CLI.check do not.
     return
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Persistent cache of content that has already passed validation.
+"""
+
+import importlib
+import json
+import logging
+from functools import lru_cache
+from hashlib import sha1
+from pathlib import Path
+from capanno_utils.repo_config import validation_cache_path, inputs_schema_cache_path
+
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:  # python < 3.8
+    importlib_metadata = None
+
+cache_format_version = 1
+
+versioned_packages = ('capanno_utils', 'cwltool', 'schema-salad', 'miniwdl')
+
+module_names = {'schema-salad': 'schema_salad', 'miniwdl': 'WDL'}  # Import names that aren't the package name.
+
+source_hashed_packages = ('capanno_utils',)  # Can change without a version change, e.g. when run from a source checkout.
+
+
+def get_source_hash(package_dir):
+    """
+    :param package_dir(Path): Directory of a package.
+    :return(str): sha1 hexdigest of the relative paths and contents of the files in package_dir, except compiled files.
+    """
+    package_dir = Path(package_dir)
+    source_hash = sha1()
+    for source_path in sorted(package_dir.rglob('*')):
+        if not source_path.is_file() or '__pycache__' in source_path.parts or source_path.suffix == '.pyc':
+            continue
+        source_hash.update(source_path.relative_to(package_dir).as_posix().encode('utf-8'))
+        source_hash.update(source_path.read_bytes())
+    return source_hash.hexdigest()
+
+
+def _find_package_version(package):
+    """
+    :return(str|None): Version from importlib.metadata, or pkg_resources on python < 3.8, or the __version__ of the
+        module if it isn't an installed distribution. None if it can't be found.
+    """
+    if importlib_metadata is not None:
+        try:
+            return importlib_metadata.version(package)
+        except importlib_metadata.PackageNotFoundError:
+            pass
+    else:
+        try:
+            import pkg_resources
+            return pkg_resources.get_distribution(package).version
+        except Exception:  # pkg_resources not installed, or package isn't a distribution.
+            pass
+    try:
+        module_version = getattr(importlib.import_module(module_names.get(package, package)), '__version__', None)
+    except ImportError:
+        module_version = None
+    return str(module_version) if module_version else None
+
+
+@lru_cache(maxsize=None)
+def get_package_version(package):
+    """
+    Version of a package. Packages in source_hashed_packages also have the hash of their source files, so cached
+    results are discarded when their code changes.
+    :param package(str): Name of the package.
+    :return(str): The version, or 'unknown' if it can't be found.
+    """
+    version = _find_package_version(package)
+    if package in source_hashed_packages:
+        package_dir = Path(importlib.import_module(module_names.get(package, package)).__file__).parent
+        return f"{version or 'source'}+{get_source_hash(package_dir)[:12]}"
+    if version is None:
+        logging.warning(f"Could not find the version of {package}. Cached results will not be discarded when it changes.")
+        return 'unknown'
+    return version
+
+
+def get_package_versions(packages=versioned_packages):
+    """
+    Versions of the packages that determine whether content is valid. Cached results are discarded when any of these change.
+    :param packages(tuple): Names of the packages.
+    :return(dict): package name: version string
+    """
+    return {package: get_package_version(package) for package in packages}
+
+
+def get_file_record(path, stored=None):
+    """
+    Get the mtime, size, and content hash of a file.
+    :param stored(list): Record of path from an earlier call. The file is only read if its mtime or size changed since.
+    :return(list|None): [mtime_ns, size, sha1 hexdigest], or None if path does not exist.
+    """
+    try:
+        stat = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    if stored and stored[0] == stat.st_mtime_ns and stored[1] == stat.st_size:
+        return stored
+    with Path(path).open('rb') as f:
+        digest = sha1(f.read()).hexdigest()
+    return [stat.st_mtime_ns, stat.st_size, digest]
+
+
+class ValidationCache:
+    """
+    Record of (stage, path) pairs that passed validation, keyed by the content hash of the path and of the files it depends on.
+    File hashes are stored with the mtime and size of the file so unchanged files only need to be stat'd.
+    """
+
+    def __init__(self, base_dir, cache_path=None, inputs_schema_cache_dir=None):
+        """
+        :param base_dir(Path): Root path of the content repo. Paths are stored relative to it.
+        :param cache_path(Path): File to persist the cache to. Defaults to .cache/validation_cache.json in base_dir.
+        :param inputs_schema_cache_dir(Path): Directory for InputsSchemaCache. Defaults to .cache/inputs_schemas in base_dir.
+        """
+        self.base_dir = Path(base_dir)
+        self.cache_path = Path(cache_path) if cache_path else self.base_dir / validation_cache_path
+        self.inputs_schema_cache_dir = Path(inputs_schema_cache_dir) if inputs_schema_cache_dir else self.base_dir / inputs_schema_cache_path
+        self.versions = get_package_versions()
+        self._file_hashes = {}  # relative path: [mtime_ns, size, sha1 hexdigest]
+        self._valid = {}  # 'stage:relative path': combined hash of path and dependencies.
+        self.load()
+
+    def load(self):
+        if not self.cache_path.exists():
+            return
+        try:
+            with self.cache_path.open('r') as cache_file:
+                cache_dict = json.load(cache_file)
+        except ValueError:
+            logging.warning(f"Could not read validation cache {self.cache_path}. Starting with an empty cache.")
+            return
+        if cache_dict.get('format') != cache_format_version or cache_dict.get('versions') != self.versions:
+            logging.info(f"Package versions changed since {self.cache_path} was written. Discarding cached results.")
+            return
+        self._file_hashes = cache_dict.get('files', {})
+        self._valid = cache_dict.get('valid', {})
+        return
+
+    def save(self):
+        if not self.cache_path.parent.exists():
+            self.cache_path.parent.mkdir(parents=True)
+        cache_dict = {'format': cache_format_version, 'versions': self.versions, 'files': self._file_hashes,
+                      'valid': self._valid}
+        tmp_path = self.cache_path.with_name(f"{self.cache_path.name}.tmp")
+        with tmp_path.open('w') as cache_file:
+            json.dump(cache_dict, cache_file)
+        tmp_path.replace(self.cache_path)  # Don't leave a half written cache if interrupted.
+        return self.cache_path
+
+    def _relative_path(self, path):
+        path = Path(path)
+        try:
+            return str(path.relative_to(self.base_dir))
+        except ValueError:
+            return str(path)
+
+    def file_hash(self, path):
+        """
+        Return the content hash of path, only reading the file if its mtime or size changed. Returns None if path does not exist.
+        """
+        rel_path = self._relative_path(path)
+        file_record = get_file_record(path, self._file_hashes.get(rel_path))
+        if file_record is None:
+            self._file_hashes.pop(rel_path, None)
+            return None
+        self._file_hashes[rel_path] = file_record
+        return file_record[2]
+
+    def _make_key(self, path, dependencies):
+        key_hash = sha1()
+        for key_path in (path, *dependencies):
+            key_hash.update(self._relative_path(key_path).encode('utf-8'))
+            key_hash.update(str(self.file_hash(key_path)).encode('utf-8'))
+        return key_hash.hexdigest()
+
+    def is_valid(self, stage, path, dependencies=()):
+        """
+        Check if path passed the validation stage in a previous run and neither it nor its dependencies have changed.
+        :param stage(str): Name of the validation stage e.g. 'metadata', 'cwl', 'inputs', 'wdl'
+        :param path(Path): Path of the file validated in the stage.
+        :param dependencies(iterable): Paths of other files that affect the result of validating path.
+        :return(bool):
+        """
+        stored_key = self._valid.get(f"{stage}:{self._relative_path(path)}")
+        if stored_key is None:
+            return False
+        return stored_key == self._make_key(path, dependencies)
+
+    def mark_valid(self, stage, path, dependencies=()):
+        self._valid[f"{stage}:{self._relative_path(path)}"] = self._make_key(path, dependencies)
+        return
@@ -0,0 +1,120 @@
+"""
+Collect validation results for every item of a run instead of stopping at the first failure.
+"""
+
+import json
+import logging
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+
+class ValidationReport:
+    """
+    Results of validating content map items. Each item records its identifier, the stages it was validated in, the
+    stages that failed with the exception that was raised, and how long the item took to validate.
+    """
+
+    def __init__(self):
+        self.items = []
+        self.shard = None  # (index, count) if the report is for one shard of a sharded run.
+
+    @classmethod
+    def load_json(cls, report_path):
+        with Path(report_path).open('r') as report_file:
+            report_dict = json.load(report_file)
+        report = cls()
+        report.items = report_dict['items']
+        if report_dict.get('shard'):
+            report.shard = (report_dict['shard']['index'], report_dict['shard']['count'])
+        return report
+
+    def add_item(self, content_type, identifier, stages, failures, wall_time, cached_stages=()):
+        """
+        :param content_type(str): 'tool' | 'script' | 'workflow'
+        :param identifier(str): Identifier of the map item.
+        :param stages(dict): stage name: path of the file validated in the stage.
+        :param failures(list): dicts with stage, path, exceptionType, and message keys.
+        :param wall_time(float): Seconds spent validating the item.
+        :param cached_stages(iterable): Stages that were skipped because they passed in an earlier run.
+        """
+        self.items.append({'type': content_type, 'identifier': identifier,
+                           'stages': {stage: str(path) for stage, path in stages.items()},
+                           'cachedStages': list(cached_stages), 'failures': failures, 'wallTime': round(wall_time, 4)})
+        return
+
+    @property
+    def failures(self):
+        return [dict(identifier=item['identifier'], type=item['type'], **failure) for item in self.items for failure in
+                item['failures']]
+
+    @property
+    def passed(self):
+        return not any(item['failures'] for item in self.items)
+
+    def summary(self):
+        return {'items': len(self.items), 'failedItems': sum(1 for item in self.items if item['failures']),
+                'failures': len(self.failures), 'wallTime': round(sum(item['wallTime'] for item in self.items), 4)}
+
+    def to_dict(self):
+        report_dict = {'summary': self.summary(), 'items': self.items}
+        if self.shard:
+            report_dict['shard'] = {'index': self.shard[0], 'count': self.shard[1]}
+        return report_dict
+
+    def write_json(self, outfile_path):
+        outfile_path = Path(outfile_path)
+        with outfile_path.open('w') as outfile:
+            json.dump(self.to_dict(), outfile, indent=2)
+        return outfile_path
+
+    def make_junit_tree(self):
+        """
+        One testsuite per content type and one testcase per map item. Each failed stage is a failure of its testcase.
+        """
+        testsuites = ET.Element('testsuites', name='capanno-validate', tests=str(len(self.items)),
+                                failures=str(len(self.failures)))
+        for content_type in sorted({item['type'] for item in self.items}):
+            type_items = [item for item in self.items if item['type'] == content_type]
+            testsuite = ET.SubElement(testsuites, 'testsuite', name=content_type, tests=str(len(type_items)),
+                                      failures=str(sum(len(item['failures']) for item in type_items)),
+                                      time=str(round(sum(item['wallTime'] for item in type_items), 4)))
+            for item in type_items:
+                testcase = ET.SubElement(testsuite, 'testcase', classname=content_type, name=item['identifier'],
+                                         time=str(item['wallTime']))
+                for failure in item['failures']:
+                    failure_element = ET.SubElement(testcase, 'failure', type=failure['exceptionType'],
+                                                    message=f"{failure['stage']}: {failure['message']}")
+                    failure_element.text = f"{failure['path']}\n{failure['message']}"
+        return ET.ElementTree(testsuites)
+
+    def write_junit(self, outfile_path):
+        outfile_path = Path(outfile_path)
+        self.make_junit_tree().write(str(outfile_path), encoding='utf-8', xml_declaration=True)
+        return outfile_path
+
+
+def merge_report_files(report_paths):
+    """
+    Combine the JSON reports of the shards of a sharded run into one report. Logs a warning if shards are missing or
+    repeated, since the result would then not cover the whole repo exactly once.
+    :param report_paths(iterable): Paths of reports written with --report-json.
+    :return(ValidationReport):
+    """
+    merged_report = ValidationReport()
+    shards = []
+    for report_path in report_paths:
+        report = ValidationReport.load_json(report_path)
+        merged_report.items.extend(report.items)
+        if report.shard:
+            shards.append(report.shard)
+    if shards:
+        shard_counts = {count for index, count in shards}
+        if len(shard_counts) > 1:
+            logging.warning(f"Merged reports are from runs with different numbers of shards: {sorted(shard_counts)}")
+        shard_count = max(shard_counts)
+        missing_shards = sorted(set(range(1, shard_count + 1)) - {index for index, count in shards})
+        if missing_shards:
+            logging.warning(f"Reports for shards {missing_shards} of {shard_count} were not merged.")
+        if len(shards) != len(set(shards)):
+            logging.warning("Some shards were merged more than once.")
+    return merged_report
@@ -4,6 +4,8 @@ from pathlib import Path
 from capanno_utils.repo_config import content_repo_name
 from capanno_utils.helpers.get_paths import get_dir_type_from_path
 from capanno_utils.helpers.file_management import dump_dict_to_yaml_output
+from capanno_utils.helpers.content_map_manifest import ContentMapManifest
+from capanno_utils.helpers.profiling import add_profile_arguments, profile_command
 from capanno_utils.content_maps import *
 
 
@@ -18,6 +20,13 @@ def get_parser():
     parser.add_argument('-q', '--quiet', dest='quiet', action='store_true', help="Silence messages to stdout")
     parser.add_argument('--include-exists', dest='exists', action='store_true',
                         help="Include whether workflow files exist for tools in the output. Currently for tools only.")
+    parser.add_argument('--incremental', dest='incremental', action='store_true',
+                        help="Only load metadata files that changed since the last incremental run, and drop entries of deleted files. Entries are stored in .cache/content_map_manifest.json of the root repo path. Only for the root repo path and the tools, scripts, and workflows directories.")
+    parser.add_argument('--index', dest='index', action='store_true',
+                        help="Also update the SQLite catalog of the map in .cache/content_catalog.sqlite of the root repo path. Metadata is loaded incrementally, as with --incremental. Only for the root repo path.")
+    parser.add_argument('-j', '--jobs', dest='jobs', type=int, default=1,
+                        help="Number of processes to load metadata with. Defaults to 1 (serial loading). Only for the root repo path and the tools, scripts, and workflows directories.")
+    add_profile_arguments(parser)
 
     return parser
 
@@ -28,6 +37,11 @@ def main(argsl=None):
 
     parser = get_parser()
     args = parser.parse_args(argsl)
+    with profile_command(args):
+        return make_map_from_args(args)
+
+
+def make_map_from_args(args):
     base_dir = args.root_path.resolve()
     exists = args.exists
     if args.path.is_absolute():
@@ -38,14 +52,25 @@ def main(argsl=None):
     if not full_path.is_dir():
         raise ValueError(f"{full_path} is not a directory")
 
-    base_type, dir_type = get_dir_type_from_path(full_path, content_root_repo_name=base_dir.name)
+    if full_path.resolve() == base_dir:
+        base_type, dir_type = 'base_dir', None
+    else:
+        base_type, dir_type = get_dir_type_from_path(full_path, content_root_repo_name=base_dir.name)
+    if args.index and base_type != 'base_dir':
+        raise ValueError(f"--index can only be used for the root repo path, not {full_path}")
+    manifest = ContentMapManifest(base_dir) if args.incremental or args.index else None
+    if manifest and not (base_type == 'base_dir' or dir_type == 'base_dir'):
+        raise ValueError(f"--incremental can only be used for the root repo path and the tools, scripts, and workflows directories, not {full_path}")
 
-    if base_type == 'base_dir':  # Content source root provided.
+    if args.index:
+        output_map = make_content_catalog(base_dir, specify_exists=exists, jobs=args.jobs, manifest=manifest)
+    elif base_type == 'base_dir':  # Content source root provided.
         # import pdb; pdb.set_trace()
-        output_map = make_master_map_dict(base_dir=base_dir, specify_exists=exists)
+        output_map = make_master_map_dict(base_dir=base_dir, specify_exists=exists, manifest=manifest, jobs=args.jobs)
     elif base_type == 'tool':
         if dir_type == 'base_dir':  # Base tools dir.
-            output_map = make_tools_map_dict(base_dir=base_dir, specify_exists=exists)
+            output_map = make_tools_map_dict(base_dir=base_dir, specify_exists=exists, manifest=manifest,
+                                             jobs=args.jobs)
         elif dir_type == 'tool_dir':
             output_map = make_main_tool_map(tool_name=full_path.name, base_dir=base_dir)
         elif dir_type == 'version_dir':
@@ -63,7 +88,7 @@ def main(argsl=None):
             raise ValueError
     elif base_type == 'script':
         if dir_type == 'base_dir':
-            output_map = make_scripts_map_dict(base_dir=base_dir)
+            output_map = make_scripts_map_dict(base_dir=base_dir, manifest=manifest, jobs=args.jobs)
         elif dir_type == 'group_dir':
             output_map = make_group_script_map(group_name=full_path.name, base_dir=base_dir)
         elif dir_type == 'project_dir':
@@ -80,9 +105,14 @@ def main(argsl=None):
         else:
             raise ValueError
     elif base_type == 'workflow':
-        raise NotImplementedError
+        if dir_type == 'base_dir':
+            output_map = make_workflow_maps_dict(base_dir=base_dir, manifest=manifest, jobs=args.jobs)
+        else:
+            raise NotImplementedError
     else:
         raise ValueError
+    if manifest:
+        manifest.save()
     return dump_dict_to_yaml_output(output_map, args.output_path)
 
 
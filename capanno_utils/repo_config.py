@@ -27,6 +27,8 @@ parent_tool_identifier_pattern = re.compile(r'TL_[0-9a-f]{6}\.[0-9a-f]{2}$')
 
 subtool_identifier_pattern = re.compile(r'TL_[0-9a-f]{6}_[0-9a-f]{2}\.[0-9a-f]{2}$')
 
+script_identifier_pattern = re.compile(r'ST_[0-9a-f]{6}\.[0-9a-f]{2}$')
+
 tool_instance_identifier_pattern = re.compile(r'TL_[0-9a-f]{6}_[0-9a-f]{2}\.[0-9a-f]{2}\.[0-9a-f]{4}$')
 
 workflow_identifier_pattern = re.compile(r'WF_[0-9a-f]{6}\.[0-9a-f]{2}$')
@@ -65,6 +67,30 @@ tool_index_file_name = 'tools_index'
 
 tool_index_path = identifier_index_dir / tool_index_file_name
 
+validation_cache_file_name = 'validation_cache.json'
+
+validation_cache_path = identifier_index_dir / validation_cache_file_name
+
+inputs_schema_cache_dir_name = 'inputs_schemas'
+
+inputs_schema_cache_path = identifier_index_dir / inputs_schema_cache_dir_name
+
+job_templates_dir_name = 'job_templates'
+
+job_templates_path = identifier_index_dir / job_templates_dir_name
+
+content_map_manifest_file_name = 'content_map_manifest.json'
+
+content_map_manifest_path = identifier_index_dir / content_map_manifest_file_name
+
+content_catalog_file_name = 'content_catalog.sqlite'
+
+content_catalog_path = identifier_index_dir / content_catalog_file_name
+
+validation_socket_name = 'validate.sock'
+
+validation_socket_path = identifier_index_dir / validation_socket_name
+
 
 def make_config_dict(base_path):
     base_path = Path(base_path)  # Make sure any string values are turned into Path objects.
@@ -1,15 +1,20 @@
 from pathlib import Path
-from capanno_utils.make_content_maps import make_tools_map_dict
+from capanno_utils.content_maps import get_subtool_map_entries
 from capanno_utils.classes.metadata.tool_metadata import SubtoolMetadata
 from capanno_utils.helpers.get_paths import *
+from capanno_utils.helpers.parent_metadata_cache import use_parent_metadata_cache
 
 unpublished_statuses = ('Draft', 'Incomplete')
 
-def update_all_tools_to_released(base_dir=None, update_dir=None):
-    tool_map = make_tools_map_dict(base_dir=base_dir, specify_exists=True)
+def update_all_tools_to_released(base_dir=None, update_dir=None, use_catalog=True):
+    """
+    :param use_catalog(bool): Get subtools from the content catalog made by capanno-map --index --include-exists if
+        there is one. Otherwise the repo is walked.
+    """
+    subtool_entries = get_subtool_map_entries(base_dir=base_dir, specify_exists=True, use_catalog=use_catalog)
 
-    for identifier, values in tool_map.items():
-        if values['type'] == 'subtool':
+    with use_parent_metadata_cache():  # Subtools of a tool version share their parent metadata.
+        for identifier, values in subtool_entries.items():
             update_existing_tool_wrapper_status(values, base_dir=base_dir, update_dir=update_dir)
 
     return
@@ -1,14 +1,22 @@
 import tempfile
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from ruamel.yaml import safe_load
 from semantic_version import Version
-from capanno_utils.classes.metadata.tool_metadata import ParentToolMetadata, SubtoolMetadata
+from capanno_utils.classes.metadata.tool_metadata import ParentToolMetadata, SubtoolMetadata, ToolInstanceMetadata
 from capanno_utils.classes.metadata.script_metadata import ScriptMetadata, CommonScriptMetadata
 from capanno_utils.classes.metadata.workflow_metadata import WorkflowMetadata
 from .content_maps import *
-from .helpers.get_paths import get_metadata_path, get_base_dir, get_tool_sources_from_metadata_path, get_workflow_sources_from_metadata_path
-from .helpers.validate_cwl import validate_cwl_doc
+from .helpers.get_paths import get_metadata_path, get_base_dir, get_tool_sources_from_metadata_path, get_workflow_path_from_metadata_path, get_tool_instances_dir_from_cwl_path, get_types_from_path
+from .helpers.git_tools import get_changed_paths
+from .helpers.inputs_schema_cache import InputsSchemaCache, get_inputs_schema_cache, use_inputs_schema_cache
+from .helpers.parent_metadata_cache import use_parent_metadata_cache
+from .helpers.profiling import profiler, profile_stage
+from .helpers.sharding import partition_identifiers
+from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+from .helpers.validate_cwl import CwlDocument
 from .helpers.validate_wdl import validate_wdl_doc
 from .validate_inputs import validate_all_inputs_for_tool
 
@@ -16,7 +24,8 @@ from .validate_inputs import validate_all_inputs_for_tool
 def metadata_validator_factory(class_to_validate):
     def metadata_validator(metadata_path):
         try:
-            metadata_instance = class_to_validate.load_from_file(metadata_path)
+            with profile_stage(f"metadata.{class_to_validate.__name__}", metadata_path):
+                metadata_instance = class_to_validate.load_from_file(metadata_path)
             # print(f"Metadata in {metadata_path} is valid {str(class_to_validate)}")
             logging.info(f"Metadata in {metadata_path} is valid {str(class_to_validate)}")
         except:
@@ -29,188 +38,584 @@ def metadata_validator_factory(class_to_validate):
 
 validate_parent_tool_metadata = metadata_validator_factory(ParentToolMetadata)
 validate_subtool_metadata = metadata_validator_factory(SubtoolMetadata)
+validate_tool_instance_metadata = metadata_validator_factory(ToolInstanceMetadata)
 validate_script_metadata = metadata_validator_factory(ScriptMetadata)
 validate_common_script_metadata = metadata_validator_factory(CommonScriptMetadata)
 validate_workflow_metadata = metadata_validator_factory(WorkflowMetadata)
 
 
-def validate_tool_content_from_map(tool_map_dict, base_dir=None):
+def _get_instance_paths(instances_dir):
+    if not instances_dir.exists():
+        return []
+    return sorted(instance_file for instance_file in instances_dir.iterdir() if instance_file_pattern.match(instance_file.name))
+
+
+def _get_tool_validation_stages(values, base_dir):
     """
-    tool_map(dict): Keys are identifers, values are dict with path, metadataStatus, name, versionName, and type keys.
+    Get the validation stages that apply to an entry of a tool map.
+    :return(dict): stage name: (path validated in the stage, tuple of paths the result of the stage also depends on)
     """
     validate_statuses = ('Draft', 'Released')
+    metadata_path = base_dir / values['metadataPath']
+    if values['type'] == 'parent':
+        return {'metadata': (metadata_path, ())}
+    parent_metadata_path = metadata_path.parents[1] / common_dir_name / common_tool_metadata_name
+    stages = {'metadata': (metadata_path, (parent_metadata_path,))}
+    tool_sources = get_tool_sources_from_metadata_path(metadata_path)
+    if values['cwlStatus'] in validate_statuses:
+        stages['cwl'] = (tool_sources['cwl'], ())
+        instances_dir = get_tool_instances_dir_from_cwl_path(tool_sources['cwl'])
+        stages['inputs'] = (tool_sources['cwl'], tuple(_get_instance_paths(instances_dir)))
+    if values['wdlStatus'] in validate_statuses:
+        stages['wdl'] = (tool_sources['wdl'], ())
+    return stages
+
+
+def _check_file_exists(path):
+    if not path.exists():
+        raise FileNotFoundError(f"{str(path)} does not exist.")
+    return
+
+
+def _run_stage(stage, path, validate, failures, keep_going=False):
+    """
+    Run a single validation stage on path. If keep_going, the failure is added to failures instead of being raised.
+    """
+    try:
+        with profile_stage(stage, path):
+            validate(path)
+    except Exception as e:
+        if not keep_going:
+            raise
+        logging.error(f"{stage} validation of {path} failed: {e}")
+        failures.append({'stage': stage, 'path': str(path), 'exceptionType': type(e).__name__, 'message': str(e)})
+    return
+
+
+def _get_inputs_schema(cwl_path, load_tool=None):
+    """
+    Get the InputsSchema of a cwl file from the active InputsSchemaCache, if there is one.
+    :param load_tool(function): Returns the already loaded tool or workflow of cwl_path. cwl_path is loaded if not provided.
+    """
+    inputs_schema_cache = get_inputs_schema_cache()
+    if inputs_schema_cache is None:
+        return InputsSchema(load_tool() if load_tool else cwl_path)
+    return inputs_schema_cache.get_inputs_schema(cwl_path, load_tool=load_tool)
+
+
+def _validate_cwl_and_inputs(cwl_path, failures, skip_stages=(), keep_going=False):
+    """
+    Validate a cwl file with cwltool and its instances against its inputs. The file is only read and parsed once.
+    """
+    cwl_document = CwlDocument(cwl_path)
+    if 'cwl' not in skip_stages:
+        _run_stage('cwl', cwl_path, lambda path: cwl_document.validate(), failures, keep_going)
+    if 'inputs' not in skip_stages:
+        _run_stage('inputs', cwl_path,
+                   lambda path: validate_all_inputs_for_tool(path, inputs_schema=_get_inputs_schema(
+                       path, load_tool=lambda: cwl_document.tool)),
+                   failures, keep_going)
+    return
+
+
+def _validate_tool_map_item(identifier, values, base_dir, skip_stages=(), keep_going=False):
+    """
+    Validate the metadata and workflow language files for a single entry of a tool map. Kept at module level so it can be
+    sent to worker processes.
+    skip_stages(tuple): Names of stages from _get_tool_validation_stages that don't need to be validated again.
+    keep_going(bool): Validate every stage and return the failures instead of raising the first one.
+    :return(list): Failed stages.
+    """
+    validate_statuses = ('Draft', 'Released')
+    metadata_path = base_dir / values['metadataPath']
+    tool_type = values['type']
+    failures = []
+
+    if tool_type == 'parent':  # could now also get type directly from path.
+        if not 'common' in metadata_path.parts:
+            raise ValueError(f"")
+        if 'metadata' not in skip_stages:
+            _run_stage('metadata', metadata_path, validate_parent_tool_metadata, failures, keep_going)
+    else:  # is a subtool
+        if 'metadata' not in skip_stages:
+            _run_stage('metadata', metadata_path, validate_subtool_metadata, failures, keep_going)
+        tool_sources = get_tool_sources_from_metadata_path(metadata_path)
+        cwl_path, wdl_path, sm_path, nf_path = tuple(tool_sources.values())
+        cwl_status = values['cwlStatus']
+        if cwl_status in validate_statuses:
+            _validate_cwl_and_inputs(cwl_path, failures, skip_stages, keep_going)
+        if values['wdlStatus'] in validate_statuses and 'wdl' not in skip_stages:
+            _run_stage('wdl', wdl_path, validate_wdl_doc, failures, keep_going)
+        if values['nextflowStatus'] in validate_statuses:
+            _run_stage('nextflow', nf_path, _check_file_exists, failures, keep_going)
+            logging.info(f"Nexflow files are not validated. {nf_path}")
+        if values['snakemakeStatus'] in validate_statuses:
+            _run_stage('snakemake', sm_path, _check_file_exists, failures, keep_going)
+            logging.info(f"Snakemake files are not validated {sm_path}")
+    return failures
+
+
+def _timed_validate_item(validate_item, identifier, values, base_dir, skip_stages=(), keep_going=False,
+                         collect_profile=False, inputs_schema_cache_dir=None):
+    """
+    Call validate_item and time it. Errors raised outside of a stage are reported as an 'item' failure if keep_going.
+    collect_profile(bool): Profile the item and return the records. Used to get profiles back from worker processes.
+    inputs_schema_cache_dir(Path): If provided, inputs schemas of unchanged cwl files are read from an InputsSchemaCache here.
+        The caller evicts old entries once all items are validated.
+    :return(tuple): list of failures, wall time in seconds, list of profile records.
+    """
+    if collect_profile:
+        profiler.clear()  # Forked workers start with a copy of the parent's records.
+        profiler.enable()
+    start_time = time.perf_counter()
+    try:
+        with use_inputs_schema_cache(inputs_schema_cache_dir, evict=False), use_parent_metadata_cache():
+            failures = validate_item(identifier, values, base_dir, skip_stages, keep_going)
+    except Exception as e:
+        if not keep_going:
+            raise
+        logging.error(f"Validation of {identifier} failed: {e}")
+        failures = [{'stage': 'item', 'path': str(values.get('metadataPath') or values.get('path')),
+                     'exceptionType': type(e).__name__, 'message': str(e)}]
+    wall_time = time.perf_counter() - start_time
+    return failures, wall_time, profiler.pop_records() if collect_profile else []
+
+
+def _validate_map_items(validate_item, get_stages, map_dict, base_dir, jobs=1, cache=None, report=None,
+                        content_type=None):
+    """
+    Run validate_item for every entry of a content map.
+    :param validate_item(function): Validates one map entry. Called with identifier, values, base_dir, skip_stages, keep_going.
+    :param get_stages(function): Returns the stages that apply to a map entry. Only used if cache or report is provided.
+    :param jobs(int): Number of worker processes used to validate map entries. Entries are validated serially if jobs is 1.
+        Errors are raised in map order regardless of which worker finishes first.
+    :param cache(ValidationCache): If provided, stages that passed in an earlier run and haven't changed are skipped, and
+        inputs schemas are cached in cache.inputs_schema_cache_dir.
+    :param report(ValidationReport): If provided, every entry is validated and results are added to the report instead
+        of raising the first error.
+    :param content_type(str): 'tool' | 'script' | 'workflow'. Used to label items in report.
+    """
+    keep_going = report is not None
+    inputs_schema_cache_dir = cache.inputs_schema_cache_dir if cache else None
+    item_stages = {}
+    skip_stages = {}
+    for identifier, values in map_dict.items():
+        if cache or report:
+            item_stages[identifier] = get_stages(values, base_dir)
+        if cache:
+            skip_stages[identifier] = tuple(stage for stage, (path, dependencies) in item_stages[identifier].items() if
+                                            cache.is_valid(stage, path, dependencies))
+        else:
+            skip_stages[identifier] = ()
+
+    def finish_item(identifier, failures, wall_time, profile_records):
+        profiler.add_records(profile_records)
+        failed_stages = {failure['stage'] for failure in failures}
+        if cache and 'item' not in failed_stages:
+            for stage, (path, dependencies) in item_stages[identifier].items():
+                if stage not in failed_stages:
+                    cache.mark_valid(stage, path, dependencies)
+        if report is not None:
+            stages = {stage: path for stage, (path, dependencies) in item_stages[identifier].items() if
+                      stage not in skip_stages[identifier]}
+            report.add_item(content_type, identifier, stages, failures, wall_time, cached_stages=skip_stages[identifier])
+        return
+
+    try:
+        if jobs and jobs > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor, use_parent_metadata_cache():  # Forked workers keep it between items.
+                futures = {identifier: executor.submit(_timed_validate_item, validate_item, identifier, values, base_dir,
+                                                       skip_stages[identifier], keep_going, profiler.enabled,
+                                                       inputs_schema_cache_dir)
+                           for identifier, values in map_dict.items()}
+                try:
+                    for identifier, future in futures.items():
+                        finish_item(identifier, *future.result())  # Re-raises the error from the worker.
+                except:
+                    for future in futures.values():
+                        future.cancel()  # Don't start items that are still queued.
+                    raise
+        else:
+            with use_parent_metadata_cache():
+                for identifier, values in map_dict.items():
+                    finish_item(identifier, *_timed_validate_item(validate_item, identifier, values, base_dir,
+                                                                  skip_stages[identifier], keep_going,
+                                                                  inputs_schema_cache_dir=inputs_schema_cache_dir))
+    finally:
+        if cache:
+            cache.save()  # Keep results of items that passed before a failure.
+            InputsSchemaCache(inputs_schema_cache_dir).evict()
+    return
+
+
+def validate_tool_content_from_map(tool_map_dict, base_dir=None, jobs=1, cache=None, report=None):
+    """
+    tool_map(dict): Keys are identifers, values are dict with path, metadataStatus, name, versionName, and type keys.
+    jobs(int): Number of worker processes used to validate map entries. Entries are validated serially if jobs is 1.
+        Errors are raised in map order regardless of which worker finishes first.
+    cache(ValidationCache): If provided, content that passed validation before and hasn't changed is skipped.
+    report(ValidationReport): If provided, all entries are validated and failures are collected in the report instead
+        of raising the first one.
+    """
     if base_dir is None:
         base_dir = get_base_dir()
-    for identifier, values in tool_map_dict.items():
-        metadata_path = base_dir / values['metadataPath']
-        tool_type = values['type']
-
-        if tool_type == 'parent':  # could now also get type directly from path.
-            if not 'common' in metadata_path.parts:
-                raise ValueError(f"")
-            validate_parent_tool_metadata(metadata_path)
-        else:  # is a subtool
-            validate_subtool_metadata(metadata_path)
-            tool_sources = get_tool_sources_from_metadata_path(metadata_path)
-            cwl_path, wdl_path, sm_path, nf_path = tuple(tool_sources.values())
-            cwl_status = values['cwlStatus']
-            if cwl_status in validate_statuses:
-                validate_cwl_doc(cwl_path)
-                validate_all_inputs_for_tool(cwl_path)
-            if values['wdlStatus'] in validate_statuses:
-                validate_wdl_doc(wdl_path)
-            if values['nextflowStatus'] in validate_statuses:
-                if not nf_path.exists():
-                    raise FileNotFoundError(f"{str(nf_path)} does not exist.")
-                logging.info(f"Nexflow files are not validated. {nf_path}")
-            if values['snakemakeStatus'] in validate_statuses:
-                if not sm_path.exists():
-                    raise FileNotFoundError(f"{str(sm_path)} does not exist.")
-                logging.info(f"Snakemake files are not validated {sm_path}")
-    return
-
-
-def validate_tools_dir(base_dir=None):
+    _validate_map_items(_validate_tool_map_item, _get_tool_validation_stages, tool_map_dict, base_dir, jobs=jobs,
+                        cache=cache, report=report, content_type='tool')
+    return
+
+
+def validate_tools_dir(base_dir=None, jobs=1, cache=None, report=None):
     """
     Validate all cwl files, metadata files, instances and instance metadata in a tools directory
     :return:
     """
 
     tool_map_dict = make_tools_map_dict(base_dir=base_dir)
-    validate_tool_content_from_map(tool_map_dict, base_dir)
+    validate_tool_content_from_map(tool_map_dict, base_dir, jobs=jobs, cache=cache, report=report)
 
     return
 
 
-def validate_main_tool_directory(tool_name, base_dir=None):
+def validate_main_tool_directory(tool_name, base_dir=None, jobs=1, cache=None, report=None):
     """
     Validate all content in a tool directory. All versions, subtools, etc.
     """
     tool_map_dict = make_main_tool_map(tool_name, base_dir=base_dir)
-    validate_tool_content_from_map(tool_map_dict, base_dir)
+    validate_tool_content_from_map(tool_map_dict, base_dir, jobs=jobs, cache=cache, report=report)
     return
 
 
-def validate_tool_version_dir(tool_name, tool_version, base_dir=None):
+def validate_tool_version_dir(tool_name, tool_version, base_dir=None, jobs=1, cache=None, report=None):
     tool_version_map = make_tool_version_dir_map(tool_name, tool_version, base_dir=base_dir)
-    validate_tool_content_from_map(tool_version_map, base_dir=base_dir)
+    validate_tool_content_from_map(tool_version_map, base_dir=base_dir, jobs=jobs, cache=cache, report=report)
     return
 
 
-def validate_tool_common_dir(tool_name, tool_version, base_dir=None):
+def validate_tool_common_dir(tool_name, tool_version, base_dir=None, cache=None, report=None):
     common_tool_map = make_tool_common_dir_map(tool_name, tool_version, base_dir=base_dir)
-    validate_tool_content_from_map(common_tool_map, base_dir=base_dir)
+    validate_tool_content_from_map(common_tool_map, base_dir=base_dir, cache=cache, report=report)
     return
 
 
-def validate_subtool_dir(tool_name, version_name, subtool_name=None, base_dir=None):
+def validate_subtool_dir(tool_name, version_name, subtool_name=None, base_dir=None, cache=None, report=None):
     subtool_dir_map = make_subtool_map(tool_name, version_name, subtool_name, base_dir=base_dir)
-    validate_tool_content_from_map(subtool_dir_map, base_dir=base_dir)
+    validate_tool_content_from_map(subtool_dir_map, base_dir=base_dir, cache=cache, report=report)
     return
 
 
 # Scripts stuff
 
-def validate_script_content_from_map(script_map_dict, base_dir=None):
+def _get_script_validation_stages(values, base_dir):
+    """
+    Get the validation stages that apply to an entry of a script map. Script metadata can inherit from any metadata in
+    the common directory of the script version, so all of it is treated as a dependency.
+    :return(dict): stage name: (path validated in the stage, tuple of paths the result of the stage also depends on)
+    """
+    script_path = base_dir / values['path']
+    metadata_path = get_metadata_path(script_path)
+    common_dir = script_path.parents[1] / common_dir_name
+    common_metadata_paths = tuple(sorted(common_dir.glob('*-metadata.yaml'))) if common_dir.exists() else ()
+    stages = {'metadata': (metadata_path, common_metadata_paths)}
+    if values['cwlStatus'] in ('Draft', 'Released'):
+        stages['cwl'] = (script_path, ())
+        instances_dir = get_tool_instances_dir_from_cwl_path(script_path)
+        stages['inputs'] = (script_path, tuple(_get_instance_paths(instances_dir)))
+    return stages
+
+
+def _validate_script_map_item(identifier, values, base_dir, skip_stages=(), keep_going=False):
+    # validate metadata
+    script_path = base_dir / values['path']
+    metadata_path = get_metadata_path(script_path)
+    failures = []
+    if 'metadata' not in skip_stages:
+        _run_stage('metadata', metadata_path, validate_script_metadata, failures, keep_going)
+
+    # validate cwl
+    cwl_status = values['cwlStatus']
+    if cwl_status in ('Draft', 'Released'):
+        _validate_cwl_and_inputs(script_path, failures, skip_stages, keep_going)
+    return failures
+
+
+def validate_script_content_from_map(script_map_dict, base_dir=None, cache=None, report=None):
     if base_dir is None:
         base_dir = get_base_dir()
-    for identifier, values in script_map_dict.items():
-        # validate metadata
-        script_path = base_dir / values['path']
-        metadata_path = get_metadata_path(script_path)
-        validate_script_metadata(metadata_path)
-
-        # validate cwl
-        cwl_status = values['cwlStatus']
-        if cwl_status in ('Draft', 'Released'):
-            validate_cwl_doc(script_path)
-            validate_all_inputs_for_tool(script_path)
+    _validate_map_items(_validate_script_map_item, _get_script_validation_stages, script_map_dict, base_dir,
+                        cache=cache, report=report, content_type='script')
     return
 
 
-def validate_scripts_dir(base_dir=None):
+def validate_scripts_dir(base_dir=None, cache=None, report=None):
     script_map_temp_file = tempfile.NamedTemporaryFile(prefix='scripts_map', suffix='.yaml',
                                                        delete=True)  # Change to False if file doesn't persist long enough.
     make_script_maps(script_map_temp_file.name, base_dir=base_dir)
     with script_map_temp_file as script_map:
         script_map_dict = safe_load(script_map)
-    validate_script_content_from_map(script_map_dict, base_dir)
+    validate_script_content_from_map(script_map_dict, base_dir, cache=cache, report=report)
     return
 
 
-def validate_group_scripts_dir(group_name, base_dir=None):
+def validate_group_scripts_dir(group_name, base_dir=None, cache=None, report=None):
     group_script_map = make_group_script_map(group_name, base_dir=base_dir)
-    validate_script_content_from_map(group_script_map, base_dir=base_dir)
+    validate_script_content_from_map(group_script_map, base_dir=base_dir, cache=cache, report=report)
     return
 
 
-def validate_project_scripts_dir(group_name, project_name, base_dir=None):
+def validate_project_scripts_dir(group_name, project_name, base_dir=None, cache=None, report=None):
     project_script_map = make_project_script_map(group_name, project_name, base_dir=base_dir)
-    validate_script_content_from_map(project_script_map, base_dir=base_dir)
+    validate_script_content_from_map(project_script_map, base_dir=base_dir, cache=cache, report=report)
     return
 
 
-def validate_version_script_dir(group_name, project_name, version_name, base_dir=None):
+def validate_version_script_dir(group_name, project_name, version_name, base_dir=None, cache=None, report=None):
     version_script_map = make_script_version_map(group_name, project_name, version_name, base_dir=base_dir)
-    validate_script_content_from_map(version_script_map, base_dir=base_dir)
+    validate_script_content_from_map(version_script_map, base_dir=base_dir, cache=cache, report=report)
     return
 
 
-def validate_script_dir(group_name, project_name, version_name, script_name, base_dir=None):
+def validate_script_dir(group_name, project_name, version_name, script_name, base_dir=None, cache=None, report=None):
     script_map = make_script_map(group_name, project_name, version_name, script_name, base_dir=base_dir)
-    validate_script_content_from_map(script_map, base_dir=base_dir)
+    validate_script_content_from_map(script_map, base_dir=base_dir, cache=cache, report=report)
     return
 
 # ## Workflows stuff
 
-def validate_workflows_from_map(workflow_map_dict, base_dir=None):
+def _get_workflow_path(values, base_dir):
+    """
+    Path of the workflow file of a workflow map entry. Defaults to the file named after the metadata file if the metadata
+    doesn't have a workflowFile.
+    """
+    return get_workflow_path_from_metadata_path(base_dir / values['metadataPath'], values['workflowPath'],
+                                                values['workflowLanguage'])
+
+
+def _get_workflow_validation_stages(values, base_dir):
+    metadata_path = base_dir / values['metadataPath']
+    stages = {'metadata': (metadata_path, ())}
+    if values['workflowStatus'] in ('Draft', 'Released') and values['workflowLanguage'] == 'cwl':
+        workflow_path = _get_workflow_path(values, base_dir)
+        instances_dir = get_tool_instances_dir_from_cwl_path(workflow_path)
+        stages['inputs'] = (workflow_path, tuple(_get_instance_paths(instances_dir)))
+    return stages
+
+
+def _validate_workflow_map_item(identifier, values, base_dir, skip_stages=(), keep_going=False):
+    workflow_metadata = base_dir / values['metadataPath']
+    failures = []
+    if 'metadata' not in skip_stages:
+        _run_stage('metadata', workflow_metadata, validate_workflow_metadata, failures, keep_going)
+
+    wf_status = values['workflowStatus']
+    if wf_status in ('Draft', 'Released'):
+        wf_language = values['workflowLanguage']
+        workflow_path = _get_workflow_path(values, base_dir)
+        _run_stage('workflow', workflow_path, _check_file_exists, failures, keep_going)
+        if wf_language == 'cwl' and 'inputs' not in skip_stages and workflow_path.exists():
+            _run_stage('inputs', workflow_path,
+                       lambda path: validate_all_inputs_for_tool(path, inputs_schema=_get_inputs_schema(path)),
+                       failures, keep_going)
+        logging.debug(
+            f"Make sure you validate {workflow_path}")  # Todo. Think I have good way to validate somewhere. Need to port here (needs to be put in a temporary directory with the tools and workflows that it calls.)
+    return failures
+
+
+def validate_workflows_from_map(workflow_map_dict, base_dir=None, cache=None, report=None):
     if base_dir is None:
         base_dir = get_base_dir()
-    for identifier, values in workflow_map_dict.items():
-        workflow_metadata = base_dir / values['metadataPath']
-        validate_workflow_metadata(workflow_metadata)
-
-        wf_status = values['workflowStatus']
-        if wf_status in ('Draft', 'Released'):
-            wf_language = values['workflowLanguage']
-            try:
-                workflow_path = workflow_metadata.parent / values['workflowPath']
-            except TypeError:
-                print(values)
-                raise
-            if not workflow_path.exists():
-                raise FileNotFoundError(f"{str(workflow_path)} does not exist.")
-            logging.debug(
-                f"Make sure you validate {workflow_path}")  # Todo. Think I have good way to validate somewhere. Need to port here (needs to be put in a temporary directory with the tools and workflows that it calls.)
+    _validate_map_items(_validate_workflow_map_item, _get_workflow_validation_stages, workflow_map_dict, base_dir,
+                        cache=cache, report=report, content_type='workflow')
     return
 
 
-def validate_workflows_dir(base_dir=None):
+def validate_workflows_dir(base_dir=None, cache=None, report=None):
 
     workflow_map_dict = make_workflow_maps_dict(base_dir=base_dir)
-    validate_workflows_from_map(workflow_map_dict, base_dir)
+    validate_workflows_from_map(workflow_map_dict, base_dir, cache=cache, report=report)
     return
 
-def validate_workflow_group_dir(group_name, base_dir=None):
+def validate_workflow_group_dir(group_name, base_dir=None, cache=None, report=None):
 
     workflow_map_dict = make_group_workflow_map(group_name, base_dir)
-    validate_workflows_from_map(workflow_map_dict, base_dir)
+    validate_workflows_from_map(workflow_map_dict, base_dir, cache=cache, report=report)
     return
 
-def validate_workflow_project_dir(group_name, project_name, base_dir=None):
+def validate_workflow_project_dir(group_name, project_name, base_dir=None, cache=None, report=None):
     workflow_map_dict = make_project_workflow_map(group_name, project_name, base_dir)
-    validate_workflows_from_map(workflow_map_dict, base_dir)
+    validate_workflows_from_map(workflow_map_dict, base_dir, cache=cache, report=report)
     return
 
-def validate_workflow_version_dir(group_name, project_name, version_name, base_dir=None):
+def validate_workflow_version_dir(group_name, project_name, version_name, base_dir=None, cache=None, report=None):
     workflow_map_dict = make_version_workflow_map(group_name, project_name, version_name, base_dir)
-    validate_workflows_from_map(workflow_map_dict, base_dir)
+    validate_workflows_from_map(workflow_map_dict, base_dir, cache=cache, report=report)
     return
 
 # Whole repo
 
-def validate_repo(base_dir=None):
-    validate_tools_dir(base_dir=base_dir)
-    validate_scripts_dir(base_dir=base_dir)
-    validate_workflows_dir(base_dir=base_dir)
+def validate_repo(base_dir=None, jobs=1, cache=None, report=None):
+    validate_tools_dir(base_dir=base_dir, jobs=jobs, cache=cache, report=report)
+    validate_scripts_dir(base_dir=base_dir, cache=cache, report=report)
+    validate_workflows_dir(base_dir=base_dir, cache=cache, report=report)
     return
+
+
+def validate_shard(shard_index, shard_count, base_dir=None, durations=None, jobs=1, cache=None, report=None):
+    """
+    Validate one shard of the repo. The items of make_master_map_dict are partitioned so that shards take about the
+    same time to validate according to durations, and every shard can be validated by a separate process or CI runner.
+    :param shard_index(int): 1-based index of the shard to validate.
+    :param shard_count(int): Number of shards the repo is split into.
+    :param durations(dict): identifier: seconds it took to validate the item in an earlier run.
+    :return(tuple): The tool, script, and workflow maps that were validated.
+    """
+    base_dir = Path(get_base_dir(base_dir))
+    master_map = make_master_map_dict(base_dir=base_dir)
+    shard_identifiers = set(partition_identifiers(master_map, shard_count, durations)[shard_index - 1])
+    shard_maps = {'TL_': {}, 'ST_': {}, 'WF_': {}}
+    for identifier, values in master_map.items():
+        if identifier in shard_identifiers:
+            shard_maps[identifier[:3]][identifier] = values
+    tool_map, script_map, workflow_map = shard_maps.values()
+    logging.info(f"Shard {shard_index}/{shard_count} has {len(tool_map)} tools, {len(script_map)} scripts, and "
+                 f"{len(workflow_map)} workflows of {len(master_map)} items.")
+    if report is not None:
+        report.shard = (shard_index, shard_count)
+    if tool_map:
+        validate_tool_content_from_map(tool_map, base_dir, jobs=jobs, cache=cache, report=report)
+    if script_map:
+        validate_script_content_from_map(script_map, base_dir, cache=cache, report=report)
+    if workflow_map:
+        validate_workflows_from_map(workflow_map, base_dir, cache=cache, report=report)
+    return tool_map, script_map, workflow_map
+
+
+# Changed content
+
+def _get_entity_from_changed_path(rel_path, base_dir):
+    """
+    Find the content entity that a changed path belongs to.
+    :param rel_path(Path): Path relative to base_dir. Does not need to exist; deleted files still affect their entity.
+    :return(tuple|None): (base type, entity type, path args of the entity) or None if the path is not content.
+    """
+    full_path = base_dir / rel_path
+    if full_path.exists():
+        try:
+            base_type, file_type = get_types_from_path(rel_path, root_repo_name=base_dir.name, base_path=base_dir)
+        except (ValueError, AssertionError, NotImplementedError):
+            logging.debug(f"{rel_path} is not a content file. Skipping.")
+            return None
+    else:
+        base_type = {tools_dir_name: 'tool', scripts_dir_name: 'script', workflows_dir_name: 'workflow'}.get(
+            rel_path.parts[0])
+        file_type = None
+    parts = rel_path.parts
+    if base_type == 'tool' and len(parts) > 4:
+        if parts[3] == common_dir_name or file_type == 'common_metadata':
+            return base_type, 'version_dir', parts[1:3]
+        subtool_name = parts[3][len(parts[1]) + 1:] or None
+        return base_type, 'subtool_dir', (*parts[1:3], subtool_name)
+    elif base_type == 'script' and len(parts) > 5:
+        if parts[4] == common_dir_name:
+            return base_type, 'version_dir', parts[1:4]
+        return base_type, 'script_dir', parts[1:5]
+    elif base_type == 'workflow' and len(parts) > 4:
+        return base_type, 'version_dir', parts[1:4]
+    logging.debug(f"{rel_path} is not part of a tool, script or workflow. Skipping.")
+    return None
+
+
+def _get_referenced_tools(metadata_path):
+    with metadata_path.open('r') as metadata_file:
+        metadata = safe_load(metadata_file) or {}
+    return metadata.get('tools') or []
+
+
+def _get_called_identifiers(metadata_path):
+    with metadata_path.open('r') as metadata_file:
+        metadata = safe_load(metadata_file) or {}
+    return {str(call.get('identifier')).strip() for call in metadata.get('callMap') or [] if call.get('identifier')}
+
+
+def make_changed_content_maps(changed_paths, base_dir=None):
+    """
+    Make the smallest tool, script, and workflow maps that cover a set of changed paths. A changed subtool brings in its
+    parent, a changed common directory brings in the whole version directory, and scripts and workflows that reference a
+    changed tool or script are included as well.
+    :param changed_paths(iterable): Paths relative to base_dir, e.g. from helpers.git_tools.get_changed_paths
+    :return(tuple): tool map, script map, workflow map
+    """
+    base_dir = Path(get_base_dir(base_dir))
+    entities = set()
+    for rel_path in changed_paths:
+        entity = _get_entity_from_changed_path(Path(rel_path), base_dir)
+        if entity:
+            entities.add(entity)
+
+    tool_map, script_map, workflow_map = {}, {}, {}
+    for base_type, entity_type, args in sorted(entities, key=str):
+        if base_type == 'tool':
+            tool_name, tool_version = args[:2]
+            if not get_tool_metadata(tool_name, tool_version, parent=True, base_dir=base_dir).exists():
+                continue  # Version was deleted.
+            tool_map.update(make_tool_common_dir_map(tool_name, tool_version, base_dir=base_dir))
+            if entity_type == 'version_dir':
+                tool_map.update(make_tool_version_dir_map(tool_name, tool_version, base_dir=base_dir))
+            elif get_tool_metadata(*args, base_dir=base_dir).exists():
+                tool_map.update(make_subtool_map(*args, base_dir=base_dir))
+        elif base_type == 'script':
+            if not get_script_version_dir(*args[:3], base_dir=base_dir).exists():
+                continue  # Version was deleted.
+            if entity_type == 'version_dir':
+                script_map.update(make_script_version_map(*args, base_dir=base_dir))
+            elif get_script_dir(*args, base_dir=base_dir).exists():
+                script_map.update(make_script_map(*args, base_dir=base_dir))
+        elif base_type == 'workflow':
+            if get_workflow_metadata(*args, base_dir=base_dir).exists():
+                workflow_map.update(make_version_workflow_map(*args, base_dir=base_dir))
+
+    # Scripts list tools by identifier or by name.
+    tool_identifiers = set(tool_map)
+    tool_names = {values['name'].lower() for values in tool_map.values() if values['type'] == 'parent'}
+    if tool_identifiers:
+        for metadata_path in sorted(get_root_scripts_dir(base_dir=base_dir).glob('*/*/*/*/*-metadata.yaml')):
+            for tool in _get_referenced_tools(metadata_path):
+                identifier = tool.get('identifier')
+                if identifier in tool_identifiers or (not identifier and str(tool.get('name')).lower() in tool_names):
+                    group_name, project_name, version_name, script_name = metadata_path.parent.parts[-4:]
+                    if script_name == common_dir_name:
+                        script_map.update(make_script_version_map(group_name, project_name, version_name, base_dir=base_dir))
+                    else:
+                        script_map.update(make_script_map(group_name, project_name, version_name, script_name, base_dir=base_dir))
+                    break
+
+    called_identifiers = tool_identifiers | set(script_map)
+    if called_identifiers:
+        for metadata_path in sorted(get_workflows_root_dir(base_dir=base_dir).glob('*/*/*/*-metadata.yaml')):
+            if _get_called_identifiers(metadata_path) & called_identifiers:
+                workflow_map.update(make_version_workflow_map(*metadata_path.parent.parts[-3:], base_dir=base_dir))
+    return tool_map, script_map, workflow_map
+
+
+def validate_changed_content(ref, base_dir=None, jobs=1, cache=None, path=None, report=None):
+    """
+    Validate only the content affected by changes since a git ref.
+    :param ref(str): git revision to compare the working tree to.
+    :param path(Path): If provided, only changes under this path are considered.
+    :return(tuple): The tool, script, and workflow maps that were validated.
+    """
+    base_dir = Path(get_base_dir(base_dir))
+    changed_paths = get_changed_paths(ref, base_dir)
+    if path is not None:
+        rel_path = get_relative_path(Path(path), base_path=base_dir)
+        changed_paths = [changed_path for changed_path in changed_paths if
+                         rel_path in (changed_path, *changed_path.parents)]
+    tool_map, script_map, workflow_map = make_changed_content_maps(changed_paths, base_dir=base_dir)
+    logging.info(f"{len(changed_paths)} changed paths since {ref} affect {len(tool_map)} tools, {len(script_map)} "
+                 f"scripts, and {len(workflow_map)} workflows.")
+    if tool_map:
+        validate_tool_content_from_map(tool_map, base_dir, jobs=jobs, cache=cache, report=report)
+    if script_map:
+        validate_script_content_from_map(script_map, base_dir, cache=cache, report=report)
+    if workflow_map:
+        validate_workflows_from_map(workflow_map, base_dir, cache=cache, report=report)
+    return tool_map, script_map, workflow_map
@@ -3,37 +3,198 @@
 import argparse
 import sys
 import logging
+import time
 from pathlib import Path
 from capanno_utils.validate import *
-from capanno_utils.validate_inputs import validate_inputs_for_instance
-from capanno_utils.helpers.validate_cwl import validate_cwl_doc
+from capanno_utils.validate import _run_stage
+from capanno_utils.validate_inputs import validate_instances
+from capanno_utils.helpers.validate_cwl import get_default_session, validate_cwl_doc
 from capanno_utils.helpers.validate_wdl import validate_wdl_doc
-from capanno_utils.helpers.get_paths import get_types_from_path
+from capanno_utils.helpers.get_paths import get_types_from_path, get_tool_sources, get_cwl_script, get_tool_cwl_from_instance_path, get_script_cwl_from_instance_path, get_workflow_cwl_from_instance_path, get_workflow_metadata, get_workflow_cwl_from_metadata_path
+from capanno_utils.helpers.inputs_schema_cache import use_inputs_schema_cache
+from capanno_utils.helpers.validation_cache import ValidationCache
+from capanno_utils.helpers.sharding import parse_shard, load_durations
+from capanno_utils.helpers.validation_report import ValidationReport, merge_report_files
+from capanno_utils.helpers.profiling import add_profile_arguments, profile_command
+from capanno_utils.validation_server import serve, get_socket_path
+from capanno_utils.validation_watcher import ContentWatcher
 
 
 def get_parser():
     parser = argparse.ArgumentParser(description="Validate metadata and workflow language files.")
-    parser.add_argument('path', type=Path,
-                        help='Provide the path to validate. If a directory is specified, all content in the directory will be validated. If a file is specified, only that file will be validated.')
+    parser.add_argument('path', type=Path, nargs='?',
+                        help='Provide the path to validate. If a directory is specified, all content in the directory will be validated. If a file is specified, only that file will be validated. Defaults to the root repo path.')
     parser.add_argument('-p', '--root-repo-path', dest='root_path', type=Path, default=Path.cwd(),
                         help="Specify the root path of your content repo if it is not the current working directory.")
     parser.add_argument('-q', '--quiet', dest='quiet', action='store_true', help="Silence messages to stdout")
+    parser.add_argument('-j', '--jobs', dest='jobs', type=int, default=1,
+                        help="Number of processes to validate tools with. Defaults to 1 (serial validation).")
+    parser.add_argument('--cache', dest='cache', action='store_true',
+                        help="Skip content that passed validation in an earlier run and has not changed since, and reuse the inputs schemas of unchanged cwl files. Results are stored in the .cache directory of the root repo path.")
+    parser.add_argument('--check-files', dest='check_files', action='store_true',
+                        help="When validating an instances directory, also check that the File and Directory inputs of the instances exist.")
+    parser.add_argument('--since', dest='since', metavar='REF',
+                        help="Only validate content under path that changed since the git REF, along with parent tools, instances, and the scripts and workflows that reference changed content.")
+
+    parser.add_argument('-k', '--keep-going', dest='keep_going', action='store_true',
+                        help="Validate all content in path and report every failure instead of stopping at the first one.")
+    parser.add_argument('--report-json', dest='report_json', type=Path,
+                        help="Write a JSON report of the validated content, failures, and time per item. Implies --keep-going.")
+    parser.add_argument('--junit-xml', dest='junit_xml', type=Path,
+                        help="Write a JUnit XML report of the validated content. Implies --keep-going.")
+    parser.add_argument('--shard', dest='shard', type=parse_shard, metavar='i/N',
+                        help="Split the repo into N shards that take about the same time to validate and only validate shard i (1-based). Use to validate the repo on N CI runners.")
+    parser.add_argument('--shard-timings', dest='shard_timings', type=Path, nargs='+', metavar='REPORT',
+                        help="JSON reports from earlier runs to balance --shard with. Items are assumed to take the same time if not provided.")
+    parser.add_argument('--merge-reports', dest='merge_reports', type=Path, nargs='+', metavar='REPORT',
+                        help="Combine the JSON reports of each shard into one result, written with --report-json and --junit-xml, instead of validating.")
+    parser.add_argument('--watch', dest='watch', action='store_true',
+                        help="Watch path for changes and re-validate the files affected by each change until interrupted.")
+    parser.add_argument('--serve', dest='serve', action='store_true',
+                        help="Start a long-lived validation server that keeps validation libraries loaded. Send it requests with capanno-validate-client.")
+    parser.add_argument('--socket', dest='socket_path', type=Path,
+                        help="Unix socket for --serve to listen on. Defaults to .cache/validate.sock in the root repo path.")
+    add_profile_arguments(parser)
 
     return parser
 
 
-def main(argsl=None):
+def finish_report(report, args):
+    """
+    Write the requested report files and print failures.
+    :return(int): 1 if anything failed validation, otherwise 0.
+    """
+    if args.report_json:
+        report.write_json(args.report_json)
+    if args.junit_xml:
+        report.write_junit(args.junit_xml)
+    summary = report.summary()
+    if not args.quiet:
+        for failure in report.failures:
+            print(f"{failure['identifier']} failed {failure['stage']} validation ({failure['path']}): "
+                  f"{failure['exceptionType']}: {failure['message']}")
+        print(f"{summary['items'] - summary['failedItems']} of {summary['items']} items are valid.")
+    return 0 if report.passed else 1
+
+
+def validate_file(full_path, content_type, stage, validate, report=None):
+    """
+    Validate a single file. If report is provided, the file is added to it as an item named by its path and a failure
+    is recorded instead of raised.
+    :param content_type(str): 'tool' | 'script' | 'workflow'
+    :param stage(str): Name of the validation stage e.g. 'metadata', 'cwl', 'wdl'
+    :param validate(function): Called with full_path.
+    """
+    if report is None:
+        validate(full_path)
+        return
+    failures = []
+    start_time = time.perf_counter()
+    _run_stage(stage, full_path, validate, failures, keep_going=True)
+    report.add_item(content_type, str(full_path), {stage: full_path}, failures, time.perf_counter() - start_time)
+    return
+
+
+def validate_instances_dir(cwl_path, args, report=None, cache=None, instance_paths=None):
+    """
+    Validate every instance of a tool, script, or workflow against its cwl file. The inputs schema is made once for all
+    of them. Failures are added to report if provided, otherwise the first one is raised after all instances are validated.
+    :param cache(ValidationCache): If provided, the inputs schema is read from and stored in its inputs schema cache.
+    :param instance_paths(list): Instances to validate. Defaults to all instances of cwl_path.
+    """
+    with use_inputs_schema_cache(cache.inputs_schema_cache_dir if cache else None):
+        results = validate_instances(cwl_path, instance_paths=instance_paths, jobs=args.jobs, use_processes=True,
+                                     check_files=args.check_files)
+    if report is not None:
+        results.add_to_report(report)
+    else:
+        results.raise_first_failure()
+    if not args.quiet:
+        print(f"{len(results.results) - len(results.failures)} of {len(results.results)} instances of {cwl_path} are valid.")
+    return results
+
+
+def resolve_path_args(args, cwd):
+    """
+    Make relative path arguments of args relative to cwd instead of the working directory of the process.
+    """
+    for dest, value in vars(args).items():
+        if isinstance(value, Path) and not value.is_absolute():
+            setattr(args, dest, cwd / value)
+        elif isinstance(value, list) and value and all(isinstance(item, Path) for item in value):
+            setattr(args, dest, [item if item.is_absolute() else cwd / item for item in value])
+    return args
+
+
+def main(argsl=None, cwd=None):
+    """
+    :param cwd(Path): Directory that relative paths in argsl, and the default root repo path, are relative to. Defaults
+        to the working directory. Used by the validation server to run requests without changing directory.
+    """
     if not argsl:
         argsl = sys.argv[1:]
 
     parser = get_parser()
+    if cwd is not None:
+        parser.set_defaults(root_path=Path(cwd))
     args = parser.parse_args(argsl)
+    if cwd is not None:
+        resolve_path_args(args, Path(cwd))
+    with profile_command(args):
+        return validate_from_args(args, parser)
+
 
-    if args.path.is_absolute():
+def validate_from_args(args, parser):
+    if args.serve:
+        serve(get_socket_path(args.root_path, args.socket_path), quiet=args.quiet)
+        return
+
+    if args.merge_reports:
+        return finish_report(merge_report_files(args.merge_reports), args)
+
+    get_default_session().evict_changed_files()  # Files may have changed since the last run in this process, e.g. in the validation server.
+    if args.path is None:
+        full_path = args.root_path
+    elif args.path.is_absolute():
         full_path = args.path
     else:
         full_path = args.root_path / args.path
 
+    if args.watch:
+        ContentWatcher(args.root_path, watch_path=full_path).run(quiet=args.quiet)
+        return
+
+    cache = ValidationCache(args.root_path) if args.cache else None
+    report = ValidationReport() if (args.keep_going or args.report_json or args.junit_xml) else None
+
+    if args.shard:
+        if args.since or full_path.resolve() != args.root_path.resolve():
+            parser.error("--shard can only be used to validate the whole repo.")
+        shard_index, shard_count = args.shard
+        durations = load_durations(args.shard_timings) if args.shard_timings else None
+        if not args.quiet:
+            print(f"Validating shard {shard_index}/{shard_count} of {str(full_path)} \n")
+        tool_map, script_map, workflow_map = validate_shard(shard_index, shard_count, base_dir=args.root_path,
+                                                            durations=durations, jobs=args.jobs, cache=cache,
+                                                            report=report)
+        if report is not None:
+            return finish_report(report, args)
+        if not args.quiet:
+            print(f"{len(tool_map)} tools, {len(script_map)} scripts, and {len(workflow_map)} workflows are valid.")
+        return
+
+    if args.since:
+        if not args.quiet:
+            print(f"Validating content in {str(full_path)} changed since {args.since} \n")
+        tool_map, script_map, workflow_map = validate_changed_content(args.since, base_dir=args.root_path,
+                                                                      jobs=args.jobs, cache=cache, path=full_path,
+                                                                      report=report)
+        if report is not None:
+            return finish_report(report, args)
+        if not args.quiet:
+            print(f"{len(tool_map)} tools, {len(script_map)} scripts, and {len(workflow_map)} workflows are valid.")
+        return
+
     base_type, specific_type = get_types_from_path(full_path, root_repo_name=args.root_path.name,
                                                    base_path=args.root_path)
 
@@ -43,103 +204,115 @@ def main(argsl=None):
     if base_type == 'tool':
         # Check for file types.
         if specific_type == 'common_metadata':
-            validate_parent_tool_metadata(full_path)
+            validate_file(full_path, 'tool', 'metadata', validate_parent_tool_metadata, report=report)
         elif specific_type == 'cwl':  # Todo add validation for other files.
-            validate_cwl_doc(full_path)
+            validate_file(full_path, 'tool', 'cwl', validate_cwl_doc, report=report)
         elif specific_type == 'wdl':
-            validate_wdl_doc(full_path)
+            validate_file(full_path, 'tool', 'wdl', validate_wdl_doc, report=report)
         elif specific_type == 'metadata':
-            validate_subtool_metadata(full_path)
+            validate_file(full_path, 'tool', 'metadata', validate_subtool_metadata, report=report)
         elif specific_type == 'instance':
-            validate_inputs_for_instance(full_path)
+            validate_instances_dir(get_tool_cwl_from_instance_path(full_path), args, report=report, cache=cache,
+                                   instance_paths=[full_path])
         elif specific_type == 'instance_metadata':
-            raise NotImplementedError
+            validate_file(full_path, 'tool', 'metadata', validate_tool_instance_metadata, report=report)
         # Check for directory types.
         elif specific_type == 'base_dir':
-            validate_tools_dir(base_dir=args.root_path)
+            validate_tools_dir(base_dir=args.root_path, jobs=args.jobs, cache=cache, report=report)
         elif specific_type == 'tool_dir':
             tool_name = full_path.parts[-1]
-            validate_main_tool_directory(tool_name, base_dir=args.root_path)
+            validate_main_tool_directory(tool_name, base_dir=args.root_path, jobs=args.jobs, cache=cache, report=report)
         elif specific_type == 'version_dir':
             tool_name, version_name = full_path.parts[-2:]
-            validate_tool_version_dir(tool_name, version_name, base_dir=args.root_path)
+            validate_tool_version_dir(tool_name, version_name, base_dir=args.root_path, jobs=args.jobs, cache=cache, report=report)
         elif specific_type == 'common_dir':
             tool_name, version_name = full_path.parts[-3:-1]
-            validate_tool_common_dir(tool_name, version_name, base_dir=args.root_path)
+            validate_tool_common_dir(tool_name, version_name, base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'subtool_dir':
             path_parts = full_path.parts
             tool_name, version_name = path_parts[-3:-1]
             subtool_name = path_parts[-1][len(tool_name) + 1:]
             if subtool_name == '':
                 subtool_name = None
-            validate_subtool_dir(tool_name, version_name, subtool_name, base_dir=args.root_path)
-        elif specific_type == 'instance_dir':  # Must do the same as validating a subtool directory. Could skip validating subtool metadata, but won't. Don't see use for that.
+            validate_subtool_dir(tool_name, version_name, subtool_name, base_dir=args.root_path, cache=cache, report=report)
+        elif specific_type == 'instance_dir':
             path_parts = full_path.parts
             tool_name, version_name = path_parts[-4:-2]
             subtool_name = path_parts[-2][len(tool_name) + 1:]
             if subtool_name == '':
                 subtool_name = None
-            validate_subtool_dir(tool_name, version_name, subtool_name=subtool_name, base_dir=args.root_path)
+            cwl_path = get_tool_sources(tool_name, version_name, subtool_name, base_dir=args.root_path)['cwl']
+            validate_instances_dir(cwl_path, args, report=report, cache=cache)
         else:
             raise ValueError(f"Cannot validate tool path {full_path}")
     elif base_type == 'script':
         if specific_type == 'cwl':  # Todo. Add support for other wf types.
-            validate_cwl_doc(full_path)
+            validate_file(full_path, 'script', 'cwl', validate_cwl_doc, report=report)
         elif specific_type == 'metadata':
-            validate_script_metadata(full_path)
+            validate_file(full_path, 'script', 'metadata', validate_script_metadata, report=report)
         elif specific_type == 'instance':
-            validate_inputs_for_instance(full_path)
+            validate_instances_dir(get_script_cwl_from_instance_path(full_path), args, report=report, cache=cache,
+                                   instance_paths=[full_path])
         elif specific_type == 'instance_metadata':
-            raise NotImplementedError
+            parser.error(f"Only tool instance metadata can be validated, not script instance metadata {full_path}")
         # Check for directory types.
         elif specific_type == 'base_dir':
-            validate_scripts_dir(base_dir=args.root_path)
+            validate_scripts_dir(base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'group_dir':
             group_name = full_path.parts[-1]
-            validate_group_scripts_dir(group_name, base_dir=args.root_path)
+            validate_group_scripts_dir(group_name, base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'project_dir':
             group_name, project_name = full_path.parts[-2:]
-            validate_project_scripts_dir(group_name, project_name, base_dir=args.root_path)
+            validate_project_scripts_dir(group_name, project_name, base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'version_dir':
             group_name, project_name, version_name = full_path.parts[-3:]
-            validate_version_script_dir(group_name, project_name, version_name, base_dir=args.root_path)
+            validate_version_script_dir(group_name, project_name, version_name, base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'script_dir':
             group_name, project_name, version_name, script_name = full_path.parts[-4:]
-            validate_script_dir(group_name, project_name, version_name, script_name, base_dir=args.root_path)
+            validate_script_dir(group_name, project_name, version_name, script_name, base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'instance_dir':
             group_name, project_name, version_name, script_name = full_path.parts[-5:-1]
-            validate_script_dir(group_name, project_name, version_name, script_name, base_dir=args.root_path)
+            cwl_path = get_cwl_script(group_name, project_name, version_name, script_name, base_dir=args.root_path)
+            validate_instances_dir(cwl_path, args, report=report, cache=cache)
         else:
             raise ValueError(f"Cannot validate script path {full_path}")
 
     elif base_type == 'workflow':
         if specific_type == 'base_dir':
-            validate_workflows_dir(base_dir=args.root_path)
+            validate_workflows_dir(base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'group_dir':
             group_name = full_path.parts[-1]
-            validate_workflow_group_dir(group_name, base_dir=args.root_path)
+            validate_workflow_group_dir(group_name, base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'project_dir':
             group_name, project_name = full_path.parts[-2:]
-            validate_workflow_project_dir(group_name, project_name, base_dir=args.root_path)
+            validate_workflow_project_dir(group_name, project_name, base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'version_dir':
             group_name, project_name, version_name = full_path.parts[-3:]
-            validate_workflow_version_dir(group_name, project_name, version_name, base_dir=args.root_path)
+            validate_workflow_version_dir(group_name, project_name, version_name, base_dir=args.root_path, cache=cache, report=report)
         elif specific_type == 'cwl':  # Todo. Add other wf language types.
-            raise NotImplementedError
+            validate_file(full_path, 'workflow', 'cwl', validate_cwl_doc, report=report)
         elif specific_type == 'metadata':
-            validate_workflow_metadata(full_path)
+            validate_file(full_path, 'workflow', 'metadata', validate_workflow_metadata, report=report)
         elif specific_type == 'instance':
-            raise NotImplementedError
+            validate_instances_dir(get_workflow_cwl_from_instance_path(full_path), args, report=report, cache=cache,
+                                   instance_paths=[full_path])
         elif specific_type == 'instance_metadata':
-            raise NotImplementedError
+            parser.error(f"Only tool instance metadata can be validated, not workflow instance metadata {full_path}")
+        elif specific_type == 'instance_dir':
+            group_name, project_name, version_name = full_path.parts[-4:-1]
+            metadata_path = get_workflow_metadata(group_name, project_name, version_name, base_dir=args.root_path)
+            cwl_path = get_workflow_cwl_from_metadata_path(metadata_path)
+            validate_instances_dir(cwl_path, args, report=report, cache=cache)
         else:
             raise ValueError(f"Cannot validate workflow path {full_path}")
     elif base_type == 'repo_root':
-        validate_repo(full_path)
+        validate_repo(full_path, jobs=args.jobs, cache=cache, report=report)
 
     else:
         parser.print_help()
 
+    if report is not None:
+        return finish_report(report, args)
     if not args.quiet:
         print(f"{full_path} is valid.")
     return
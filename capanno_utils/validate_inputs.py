@@ -1,9 +1,14 @@
-import re
 import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from schema_salad.utils import yaml_no_ts
 from schema_salad.validate import ValidationException
 from capanno_utils.helpers.get_paths import get_tool_sources, get_tool_instance_path, get_tool_dir, get_tool_instances_dir_from_cwl_path, get_tool_cwl_from_instance_path
 from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+from capanno_utils.helpers.file_checks import FileChecker, collect_file_locations
+from capanno_utils.helpers.inputs_schema_cache import get_inputs_schema_cache
+from capanno_utils.repo_config import instance_file_pattern
 
 def validate_inputs_for_instance(instance_path, tool_inputs_info=None):
     """
@@ -23,17 +28,170 @@ def validate_inputs_for_instance(instance_path, tool_inputs_info=None):
     inputs_schema.validate_inputs(instance_path)  # Will raise error if not valid.
     return
 
-def validate_all_inputs_for_tool(cwl_tool_document_path):
-    instance_file_pattern = re.compile(r'[0-9a-f]{4}\.ya?ml')
 
-    cwl_tool_document_path = Path(cwl_tool_document_path)
-    inputs_schema = InputsSchema(cwl_tool_document_path)
+class InstanceValidationResults:
+    """
+    Results of validating the instances of a tool. Each result is a dict with path, valid, exceptionType, message, and
+    wallTime keys.
+    """
+
+    def __init__(self, cwl_path, results, exceptions=None):
+        """
+        :param cwl_path(Path): Tool the instances were validated against.
+        :param results(list): Result dicts in the order the instances were given.
+        :param exceptions(dict): path: exception raised for the instance. Not available from worker processes.
+        """
+        self.cwl_path = cwl_path
+        self.results = results
+        self._exceptions = exceptions or {}
+
+    @property
+    def failures(self):
+        return [result for result in self.results if not result['valid']]
+
+    @property
+    def passed(self):
+        return not self.failures
+
+    def raise_first_failure(self):
+        """
+        Log every failed instance and raise the error of the first one.
+        """
+        for failure in self.failures:
+            logging.error(f"{failure['path']} failed validation. {failure['message']}")
+        if self.failures:
+            first_path = self.failures[0]['path']
+            raise self._exceptions.get(first_path) or ValidationException(f"{first_path} failed validation. {self.failures[0]['message']}")
+        return
+
+    def add_to_report(self, report):
+        """
+        Add each instance to a ValidationReport as an 'instance' item with an 'inputs' stage.
+        """
+        for result in self.results:
+            failures = []
+            if not result['valid']:
+                failures.append({'stage': 'inputs', 'path': result['path'], 'exceptionType': result['exceptionType'],
+                                 'message': result['message']})
+            report.add_item('instance', result['path'], {'inputs': result['path']}, failures, result['wallTime'])
+        return
+
+
+def _validate_instance(inputs_schema, instance_path):
+    """
+    :return(tuple): Result dict, exception or None.
+    """
+    start_time = time.perf_counter()
+    try:
+        inputs_schema.validate_inputs(instance_path)
+    except Exception as e:
+        result = {'path': str(instance_path), 'valid': False, 'exceptionType': type(e).__name__, 'message': str(e)}
+        exception = e
+    else:
+        result = {'path': str(instance_path), 'valid': True, 'exceptionType': None, 'message': None}
+        exception = None
+    result['wallTime'] = round(time.perf_counter() - start_time, 4)
+    return result, exception
+
+
+_worker_inputs_schema = None
+
+
+def _init_instance_worker(inputs_fields, cwl_path):
+    global _worker_inputs_schema
+    _worker_inputs_schema = InputsSchema.from_inputs_fields(inputs_fields, cwl_path=cwl_path)
+    return
+
+
+def _validate_instance_in_worker(instance_path):
+    result, _ = _validate_instance(_worker_inputs_schema, instance_path)
+    return result  # Exceptions aren't sent back since they may not pickle.
+
+
+def get_instance_paths(cwl_tool_document_path):
     instances_path = get_tool_instances_dir_from_cwl_path(cwl_tool_document_path)
-    for instance_file in instances_path.iterdir():
-        if  instance_file_pattern.match(instance_file.name):
-            try:
-                validate_inputs_for_instance(instance_file, inputs_schema)
-            except ValidationException:
-                print(f"{instance_file} failed validation")
-                raise
+    if not instances_path.exists():
+        return []
+    return sorted(instance_file for instance_file in instances_path.iterdir() if instance_file_pattern.match(instance_file.name))
+
+
+def _check_instance_files(results, exceptions, file_checker):
+    """
+    Check the files of every instance with one call to file_checker. Adds a missingFiles list to each result and fails
+    instances that passed validation but have missing files.
+    """
+    instance_locations = {}
+    for result in results:
+        try:
+            with open(result['path'], encoding='utf-8') as instance_file:
+                job_document = yaml_no_ts().load(instance_file)
+        except Exception:
+            continue  # Already failed validation.
+        instance_locations[result['path']] = collect_file_locations(job_document, result['path'])
+    existence = file_checker.check(location for locations in instance_locations.values() for location in locations)
+    for result in results:
+        missing_files = [location for scheme, location in instance_locations.get(result['path'], []) if
+                         existence[(scheme, location)] is False]
+        result['missingFiles'] = missing_files
+        if missing_files and result['valid']:
+            message = f"Files do not exist: {', '.join(missing_files)}"
+            result.update({'valid': False, 'exceptionType': 'FileNotFoundError', 'message': message})
+            exceptions[result['path']] = FileNotFoundError(message)
+    return
+
+
+def validate_instances(cwl_tool_document_path, instance_paths=None, inputs_schema=None, jobs=1, use_processes=False,
+                       check_files=False, file_checker=None):
+    """
+    Validate instances of a tool against one schema and collect a result for each instead of stopping at the first
+    invalid instance.
+    :param cwl_tool_document_path(Path): cwl file of the tool, script, or workflow.
+    :param instance_paths(iterable): Job files to validate. Defaults to the instances in the instances directory of the tool.
+    :param inputs_schema(InputsSchema): Schema made from cwl_tool_document_path. If not provided, it is read from the
+        active InputsSchemaCache if there is one, or made here.
+    :param jobs(int): Number of threads or processes to validate instances with. Instances are validated serially if jobs is 1.
+    :param use_processes(bool): Use worker processes instead of threads. Each worker makes the schema from its inputs fields.
+    :param check_files(bool): Also check that the File and Directory inputs of the instances exist. The locations of all
+        instances are checked together, and each result gets a missingFiles list.
+    :param file_checker(FileChecker): Checks locations if check_files. Defaults to a FileChecker for local paths.
+    :return(InstanceValidationResults):
+    """
+    cwl_tool_document_path = Path(cwl_tool_document_path)
+    if instance_paths is None:
+        instance_paths = get_instance_paths(cwl_tool_document_path)
+    instance_paths = list(instance_paths)
+    if inputs_schema is None:
+        inputs_schema_cache = get_inputs_schema_cache()
+        if inputs_schema_cache is None:
+            inputs_schema = InputsSchema(cwl_tool_document_path)
+        else:
+            inputs_schema = inputs_schema_cache.get_inputs_schema(cwl_tool_document_path)
+    if jobs and jobs > 1 and use_processes:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_instance_worker,
+                                 initargs=(inputs_schema.inputs_fields, cwl_tool_document_path)) as executor:
+            results = list(executor.map(_validate_instance_in_worker, instance_paths,
+                                        chunksize=max(1, len(instance_paths) // (jobs * 4))))
+        exceptions = {}
+    else:
+        inputs_schema.native_validator  # Compile before threads share it.
+        if jobs and jobs > 1:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                outcomes = list(executor.map(lambda instance_path: _validate_instance(inputs_schema, instance_path), instance_paths))
+        else:
+            outcomes = [_validate_instance(inputs_schema, instance_path) for instance_path in instance_paths]
+        results = [result for result, _ in outcomes]
+        exceptions = {result['path']: exception for result, exception in outcomes if exception is not None}
+    if check_files:
+        _check_instance_files(results, exceptions, file_checker or FileChecker())
+    return InstanceValidationResults(cwl_tool_document_path, results, exceptions)
+
+
+def validate_all_inputs_for_tool(cwl_tool_document_path, inputs_schema=None, check_files=False):
+    """
+    Validate every instance of a tool. Every instance is validated and failures are logged before the error of the first
+    invalid instance is raised.
+    :param inputs_schema(InputsSchema): Schema made from cwl_tool_document_path. Made here if not provided.
+    :param check_files(bool): Also check that the File and Directory inputs of the instances exist.
+    """
+    validate_instances(cwl_tool_document_path, inputs_schema=inputs_schema, check_files=check_files).raise_first_failure()
     return
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Long-lived capanno-validate process that accepts validation requests over a unix socket, and a thin client for it.
+
+The server imports cwltool, schema-salad, miniwdl, etc. once and keeps their schema caches warm between requests. The
+client only uses the standard library so it starts quickly. Requests are single lines of JSON:
+    {"command": "validate", "args": [capanno-validate arguments], "cwd": "client working directory"}
+    {"command": "shutdown"}
+Responses are single lines of JSON with exitCode, output, and error keys.
+"""
+
+import argparse
+import importlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from contextlib import redirect_stdout, redirect_stderr
+from pathlib import Path
+from capanno_utils.repo_config import validation_socket_path
+
+
+def get_socket_path(root_path=None, socket_path=None):
+    if socket_path:
+        return Path(socket_path)
+    return Path(root_path or Path.cwd()) / validation_socket_path
+
+
+def warm_up():
+    """
+    Load the schemas that every validation needs so the first request doesn't pay for them.
+    """
+    from cwltool.process import get_schema
+    from cwltool.update import INTERNAL_VERSION
+    from schema_salad.schema import get_metaschema
+    importlib.import_module('capanno_utils.validate_content')  # Imports the rest of capanno_utils.
+    for cwl_version in ('v1.0', INTERNAL_VERSION):  # Content is v1.0 and is updated to the internal version to validate.
+        get_schema(cwl_version)
+    get_metaschema()
+    return
+
+
+def run_validation(argsl, cwd=None):
+    """
+    Run capanno-validate in this process and capture what it prints.
+    :param argsl(list): capanno-validate command line arguments.
+    :param cwd(str): Directory relative paths in argsl are relative to.
+    :return(dict): exitCode, output, and error
+    """
+    from capanno_utils.validate_content import main as validate_content
+
+    output = io.StringIO()
+    error = io.StringIO()
+    log_handler = logging.StreamHandler(error)
+    log_handler.setLevel(logging.WARNING)
+    root_logger = logging.getLogger()
+    root_logger.addHandler(log_handler)
+    try:
+        with redirect_stdout(output), redirect_stderr(error):
+            exit_code = validate_content(argsl, cwd=Path(cwd) if cwd else None) or 0
+    except SystemExit as e:  # argparse errors and --help.
+        exit_code = e.code if isinstance(e.code, int) else 1
+    except Exception:
+        error.write(traceback.format_exc())
+        exit_code = 1
+    finally:
+        root_logger.removeHandler(log_handler)
+    return {'exitCode': exit_code, 'output': output.getvalue(), 'error': error.getvalue()}
+
+
+class ValidationRequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode('utf-8'))
+        except ValueError as e:
+            response = {'exitCode': 2, 'output': '', 'error': f"Could not read request: {e}"}
+        else:
+            if request.get('command') == 'shutdown':
+                self.server.stop = True
+                response = {'exitCode': 0, 'output': 'Validation server stopped.\n', 'error': ''}
+            else:
+                response = run_validation(request.get('args', []), cwd=request.get('cwd'))
+        self.wfile.write(json.dumps(response).encode('utf-8') + b'\n')
+        return
+
+
+class ValidationServer(socketserver.UnixStreamServer):
+    """
+    Handles one request at a time. Output of a request is captured by redirecting stdout, so requests can't run
+    concurrently in one process. Only the user that started the server can connect to its socket.
+    """
+
+    def __init__(self, socket_path):
+        self.stop = False
+        super().__init__(str(socket_path), ValidationRequestHandler)
+
+    def server_bind(self):
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)  # Before listen, so no other user can connect in between.
+        return
+
+
+def _remove_stale_socket(socket_path):
+    if not socket_path.exists():
+        return
+    test_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        test_socket.connect(str(socket_path))
+    except (ConnectionRefusedError, FileNotFoundError):
+        socket_path.unlink()  # Left over from a server that didn't exit cleanly.
+    else:
+        raise RuntimeError(f"A validation server is already listening on {socket_path}")
+    finally:
+        test_socket.close()
+    return
+
+
+def serve(socket_path, quiet=False):
+    """
+    Serve validation requests on socket_path until a shutdown request is received.
+    """
+    socket_path = Path(socket_path)
+    if not socket_path.parent.exists():
+        socket_path.parent.mkdir(parents=True)
+    _remove_stale_socket(socket_path)
+    warm_up()
+    server = ValidationServer(socket_path)
+    if not quiet:
+        print(f"Validation server listening on {socket_path}", flush=True)
+    try:
+        while not server.stop:
+            server.handle_request()
+    finally:
+        server.server_close()
+        if socket_path.exists():
+            socket_path.unlink()
+    return
+
+
+def send_request(request, socket_path):
+    client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client_socket.connect(str(socket_path))
+        client_socket.sendall(json.dumps(request).encode('utf-8') + b'\n')
+        response_bytes = b''
+        while True:
+            chunk = client_socket.recv(65536)
+            if not chunk:
+                break
+            response_bytes += chunk
+    finally:
+        client_socket.close()
+    return json.loads(response_bytes.decode('utf-8'))
+
+
+def request_validation(argsl, socket_path, cwd=None):
+    """
+    Ask the server on socket_path to run capanno-validate with argsl.
+    :return(dict): exitCode, output, and error
+    """
+    request = {'command': 'validate', 'args': list(argsl), 'cwd': str(cwd or Path.cwd())}
+    return send_request(request, socket_path)
+
+
+def stop_server(socket_path):
+    return send_request({'command': 'shutdown'}, socket_path)
+
+
+def get_client_parser():
+    parser = argparse.ArgumentParser(description="Send a validation request to a running 'capanno-validate --serve' process. "
+                                                 "Arguments other than those below are passed to capanno-validate.")
+    parser.add_argument('-p', '--root-repo-path', dest='root_path', type=Path, default=Path.cwd(),
+                        help="Specify the root path of your content repo if it is not the current working directory.")
+    parser.add_argument('--socket', dest='socket_path', type=Path,
+                        help="Socket the server listens on. Defaults to .cache/validate.sock in the root repo path.")
+    parser.add_argument('--stop', dest='stop', action='store_true', help="Stop the server.")
+    return parser
+
+
+def client_main(argsl=None):
+    if argsl is None:
+        argsl = sys.argv[1:]
+    parser = get_client_parser()
+    args, validate_argsl = parser.parse_known_args(argsl)
+    socket_path = get_socket_path(args.root_path, args.socket_path)
+    if args.stop:
+        response = stop_server(socket_path)
+    else:
+        response = request_validation([*validate_argsl, '-p', str(args.root_path)], socket_path)
+    sys.stdout.write(response['output'])
+    sys.stderr.write(response['error'])
+    return response['exitCode']
+
+
+if __name__ == "__main__":
+    sys.exit(client_main(sys.argv[1:]))
@@ -0,0 +1,191 @@
+"""
+Watch a content repo and re-validate files as they change.
+
+Changes come from inotify where it is available, and from polling file modification times and sizes otherwise. Parent
+tool metadata and input schemas are kept in memory between changes and only reloaded when their files change.
+"""
+
+import logging
+from pathlib import Path
+from capanno_utils.classes.metadata.tool_metadata import ParentToolMetadata, SubtoolMetadata
+from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+from capanno_utils.helpers.file_events import get_file_events
+from capanno_utils.helpers.get_paths import get_types_from_path, get_tool_instances_dir_from_cwl_path
+from capanno_utils.helpers.parent_metadata_cache import ParentMetadataCache
+from capanno_utils.helpers.validate_cwl import get_default_session, validate_cwl_doc
+from capanno_utils.helpers.validate_wdl import validate_wdl_doc
+from capanno_utils.repo_config import common_dir_name, common_tool_metadata_name, tools_dir_name, scripts_dir_name, \
+    workflows_dir_name
+from capanno_utils.validate import _run_stage, validate_script_metadata, validate_workflow_metadata
+from capanno_utils.validate_inputs import validate_inputs_for_instance, validate_all_inputs_for_tool
+
+
+def get_content_dirs(base_dir):
+    """
+    :return(list): The tools, scripts, and workflows directories of base_dir that exist.
+    """
+    return [base_dir / dir_name for dir_name in (tools_dir_name, scripts_dir_name, workflows_dir_name) if
+            (base_dir / dir_name).is_dir()]
+
+
+class ContentWatcher:
+    """
+    Re-validate the metadata, workflow language, and instance files under a path when they change.
+    """
+
+    def __init__(self, base_dir, watch_path=None, interval=0.5, debounce=0.3, use_inotify=None):
+        """
+        :param base_dir(Path): Root of the content repo.
+        :param watch_path(Path): Directory to watch. Defaults to the tools, scripts, and workflows directories of base_dir.
+        :param interval(float): Seconds between polls for changes when inotify isn't used.
+        :param debounce(float): Changes are only validated once files have stopped changing for this many seconds.
+        :param use_inotify(bool): Defaults to using inotify if it is available.
+        """
+        self.base_dir = Path(base_dir).resolve()
+        watch_path = Path(watch_path).resolve() if watch_path else self.base_dir
+        self.watch_paths = get_content_dirs(self.base_dir) if watch_path == self.base_dir else [watch_path]
+        self.interval = interval
+        self.debounce = debounce
+        self._parent_metadata_cache = ParentMetadataCache()
+        self._inputs_schemas = {}  # cwl path: (mtime_ns, InputsSchema)
+        self._file_events = get_file_events(self.watch_paths, use_inotify=use_inotify)
+
+    def close(self):
+        self._file_events.close()
+        return
+
+    def get_parent_metadata(self, parent_metadata_path):
+        return self._parent_metadata_cache.get(parent_metadata_path, ParentToolMetadata.load_from_file)
+
+    def get_inputs_schema(self, cwl_path):
+        cwl_path = Path(cwl_path).resolve()
+        mtime_ns = cwl_path.stat().st_mtime_ns
+        stored = self._inputs_schemas.get(cwl_path)
+        if stored and stored[0] == mtime_ns:
+            return stored[1]
+        inputs_schema = InputsSchema(cwl_path)
+        self._inputs_schemas[cwl_path] = (mtime_ns, inputs_schema)
+        return inputs_schema
+
+    def validate_subtool_metadata(self, metadata_path):
+        parent_metadata_path = metadata_path.parents[1] / common_dir_name / common_tool_metadata_name
+        SubtoolMetadata.load_from_file(metadata_path, _parentMetadata=self.get_parent_metadata(parent_metadata_path))
+        return
+
+    def validate_parent_tool_metadata(self, metadata_path):
+        self.get_parent_metadata(metadata_path)  # Loading validates it.
+        return
+
+    def validate_instance(self, instance_path):
+        cwl_paths = list(instance_path.parents[1].glob('*.cwl'))
+        if len(cwl_paths) != 1:
+            raise FileNotFoundError(f"Could not find the cwl file for {instance_path}")
+        validate_inputs_for_instance(instance_path, self.get_inputs_schema(cwl_paths[0]))
+        return
+
+    def validate_instances(self, cwl_path):
+        if not get_tool_instances_dir_from_cwl_path(cwl_path).exists():
+            return
+        validate_all_inputs_for_tool(cwl_path, inputs_schema=self.get_inputs_schema(cwl_path))
+        return
+
+    def poll_changes(self):
+        """
+        Check for changes since the last poll.
+        :return(list): Sorted paths of changed files.
+        """
+        return sorted(Path(changed_file) for changed_file in self._file_events.poll_changes())
+
+    def wait_for_changes(self):
+        """
+        Block until files change, then wait until they stop changing so an editor's save is handled once.
+        """
+        changed_files = set()
+        while not changed_files:
+            changed_files.update(self._file_events.poll_changes(self.interval))
+        while True:
+            settled_changes = self._file_events.poll_changes(self.debounce)
+            if not settled_changes:
+                break
+            changed_files.update(settled_changes)
+        return sorted(Path(changed_file) for changed_file in changed_files)
+
+    def _get_validations(self, path):
+        """
+        :return(list): (stage, path, validate function) for each validation affected by a change to path.
+        """
+        if not path.exists():
+            logging.info(f"{path} was removed.")
+            return []
+        try:
+            base_type, file_type = get_types_from_path(path, root_repo_name=self.base_dir.name)
+        except (ValueError, AssertionError, NotImplementedError):
+            logging.debug(f"{path} is not a content file. Skipping.")
+            return []
+        if base_type in ('tool', 'script') and file_type == 'cwl':
+            return [('cwl', path, validate_cwl_doc), ('inputs', path, self.validate_instances)]
+        elif base_type == 'tool' and file_type == 'wdl':
+            return [('wdl', path, validate_wdl_doc)]
+        elif file_type == 'instance':
+            return [('inputs', path, self.validate_instance)]
+        elif base_type == 'tool' and file_type == 'common_metadata':
+            validations = [('metadata', path, self.validate_parent_tool_metadata)]
+            for subtool_dir in sorted(path.parents[1].iterdir()):  # Subtools inherit from the parent.
+                if subtool_dir.name == common_dir_name or not subtool_dir.is_dir():
+                    continue
+                for metadata_path in sorted(subtool_dir.glob('*-metadata.yaml')):
+                    validations.append(('metadata', metadata_path, self.validate_subtool_metadata))
+            return validations
+        elif base_type == 'tool' and file_type == 'metadata':
+            return [('metadata', path, self.validate_subtool_metadata)]
+        elif base_type == 'script' and file_type == 'common_metadata':
+            return [('metadata', metadata_path, validate_script_metadata) for metadata_path in
+                    sorted(path.parents[1].glob('*/*-metadata.yaml')) if metadata_path.parent.name != common_dir_name]
+        elif base_type == 'script' and file_type == 'metadata':
+            return [('metadata', path, validate_script_metadata)]
+        elif base_type == 'workflow' and file_type == 'metadata':
+            return [('metadata', path, validate_workflow_metadata)]
+        logging.info(f"Changes to {path} are not validated.")
+        return []
+
+    def validate_changes(self, changed_paths):
+        """
+        Validate what is affected by changed_paths. Each affected file is only validated once.
+        :return(tuple): list of (stage, path) that were validated, list of failures.
+        """
+        get_default_session().evict_changed_files()
+        validations = {}
+        for changed_path in changed_paths:
+            for stage, path, validate in self._get_validations(Path(changed_path)):
+                validations.setdefault((stage, path), validate)
+        failures = []
+        for (stage, path), validate in validations.items():
+            _run_stage(stage, path, validate, failures, keep_going=True)
+        return list(validations), failures
+
+    def run(self, quiet=False, max_events=None):
+        """
+        Validate changes as they happen until interrupted.
+        :param max_events(int): Stop after this many batches of changes. Runs forever if None.
+        """
+        if not quiet:
+            print(f"Watching {', '.join(str(watch_path) for watch_path in self.watch_paths)} for changes. "
+                  f"Press Ctrl-C to stop.", flush=True)
+        events = 0
+        try:
+            while max_events is None or events < max_events:
+                validated, failures = self.validate_changes(self.wait_for_changes())
+                events += 1
+                failed = {(failure['stage'], failure['path']) for failure in failures}
+                for failure in failures:
+                    print(f"{failure['path']} failed {failure['stage']} validation: {failure['exceptionType']}: "
+                          f"{failure['message']}", flush=True)
+                if not quiet:
+                    for stage, path in validated:
+                        if (stage, str(path)) not in failed:
+                            print(f"{path} passed {stage} validation.", flush=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+        return
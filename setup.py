@@ -36,6 +36,7 @@ setup(
     ],
     entry_points={
         'console_scripts': ["capanno-validate=capanno_utils.validate_content:main",
+                            "capanno-validate-client=capanno_utils.validation_server:client_main",
                             "capanno-add=capanno_utils.add_content:main",
                             "capanno-map=capanno_utils.make_content_maps:main",
                             "capanno-id=capanno_utils.make_ids:main",
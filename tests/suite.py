@@ -14,15 +14,25 @@ from tests.test_input_templates import TestMakeCommandLineToolInputsTemplate
 from tests.test_tool_instance_metadata import TestMakeToolInstanceMetadata
 from tests.test_tool_metadata import TestMakeParentToolMetadata, TestMakeSubtoolMetadata
 from tests.test_script_metadata import TestScriptMetadata
+from tests.test_sharding import TestSharding
 from tests.test_content_maps import TestToolMaps
 from tests.test_modify_yaml_files import TestModifyYamlFiles
+from tests.test_native_validator import TestNativeValidator
+from tests.test_partial_load import TestPartialLoad
 from tests.test_path_tools import TestGetTypesFromPath
 from tests.test_workflow_metadata import TestWorkflowMetadata
+from tests.test_profiling import TestProfiling
 from tests.test_validate import TestValidateMetadata
 from tests.test_validate_all import TestValidateDirectories
 from tests.test_validate_all_metadata_in_maps import TestValidateContent
+from tests.test_validate_changed import TestValidateChanged
+from tests.test_validate_cwl import TestValidateCwl
 import tests.test_validate_content
 from tests.test_validate_tool_inputs import TestValidateInputs
+from tests.test_validation_cache import TestValidationCache
+from tests.test_validation_report import TestValidationReport
+from tests.test_validation_server import TestValidationServer
+from tests.test_validation_watcher import TestValidationWatcher
 
 
 def suite_full():
@@ -35,14 +45,24 @@ def suite_full():
     suite.addTest(suite_dict_tools()),
     suite.addTest(suite_dump_cwl()),
     suite.addTest(suite_input_templates())
+    suite.addTest(suite_native_validator())
+    suite.addTest(suite_partial_load())
+    suite.addTest(suite_profiling())
     suite.addTest(suite_script_metadata())
+    suite.addTest(suite_sharding())
     suite.addTest(suite_tool_metadata())
     suite.addTest(suite_tool_instance_metadata())
     suite.addTest(suite_validate())
     suite.addTest(suite_validate_all_metadata_in_maps())
+    suite.addTest(suite_validate_changed())
     suite.addTest(suite_validate_content())
+    suite.addTest(suite_validate_cwl())
     suite.addTest(suite_validate_directories())
     suite.addTest(suite_validate_tool_inputs())
+    suite.addTest(suite_validation_cache())
+    suite.addTest(suite_validation_report())
+    suite.addTest(suite_validation_server())
+    suite.addTest(suite_validation_watcher())
     suite.addTest(suite_workflow_metadata())
     return suite
 
@@ -96,16 +116,34 @@ def suite_modify_yaml_files():
     suite = defaultTestLoader.loadTestsFromTestCase(TestModifyYamlFiles)
     return suite
 
+def suite_native_validator():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestNativeValidator)
+    return suite
+
+def suite_partial_load():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestPartialLoad)
+    return suite
+
 def suite_path_tools():
     suite = defaultTestLoader.loadTestsFromTestCase(TestGetTypesFromPath)
     return suite
 
 
+def suite_profiling():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestProfiling)
+    return suite
+
+
 def suite_script_metadata():
     suite = defaultTestLoader.loadTestsFromTestCase(TestScriptMetadata)
     return suite
 
 
+def suite_sharding():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestSharding)
+    return suite
+
+
 def suite_tool_instance_metadata():
     suite = defaultTestLoader.loadTestsFromTestCase(TestMakeToolInstanceMetadata)
     return suite
@@ -122,6 +160,11 @@ def suite_validate():
     return suite
 
 
+def suite_validate_cwl():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestValidateCwl)
+    return suite
+
+
 def suite_validate_directories():
     suite = defaultTestLoader.loadTestsFromTestCase(TestValidateDirectories)
     return suite
@@ -135,6 +178,12 @@ def suite_validate_all_metadata_in_maps():
 def suite_validate_content():
     suite = defaultTestLoader.loadTestsFromTestCase(tests.test_validate_content.TestValidateTools)
     suite.addTest(defaultTestLoader.loadTestsFromTestCase(tests.test_validate_content.TestValidateScripts))
+    suite.addTest(defaultTestLoader.loadTestsFromTestCase(tests.test_validate_content.TestValidateWorkflows))
+    return suite
+
+
+def suite_validate_changed():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestValidateChanged)
     return suite
 
 
@@ -143,6 +192,26 @@ def suite_validate_tool_inputs():
     return suite
 
 
+def suite_validation_cache():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestValidationCache)
+    return suite
+
+
+def suite_validation_report():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestValidationReport)
+    return suite
+
+
+def suite_validation_server():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestValidationServer)
+    return suite
+
+
+def suite_validation_watcher():
+    suite = defaultTestLoader.loadTestsFromTestCase(TestValidationWatcher)
+    return suite
+
+
 def suite_workflow_metadata():
     suite = defaultTestLoader.loadTestsFromTestCase(TestWorkflowMetadata)
     return suite
@@ -160,15 +229,25 @@ def suite_dict():
                   'full': suite_full(),
                   'input_templates': suite_input_templates(),
                   'modify_yaml': suite_modify_yaml_files(),
+                  'native_validator': suite_native_validator(),
+                  'partial_load': suite_partial_load(),
                   'path_tools': suite_path_tools(),
+                  'profiling': suite_profiling(),
                   'script_metadata': suite_script_metadata(),
+                  'sharding': suite_sharding(),
                   'tool_instance_metadata': suite_tool_instance_metadata(),
                   'tool_metadata': suite_tool_metadata(),
                   'validate': suite_validate(),
                   'validate_all_metadata_in_maps': suite_validate_all_metadata_in_maps(),
+                  'validate_changed': suite_validate_changed(),
                   'validate_content': suite_validate_content(),
                   'validate_directories': suite_validate_directories(),
+                  'validate_cwl': suite_validate_cwl(),
                   'validate_tool_inputs': suite_validate_tool_inputs(),
+                  'validation_cache': suite_validation_cache(),
+                  'validation_report': suite_validation_report(),
+                  'validation_server': suite_validation_server(),
+                  'validation_watcher': suite_validation_watcher(),
                   'workflow_metadata': suite_workflow_metadata(),
                   }
     return suite_dict
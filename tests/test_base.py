@@ -1,5 +1,6 @@
 import tempfile
 import shutil
+import subprocess
 from unittest import TestCase
 import os
 from pathlib import Path
@@ -61,6 +62,27 @@ class TestBase(TestCase):
         make_tools_index(base_dir=dest)
         return
 
+    def make_temp_content_repo(self, *content_paths, git=False):
+        """
+        Copy the test content repo to a temp directory so tests can change it.
+        :param content_paths(str): Paths in the test content repo to copy, e.g. 'tools/sort'. The tools index is copied
+            with them. The whole repo is copied if none are given.
+        :param git(bool): Make the copy a git repo with everything committed.
+        :return(Path): Root of the copy.
+        """
+        content_repo = Path(self.test_dir.name) / repo_config.content_repo_name
+        if content_paths:
+            for content_path in (repo_config.identifier_index_dir, *content_paths):
+                shutil.copytree(self.test_content_dir / content_path, content_repo / content_path)
+        else:
+            shutil.copytree(self.test_content_dir, content_repo)
+        if git:
+            git_args = ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com']
+            subprocess.run(['git', 'init', '-q'], cwd=content_repo, check=True)
+            subprocess.run(['git', 'add', '.'], cwd=content_repo, check=True)
+            subprocess.run([*git_args, 'commit', '-q', '-m', 'initial'], cwd=content_repo, check=True)
+        return content_repo
+
 
 
     def setUp(self):
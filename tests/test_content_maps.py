@@ -1,8 +1,21 @@
 import os
+import shutil
+import sqlite3
 import tempfile
+from pathlib import Path
+from unittest.mock import patch
 from tests.test_base import TestBase
 from capanno_utils.repo_config import config
-from capanno_utils.content_maps import make_tools_map, make_script_maps
+from capanno_utils.classes.metadata.metadata_headers import load_parent_tool_header, load_subtool_header, \
+    load_script_header, load_workflow_header
+from capanno_utils.classes.metadata.script_metadata import ScriptMetadata
+from capanno_utils.classes.metadata.tool_metadata import ParentToolMetadata, SubtoolMetadata
+from capanno_utils.classes.metadata.workflow_metadata import WorkflowMetadata
+from capanno_utils.content_maps import make_tools_map, make_script_maps, make_tools_map_dict, make_master_map_dict, \
+    make_content_catalog, get_tool_args_from_identifier, get_subtool_map_entries
+from capanno_utils.helpers.content_catalog import ContentCatalog
+from capanno_utils.helpers.content_map_manifest import ContentMapManifest
+from capanno_utils.helpers.content_walker import ParentToolRecord, walk_tools, walk_scripts, walk_workflows
 
 
 class TestToolMaps(TestBase):
@@ -18,3 +31,192 @@ class TestToolMaps(TestBase):
     def test_make_script_maps(self):
         make_script_maps(tempfile.NamedTemporaryFile().name)
         return
+
+    def test_walk_content(self):
+        tool_records = list(walk_tools(base_dir=self.test_content_dir))
+        script_records = list(walk_scripts(base_dir=self.test_content_dir))
+        workflow_records = list(walk_workflows(base_dir=self.test_content_dir))
+        for record in tool_records + script_records + workflow_records:
+            self.assertTrue(record.metadata_path.is_file(), record)
+        parent_metadata_path = None
+        for record in tool_records:  # Each tool version is followed by its subtools.
+            if isinstance(record, ParentToolRecord):
+                parent_metadata_path = record.metadata_path
+            else:
+                self.assertEqual(record.parent_metadata_path, parent_metadata_path)
+        self.assertEqual(sum(isinstance(record, ParentToolRecord) for record in tool_records),
+                         len(list(self.test_content_dir.glob('tools/*/*/common'))))
+        self.assertEqual(list(walk_tools(base_dir=self.test_content_dir, tool_name='STAR', tool_version='2.5')),
+                         [record for record in tool_records if (record.tool_name, record.tool_version) == ('STAR', '2.5')])
+        self.assertEqual(list(walk_scripts(base_dir=self.test_content_dir, group_name='ENCODE-DCC')), script_records)
+        self.assertEqual(len(workflow_records), 1)
+        return
+
+    def test_metadata_headers(self):
+        """
+        Headers have the same values as the metadata classes.
+        """
+        for record in walk_tools(base_dir=self.test_content_dir):
+            if isinstance(record, ParentToolRecord):
+                metadata = ParentToolMetadata.load_from_file(record.metadata_path, check_index=False)
+                header = load_parent_tool_header(record.metadata_path)
+                self.assertEqual(header['versionName'], metadata.softwareVersion.versionName)
+            else:
+                metadata = SubtoolMetadata.load_from_file(record.metadata_path, check_index=False)
+                header = load_subtool_header(record.metadata_path)
+            for key, value in header.items():
+                if key != 'versionName':
+                    self.assertEqual(value, getattr(metadata, key), record.metadata_path)
+        for record in walk_scripts(base_dir=self.test_content_dir):
+            metadata = ScriptMetadata.load_from_file(record.metadata_path)
+            header = load_script_header(record.metadata_path)
+            self.assertEqual(header, {'identifier': metadata.identifier, 'name': metadata.name,
+                                      'versionName': metadata.softwareVersion.versionName,
+                                      'metadataStatus': metadata.metadataStatus, 'cwlStatus': metadata.cwlStatus})
+        for record in walk_workflows(base_dir=self.test_content_dir):
+            metadata = WorkflowMetadata.load_from_file(record.metadata_path)
+            header = load_workflow_header(record.metadata_path)
+            self.assertEqual(header['versionName'], metadata.softwareVersion.versionName)
+            for key in ('identifier', 'name', 'metadataStatus', 'workflowStatus', 'workflowLanguage', 'workflowFile'):
+                self.assertEqual(header[key], getattr(metadata, key))
+        return
+
+    def test_metadata_header_checks(self):
+        tool_dir = Path(self.test_dir.name) / 'capanno' / 'tools' / 'cat'
+        shutil.copytree(self.test_content_dir / 'tools' / 'cat', tool_dir, ignore=shutil.ignore_patterns('instances'))
+        metadata_path = tool_dir / '8.x' / 'cat' / 'cat-metadata.yaml'
+        metadata_text = metadata_path.read_text()
+        identifier = load_subtool_header(metadata_path)['identifier']
+
+        metadata_path.write_text(metadata_text.replace(identifier, 'TL_123'))
+        with self.assertRaises(ValueError):
+            load_subtool_header(metadata_path)
+        self.assertEqual(load_subtool_header(metadata_path, strict=False)['identifier'], 'TL_123')
+
+        metadata_path.write_text(metadata_text.replace(f"identifier: {identifier}", 'identifier:'))
+        self.assertEqual(load_subtool_header(metadata_path)['identifier'], identifier)  # Made by SubtoolMetadata.
+        return
+
+    def test_make_master_map_with_manifest(self):
+        manifest_path = Path(self.test_dir.name) / 'manifest.json'
+        for specify_exists in (False, True):
+            full_map = make_master_map_dict(base_dir=self.test_content_dir, specify_exists=specify_exists)
+            manifest = ContentMapManifest(self.test_content_dir, manifest_path=manifest_path)
+            self.assertEqual(make_master_map_dict(base_dir=self.test_content_dir, specify_exists=specify_exists,
+                                                  manifest=manifest), full_map)
+            manifest.save()
+            manifest = ContentMapManifest(self.test_content_dir, manifest_path=manifest_path)
+            with patch('capanno_utils.content_maps.make_subtool_map', side_effect=AssertionError), \
+                    patch('capanno_utils.content_maps.make_script_map', side_effect=AssertionError):
+                incremental_map = make_master_map_dict(base_dir=self.test_content_dir, specify_exists=specify_exists,
+                                                       manifest=manifest)
+            self.assertEqual(list(incremental_map.items()), list(full_map.items()))  # Same entries in the same order.
+        return
+
+    def test_make_master_map_with_jobs(self):
+        full_map = make_master_map_dict(base_dir=self.test_content_dir, specify_exists=True)
+        parallel_map = make_master_map_dict(base_dir=self.test_content_dir, specify_exists=True, jobs=2)
+        self.assertEqual(list(parallel_map.items()), list(full_map.items()))  # Same entries in the same order.
+        return
+
+    def test_duplicate_identifiers(self):
+        tool_dir = Path(self.test_dir.name) / 'capanno' / 'tools' / 'cat'
+        for version_name in ('8.x', '9.x'):  # Same metadata in both versions.
+            shutil.copytree(self.test_content_dir / 'tools' / 'cat' / '8.x', tool_dir / version_name,
+                            ignore=shutil.ignore_patterns('instances'))
+        for jobs in (1, 2):
+            with self.assertRaises(ValueError):
+                make_tools_map_dict(base_dir=tool_dir.parents[1], jobs=jobs)
+        return
+
+    def test_content_catalog(self):
+        catalog_path = Path(self.test_dir.name) / 'catalog.sqlite'
+        manifest = ContentMapManifest(self.test_content_dir, manifest_path=Path(self.test_dir.name) / 'manifest.json')
+        master_map = make_content_catalog(self.test_content_dir, specify_exists=True, manifest=manifest,
+                                          catalog_path=catalog_path)
+        with ContentCatalog(self.test_content_dir, catalog_path=catalog_path) as catalog:
+            self.assertEqual(list(catalog.to_map()), sorted(master_map))
+            self.assertEqual(catalog.to_map(), master_map)
+            self.assertEqual(catalog.update(master_map), {'written': 0, 'deleted': 0})
+            subtool_identifier, subtool_values = next((identifier, values) for identifier, values in master_map.items()
+                                                      if values.get('type') == 'subtool')
+            self.assertEqual(catalog.get(subtool_identifier), subtool_values)
+            self.assertEqual(catalog.get_by_path(self.test_content_dir / subtool_values['metadataPath']),
+                             (subtool_identifier, subtool_values))
+            parent_identifier = f"{subtool_identifier[:9]}{subtool_identifier[-3:]}"
+            self.assertEqual(master_map[parent_identifier]['type'], 'parent')
+            self.assertIn(subtool_identifier, catalog.find(parentIdentifier=parent_identifier))
+            released_cwl = catalog.find(type='subtool', cwlStatus='Released')
+            self.assertEqual(list(released_cwl), sorted(identifier for identifier, values in master_map.items() if
+                                                        values.get('type') == 'subtool' and values['cwlStatus'] == 'Released'))
+            self.assertEqual(len(catalog.find(type=('script', 'workflow'))),
+                             sum(not identifier.startswith('TL_') for identifier in master_map))
+            with self.assertRaises(ValueError):
+                catalog.find(entry='')
+
+            changed_map = {identifier: values for identifier, values in master_map.items() if
+                           identifier != parent_identifier}
+            changed_map[subtool_identifier] = {**subtool_values, 'cwlStatus': 'Draft'}
+            self.assertEqual(catalog.update(changed_map), {'written': 1, 'deleted': 1})
+            self.assertEqual(catalog.to_map(), changed_map)
+            self.assertIsNone(catalog.get(parent_identifier))
+
+        catalog_mtime = catalog_path.stat().st_mtime_ns
+        with ContentCatalog(self.test_content_dir, catalog_path=catalog_path, read_only=True) as catalog:
+            self.assertEqual(catalog.get(subtool_identifier)['cwlStatus'], 'Draft')
+            with self.assertRaises(sqlite3.OperationalError):
+                catalog.update(master_map)
+        self.assertEqual(catalog_path.stat().st_mtime_ns, catalog_mtime)
+        with self.assertRaises(sqlite3.OperationalError):
+            ContentCatalog(self.test_content_dir, catalog_path=Path(self.test_dir.name) / 'missing.sqlite', read_only=True)
+        return
+
+    def test_get_subtool_map_entries(self):
+        base_dir = Path(self.test_dir.name) / 'capanno'
+        for tool_name in ('cat', 'samtools'):
+            shutil.copytree(self.test_content_dir / 'tools' / tool_name, base_dir / 'tools' / tool_name)
+        for dir_name in ('scripts', 'workflows'):
+            (base_dir / dir_name).mkdir()
+        subtool_entries = get_subtool_map_entries(base_dir)
+        self.assertTrue(subtool_entries)
+        self.assertTrue(all(values['type'] == 'subtool' for values in subtool_entries.values()))
+
+        make_content_catalog(base_dir)
+        with patch('capanno_utils.content_maps.make_tools_map_dict', side_effect=AssertionError("Map was made.")):
+            self.assertEqual(get_subtool_map_entries(base_dir), subtool_entries)
+        entries_with_exists = get_subtool_map_entries(base_dir, specify_exists=True)  # Catalog doesn't have them.
+        self.assertTrue(all('cwlExists' in values for values in entries_with_exists.values()))
+
+        identifier, values = next(iter(subtool_entries.items()))
+        (base_dir / values['metadataPath']).unlink()
+        self.assertNotIn(identifier, get_subtool_map_entries(base_dir))
+        return
+
+    def test_get_tool_args_from_identifier(self):
+        tools_map = make_tools_map_dict(base_dir=self.test_content_dir)
+        identifier = next(identifier for identifier, values in tools_map.items() if values['type'] == 'subtool')
+        tool_args, instance_hash = get_tool_args_from_identifier(f"{identifier}.abcd", base_dir=self.test_content_dir)
+        self.assertEqual(instance_hash, 'abcd')
+        self.assertEqual(tool_args[:2], tuple(Path(tools_map[identifier]['metadataPath']).parts[1:3]))
+        return
+
+    def test_incremental_tools_map(self):
+        base_dir = Path(self.test_dir.name) / 'capanno'
+        for tool_name in ('cat', 'gawk'):
+            shutil.copytree(self.test_content_dir / 'tools' / tool_name, base_dir / 'tools' / tool_name,
+                            ignore=shutil.ignore_patterns('instances'))
+        manifest_path = Path(self.test_dir.name) / 'manifest.json'
+        manifest = ContentMapManifest(base_dir, manifest_path=manifest_path)
+        tools_map = make_tools_map_dict(base_dir=base_dir, manifest=manifest)
+        manifest.save()
+        self.assertEqual(len(tools_map), 4)
+
+        cat_metadata_path = base_dir / 'tools/cat/8.x/cat/cat-metadata.yaml'
+        cat_metadata_path.write_text(cat_metadata_path.read_text().replace('cwlStatus: Released', 'cwlStatus: Draft'))
+        shutil.rmtree(base_dir / 'tools' / 'gawk')
+        manifest = ContentMapManifest(base_dir, manifest_path=manifest_path)
+        tools_map = make_tools_map_dict(base_dir=base_dir, manifest=manifest)
+        self.assertEqual(tools_map, make_tools_map_dict(base_dir=base_dir))
+        self.assertEqual(len(tools_map), 2)
+        self.assertEqual([values['cwlStatus'] for values in tools_map.values() if values['type'] == 'subtool'], ['Draft'])
+        return
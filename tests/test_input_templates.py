@@ -5,6 +5,7 @@ from ruamel.yaml import YAML, dump
 from capanno_utils.repo_config import config
 from capanno_utils.helpers.get_paths import *
 from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+from capanno_utils.add.job_templates import make_job_templates, get_job_template_path
 
 
 class TestMakeCommandLineToolInputsTemplate(TestBase):
@@ -29,4 +30,37 @@ class TestMakeCommandLineToolInputsTemplate(TestBase):
         yaml = YAML()
         with NamedTemporaryFile(delete=True, prefix='test_template_', suffix='.yml') as tmp:
             yaml.dump(template, tmp)
-        return
\ No newline at end of file
+        return
+
+    def test_make_job_templates(self):
+        output_dir = Path(self.test_dir.name) / 'job_templates'
+        results = make_job_templates(self.test_content_dir, output_dir=output_dir, jobs=2)
+        written = [Path(result['template']) for result in results if result['status'] == 'written']
+        self.assertTrue(written)
+        self.assertTrue(all(template_path.exists() for template_path in written))
+        self.assertFalse([result for result in results if result['status'] == 'unchanged'])
+
+        sort_cwl = get_tool_sources('sort', '8.x', base_dir=self.test_content_dir)['cwl']
+        sort_template = get_job_template_path(sort_cwl, self.test_content_dir, output_dir)
+        sort_template.write_text('outdated: true\n')
+        results = make_job_templates(self.test_content_dir, output_dir=output_dir)
+        self.assertEqual([result['template'] for result in results if result['status'] == 'written'], [str(sort_template)])
+
+        results = make_job_templates(self.test_content_dir, output_dir=output_dir, without_instances=True)
+        self.assertNotIn(str(sort_template), [result['template'] for result in results])  # sort has instances.
+        return
+
+    def test_make_job_templates_as_instances(self):
+        content_repo = self.make_temp_content_repo('tools/md5sum')
+        results = make_job_templates(content_repo)
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(result['status'] == 'written' for result in results))
+        for result in results:
+            self.assertTrue(Path(result['instanceMetadata']).exists())
+            self.assertEqual(Path(result['template']).parent, Path(result['instanceMetadata']).parent)
+            self.assertTrue(YAML(typ='safe').load(Path(result['template'])))
+        check_instances_dir = get_tool_instances_dir('md5sum', '8.x', subtool_name='check', base_dir=content_repo)
+        self.assertEqual(len(list(check_instances_dir.glob('*-metadata.yaml'))), 1)
+
+        self.assertEqual(make_job_templates(content_repo), [])  # Tools with instances are skipped.
+        return
@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+from schema_salad.exceptions import ValidationException
+from schema_salad.schema import validate_doc
+from schema_salad.sourceline import add_lc_filename
+from schema_salad.utils import yaml_no_ts
+from tests.test_base import TestBase
+from capanno_utils.classes.schema_salad.native_validator import NativeInputsValidator, UnsupportedType, compile_type
+from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+from capanno_utils.helpers.get_paths import get_tool_instances_dir_from_cwl_path
+from capanno_utils.repo_config import instance_file_pattern
+
+sample_values = (None, 'text', 3, 2 ** 40, 2.5, True, [], ['text'], [3], {'class': 'File', 'path': 'a.txt'},
+                 [{'class': 'File', 'location': 'a.txt'}], {'class': 'Directory', 'location': 'a'},
+                 {'class': 'File', 'path': 'a.txt', 'extra': 1}, {'max_cov': 1, 'min_cov': 0, 'step_cov': 1}, 'DEBUG')
+
+
+class TestNativeValidator(TestBase):
+
+    def is_valid_to_schema_salad(self, inputs_schema, document):
+        """
+        Same steps as CompiledInputsSchema.validate, on a document in memory. Writing a file for every document is slow.
+        """
+        compiled_schema = inputs_schema.compiled_schema
+        uri = Path(self.test_dir.name, 'job.yaml').as_uri()
+        keys_before = set(compiled_schema.document_loader.idx)
+        add_lc_filename(document, uri)
+        try:
+            resolved_document, _ = compiled_schema.document_loader.resolve_all(document, uri, checklinks=False)
+            validate_doc(compiled_schema.avsc_names, resolved_document, compiled_schema.document_loader, strict=True,
+                         strict_foreign_properties=False)
+        except ValidationException:
+            return False
+        finally:
+            for key in set(compiled_schema.document_loader.idx) - keys_before:
+                del compiled_schema.document_loader.idx[key]
+        return True
+
+    def test_compile_type(self):
+        validate = compile_type(['null', {'type': 'array', 'items': 'File'}])
+        self.assertTrue(validate(None))
+        self.assertTrue(validate([{'class': 'File', 'path': 'a.txt'}]))
+        self.assertFalse(validate({'class': 'File', 'path': 'a.txt'}))
+        self.assertFalse(validate([{'class': 'Directory', 'path': 'a'}]))
+        validate = compile_type({'type': 'enum', 'symbols': ['file:///tool.cwl#level/DEBUG', 'file:///tool.cwl#level/INFO']})
+        self.assertTrue(validate('INFO'))
+        self.assertFalse(validate('WARNING'))
+        self.assertFalse(compile_type('int')(2 ** 40))
+        self.assertTrue(compile_type('long')(2 ** 40))
+        for unsupported_type in ('Any', 'file:///tool.cwl#MyRecord', {'type': 'map', 'values': 'string'}):
+            with self.assertRaises(UnsupportedType):
+                compile_type(unsupported_type)
+        with self.assertRaises(UnsupportedType):
+            NativeInputsValidator({'ns:input': {'type': 'string'}})
+        return
+
+    def test_agrees_with_schema_salad(self):
+        """
+        Every instance in the test content, and copies with each input set to each of sample_values, gets the same
+        result from the native validator and schema-salad.
+        """
+        checked_documents = 0
+        for cwl_path in sorted(self.test_content_dir.glob('**/*.cwl')):
+            if 'workflows' in cwl_path.parts or cwl_path.name == 'STAR-liftOver.cwl':  # Not tools or not valid.
+                continue
+            inputs_schema = InputsSchema(cwl_path)
+            self.assertIsNotNone(inputs_schema.native_validator, cwl_path)
+            instances_dir = get_tool_instances_dir_from_cwl_path(cwl_path)
+            instance_paths = sorted(path for path in instances_dir.glob('*') if instance_file_pattern.match(path.name)) if instances_dir.exists() else []
+            for instance_path in instance_paths:
+                self.assertTrue(inputs_schema.native_validator.is_valid_file(instance_path), instance_path)
+            base_documents = [yaml_no_ts().load(instance_path.read_text()) for instance_path in instance_paths] or [{}]
+            documents = [*base_documents, {**base_documents[0], 'notAnInput': 'text'}]
+            for input_name in inputs_schema.inputs_fields:
+                documents.extend({**base_documents[0], input_name: value} for value in sample_values)
+            for document in documents:
+                document = yaml_no_ts().load(json.dumps(document))  # Loaded the way job files are. JSON is YAML.
+                self.assertEqual(inputs_schema.native_validator.is_valid(document),
+                                 self.is_valid_to_schema_salad(inputs_schema, document), f"{cwl_path}: {document}")
+                checked_documents += 1
+        self.assertGreater(checked_documents, 1000)
+        return
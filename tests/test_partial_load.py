@@ -0,0 +1,42 @@
+from pathlib import Path
+from schema_salad.exceptions import ValidationException
+from tests.test_base import TestBase
+from capanno_utils.classes.cwl.common_workflow_language import load_document
+from capanno_utils.classes.cwl.partial_load import load_inputs_document
+from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+
+
+class TestPartialLoad(TestBase):
+
+    def test_load_inputs_document(self):
+        """
+        Inputs schemas made from tools and workflows loaded with only their inputs are the same as from completely
+        loaded ones.
+        """
+        loaded_tools = 0
+        for cwl_path in sorted(self.test_files_dir.glob('**/*.cwl')):
+            try:
+                cwl_tool = load_document(str(cwl_path))
+            except Exception:
+                continue  # Invalid test files.
+            if type(cwl_tool).__name__ not in ('CommandLineTool', 'Workflow'):
+                continue
+            inputs_tool = load_inputs_document(cwl_path)
+            self.assertIs(type(inputs_tool), type(cwl_tool))
+            self.assertIsNone(inputs_tool.outputs)
+            self.assertEqual((inputs_tool.id, inputs_tool.cwlVersion), (cwl_tool.id, cwl_tool.cwlVersion))
+            self.assertEqual(InputsSchema(inputs_tool).inputs_fields, InputsSchema(cwl_tool).inputs_fields, cwl_path)
+            loaded_tools += 1
+        self.assertGreater(loaded_tools, 20)
+        return
+
+    def test_load_inputs_document_errors(self):
+        cwl_path = Path(self.test_dir.name) / 'tool.cwl'
+        cwl_path.write_text("cwlVersion: v1.0\nclass: CommandLineTool\ninputs:\n  date:\n    type: string\n"
+                            "    default: 2020-01-01\noutputs: 5\n")
+        inputs_tool = load_inputs_document(cwl_path)  # outputs are not loaded.
+        self.assertEqual(inputs_tool.inputs[0].default, '2020-01-01')
+        cwl_path.write_text(cwl_path.read_text().replace('type: string', 'type: 5'))
+        with self.assertRaisesRegex(ValidationException, 'tool.cwl:5'):  # Line numbers are in the message.
+            load_inputs_document(cwl_path)
+        return
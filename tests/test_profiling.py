@@ -0,0 +1,46 @@
+import json
+from pathlib import Path
+from tests.test_base import TestBase
+from capanno_utils.helpers.get_paths import get_tool_version_dir
+from capanno_utils.helpers.profiling import StageProfiler, profiler
+from capanno_utils.make_content_maps import main as make_content_map
+from capanno_utils.validate_content import main as validate_content
+
+
+class TestProfiling(TestBase):
+
+    def test_stage_profiler(self):
+        stage_profiler = StageProfiler()
+        with stage_profiler.stage('disabled'):
+            pass
+        self.assertEqual(stage_profiler.records, [])
+        stage_profiler.enable()
+        with stage_profiler.stage('outer', 'a.yaml'):
+            with stage_profiler.stage('inner', 'a.yaml'):
+                pass
+        self.assertEqual(list(stage_profiler.summary()), ['outer', 'inner'])
+        self.assertEqual(stage_profiler.slowest(1)[0]['stage'], 'outer')
+        self.assertIn('a.yaml', stage_profiler.format_report(2))
+        return
+
+    def test_profile_validation(self):
+        trace_path = Path(self.test_dir.name) / 'trace.json'
+        version_dir = get_tool_version_dir('md5sum', '8.x', base_dir=self.test_content_dir)
+        validate_content([str(version_dir), '-p', str(self.test_content_dir), '-q', '--profile-trace', str(trace_path)])
+        self.assertFalse(profiler.enabled)
+        with trace_path.open('r') as trace_file:
+            trace = json.load(trace_file)
+        for stage in ('metadata', 'cwl', 'cwl.resolve_and_validate_document', 'metadata.yaml'):
+            self.assertIn(stage, trace['stages'])
+        self.assertEqual(len(trace['traceEvents']), sum(totals['count'] for totals in trace['stages'].values()))
+        return
+
+    def test_profile_map(self):
+        trace_path = Path(self.test_dir.name) / 'trace.json'
+        map_path = Path(self.test_dir.name) / 'map.yaml'
+        version_dir = get_tool_version_dir('md5sum', '8.x', base_dir=self.test_content_dir)
+        make_content_map([str(version_dir), str(map_path), '-p', str(self.test_content_dir), '--profile-trace', str(trace_path)])
+        with trace_path.open('r') as trace_file:
+            trace = json.load(trace_file)
+        self.assertEqual(trace['stages']['map.subtool']['count'], 2)
+        return
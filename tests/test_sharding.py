@@ -0,0 +1,49 @@
+import argparse
+import json
+from pathlib import Path
+from tests.test_base import TestBase
+from capanno_utils.content_maps import make_master_map_dict
+from capanno_utils.helpers.sharding import parse_shard, partition_identifiers, load_durations
+from capanno_utils.validate_content import main as validate_content
+
+
+class TestSharding(TestBase):
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard('2/4'), (2, 4))
+        for shard in ('0/4', '5/4', '2', 'a/b'):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                parse_shard(shard)
+        return
+
+    def test_partition_identifiers(self):
+        durations = {'gatk': 10, 'bwa': 6, 'cat': 5, 'sort': 4, 'wc': 1}
+        shards = partition_identifiers(durations, 2, durations)
+        self.assertEqual(shards, [['gatk', 'sort'], ['bwa', 'cat', 'wc']])
+        self.assertEqual(partition_identifiers(reversed(list(durations)), 2, durations), shards)  # Independent of map order.
+
+        shards = partition_identifiers(['a', 'b', 'c', 'd', 'e'], 3)  # Equal durations without timings.
+        self.assertEqual([len(shard) for shard in shards], [2, 2, 1])
+        self.assertEqual(sorted(sum(shards, [])), ['a', 'b', 'c', 'd', 'e'])
+        return
+
+    def test_validate_and_merge_shards(self):
+        report_paths = [Path(self.test_dir.name) / f"shard_{shard_index}.json" for shard_index in (1, 2)]
+        for shard_index, report_path in enumerate(report_paths, start=1):
+            validate_content(['-p', str(self.test_content_dir), '-q', '--shard', f"{shard_index}/2", '--report-json',
+                              str(report_path)])
+        shard_identifiers = []
+        for report_path in report_paths:
+            with report_path.open('r') as report_file:
+                report_dict = json.load(report_file)
+            shard_identifiers.append({item['identifier'] for item in report_dict['items']})
+        self.assertFalse(shard_identifiers[0] & shard_identifiers[1])
+        self.assertEqual(shard_identifiers[0] | shard_identifiers[1], set(make_master_map_dict(base_dir=self.test_content_dir)))
+
+        merged_path = Path(self.test_dir.name) / 'merged.json'
+        validate_content(['-q', '--merge-reports', *map(str, report_paths), '--report-json', str(merged_path)])
+        with merged_path.open('r') as merged_file:
+            merged_dict = json.load(merged_file)
+        self.assertEqual(merged_dict['summary']['items'], len(shard_identifiers[0]) + len(shard_identifiers[1]))
+        self.assertEqual(set(load_durations([merged_path])), shard_identifiers[0] | shard_identifiers[1])
+        return
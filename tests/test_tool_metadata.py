@@ -7,6 +7,7 @@ from ruamel.yaml import safe_load
 from tests.test_base import TestBase, test_constants
 from capanno_utils.repo_config import config
 from capanno_utils.helpers.get_paths import get_tool_metadata
+from capanno_utils.helpers.parent_metadata_cache import use_parent_metadata_cache
 from capanno_utils.classes.metadata.tool_metadata import ParentToolMetadata, SubtoolMetadata
 from capanno_utils.add.add_tools import add_tool, add_subtool
 
@@ -40,6 +41,25 @@ class TestMakeSubtoolMetadata(TestBase):
         st_metadata = SubtoolMetadata(name=TestMakeSubtoolMetadata.test_dict['name'], _parentMetadata=p_metadata)
         self.assertTrue(st_metadata.name == TestMakeSubtoolMetadata.test_dict['name'])
 
+    def test_parent_metadata_cache(self):
+        version_dir = Path(self.test_dir.name) / 'tools' / 'samtools' / '1.x'
+        shutil.copytree(self.test_content_dir / 'tools' / 'samtools' / '1.x', version_dir,
+                        ignore=shutil.ignore_patterns('instances'))
+        metadata_paths = sorted(version_dir.glob('samtools_*/samtools-*-metadata.yaml'))
+        with use_parent_metadata_cache() as parent_metadata_cache:
+            parents = {id(SubtoolMetadata.load_from_file(metadata_path, check_index=False)._parentMetadata) for
+                       metadata_path in metadata_paths}
+            self.assertEqual(len(parents), 1)
+            self.assertEqual((parent_metadata_cache.hits, parent_metadata_cache.misses), (len(metadata_paths) - 1, 1))
+
+            parent_metadata_path = version_dir / 'common' / 'common-metadata.yaml'
+            parent_metadata_path.write_text(parent_metadata_path.read_text().replace('name: samtools', 'name: samtools2'))
+            parent_metadata = SubtoolMetadata.load_from_file(metadata_paths[0], check_index=False)._parentMetadata
+            self.assertEqual(parent_metadata.name, 'samtools2')  # Loaded again after the file changed.
+        subtool_metadata = SubtoolMetadata.load_from_file(metadata_paths[0], check_index=False)
+        self.assertIsNot(subtool_metadata._parentMetadata, parent_metadata)  # Not cached outside of the block.
+        return
+
     def test_make_file(self):
         with TemporaryDirectory(prefix="xD_test") as tmpdir:
             self.make_empty_tools_index(tmpdir)
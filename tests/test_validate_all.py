@@ -11,6 +11,10 @@ class TestValidateDirectories(TestBase):
         validate_tools_dir(base_dir=config[os.environ['CONFIG_KEY']]['base_path'])
         return
 
+    def test_validate_tools_dir_parallel(self):
+        validate_tools_dir(base_dir=config[os.environ['CONFIG_KEY']]['base_path'], jobs=2)
+        return
+
     def test_validate_scripts_dir(self):
             validate_scripts_dir(base_dir=config[os.environ['CONFIG_KEY']]['base_path'])
             return
@@ -0,0 +1,45 @@
+from pathlib import Path
+from tests.test_base import TestBase
+from capanno_utils.helpers.get_paths import get_tool_metadata, get_tool_sources
+from capanno_utils.helpers.git_tools import get_changed_paths
+from capanno_utils.validate import make_changed_content_maps
+from capanno_utils.validate_content import main as validate_content
+
+
+class TestValidateChanged(TestBase):
+
+    def test_changed_subtool_maps(self):
+        content_repo = self.make_temp_content_repo(git=True)
+        cwl_path = get_tool_sources('cat', '8.x', base_dir=content_repo)['cwl']
+        with cwl_path.open('a') as cwl_file:
+            cwl_file.write('\n# changed\n')
+        (content_repo / 'notes.txt').write_text('Not content.\n')
+
+        changed_paths = get_changed_paths('HEAD', content_repo)
+        self.assertEqual(changed_paths, [Path('notes.txt'), cwl_path.relative_to(content_repo)])
+        tool_map, script_map, workflow_map = make_changed_content_maps(changed_paths, base_dir=content_repo)
+        self.assertEqual(set(tool_map), {'TL_d077f2.47', 'TL_d077f2_54.47'})  # cat and its parent.
+        self.assertEqual(list(script_map), ['ST_cff563.f7'])  # encode_bowtie2 lists cat in its tools.
+        self.assertEqual(list(workflow_map), ['WF_1f4d8f.cb'])  # cat_sort calls cat.
+        return
+
+    def test_changed_common_metadata_maps(self):
+        content_repo = self.make_temp_content_repo(git=True)
+        common_metadata_path = get_tool_metadata('md5sum', '8.x', parent=True, base_dir=content_repo)
+        with common_metadata_path.open('a') as metadata_file:
+            metadata_file.write('\n# changed\n')
+        tool_map, script_map, workflow_map = make_changed_content_maps(get_changed_paths('HEAD', content_repo),
+                                                                       base_dir=content_repo)
+        self.assertEqual(set(tool_map), {'TL_c8f1ee.47', 'TL_c8f1ee_d4.47', 'TL_c8f1ee_0b.47'})
+        self.assertEqual((script_map, workflow_map), ({}, {}))
+        return
+
+    def test_validate_since(self):
+        content_repo = self.make_temp_content_repo(git=True)
+        validate_content(['-p', str(content_repo), '-q', '--since', 'HEAD'])  # Nothing changed.
+        metadata_path = get_tool_metadata('STAR', '2.7.x', subtool_name='alignReads', base_dir=content_repo)
+        with metadata_path.open('a') as metadata_file:
+            metadata_file.write('\n# changed\n')
+        validate_content(['-p', str(content_repo), '-q', '--since', 'HEAD'])
+        validate_content([str(content_repo / 'tools' / 'STAR'), '-p', str(content_repo), '-q', '--since', 'HEAD'])
+        return
@@ -1,3 +1,5 @@
+import json
+from pathlib import Path
 from unittest import skip
 from tests.test_base import TestBase
 from capanno_utils.repo_config import config
@@ -22,6 +24,13 @@ class TestValidateTools(TestBase):
         validate_content([str(tool_version_dir), '-p', str(self.test_content_dir), '-q'])
         return
 
+    def test_validate_tool_version_dir_parallel(self):
+        tool_name = 'samtools'
+        version_name = '1.x'
+        tool_version_dir = get_tool_version_dir(tool_name, version_name, base_dir=self.test_content_dir)
+        validate_content([str(tool_version_dir), '-p', str(self.test_content_dir), '-q', '--jobs', '4'])
+        return
+
     def test_validate_subtool_dir(self):
         tool_name = 'md5sum'
         version_name = '8.x'
@@ -89,6 +98,11 @@ class TestValidateScripts(TestBase):
         validate_content([str(script_dir), '-p', str(self.test_content_dir), '-q'])
         return
 
+    def test_validate_tool_instance_metadata(self):
+        instances_dir = get_tool_instances_dir('samtools', '1.x', subtool_name='view', base_dir=self.test_content_dir)
+        validate_content([str(instances_dir / '3a64-metadata.yaml'), '-p', str(self.test_content_dir), '-q'])
+        return
+
     def test_validate_script_instance_dir(self):
         group_name = 'ENCODE-DCC'
         project_name = 'atac-seq-pipeline'
@@ -98,3 +112,49 @@ class TestValidateScripts(TestBase):
                                                       base_dir=self.test_content_dir)
         validate_content([str(script_instance_dir), '-p', str(self.test_content_dir), '-q'])
         return
+
+# @skip('')
+class TestValidateWorkflows(TestBase):
+
+    def test_validate_workflow_instance(self):
+        group_name = 'example_workflows'
+        project_name = 'cat_sort'
+        version_name = 'master'
+        instance_path = get_workflow_instance_path(group_name, project_name, version_name, 'ecd8',
+                                                   base_dir=self.test_content_dir)
+        validate_content([str(instance_path), '-p', str(self.test_content_dir), '-q'])
+        return
+
+    def test_validate_workflow_instance_dir(self):
+        group_name = 'example_workflows'
+        project_name = 'cat_sort'
+        version_name = 'master'
+        instances_dir = get_workflow_instances_dir(group_name, project_name, version_name, base_dir=self.test_content_dir)
+        validate_content([str(instances_dir), '-p', str(self.test_content_dir), '-q'])
+        return
+
+    def test_validate_workflows_dir_inputs(self):
+        report_path = Path(self.test_dir.name) / 'report.json'
+        workflows_dir = get_workflows_root_dir(base_dir=self.test_content_dir)
+        return_code = validate_content([str(workflows_dir), '-p', str(self.test_content_dir), '-q', '--report-json',
+                                        str(report_path)])
+        self.assertEqual(return_code, 0)
+        with report_path.open('r') as report_file:
+            items = json.load(report_file)['items']
+        self.assertTrue(all('inputs' in item['stages'] for item in items))
+        return
+
+    def test_validate_workflow_file_from_metadata(self):
+        content_repo = self.make_temp_content_repo('workflows')
+        metadata_path = get_workflow_metadata('example_workflows', 'cat_sort', 'master', base_dir=content_repo)
+        cwl_path = metadata_path.parent / 'cat_sort.cwl'
+        cwl_path.rename(metadata_path.parent / 'renamed.cwl')
+        metadata_path.write_text('workflowFile: renamed.cwl\n' + metadata_path.read_text())
+        instances_dir = get_workflow_instances_dir('example_workflows', 'cat_sort', 'master', base_dir=content_repo)
+        validate_content([str(instances_dir), '-p', str(content_repo), '-q'])
+        validate_content([str(instances_dir / 'ecd8.yaml'), '-p', str(content_repo), '-q'])
+        self.assertEqual(validate_content([str(content_repo / 'workflows'), '-p', str(content_repo), '-q', '-k']), 0)
+
+        with self.assertRaises(SystemExit):
+            validate_content([str(instances_dir / 'ecd8-metadata.yaml'), '-p', str(content_repo), '-q'])
+        return
@@ -0,0 +1,103 @@
+from pathlib import Path
+from schema_salad.exceptions import ValidationException
+from tests.test_base import TestBase
+from capanno_utils.helpers.get_paths import get_tool_sources
+from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+from capanno_utils.helpers.profiling import profiler
+from capanno_utils.helpers.validate_cwl import CwlDocument, CwlValidationSession, validate_cwl_doc
+from capanno_utils.validate_inputs import validate_all_inputs_for_tool
+
+shared_types = """\
+- name: Sample
+  type: record
+  fields:
+    - name: reads
+      type: File
+"""
+
+tool_template = """\
+cwlVersion: v1.0
+class: CommandLineTool
+baseCommand: {base_command}
+requirements:
+  SchemaDefRequirement:
+    types:
+      - $import: types.yaml
+inputs:
+  sample:
+    type: types.yaml#Sample
+outputs: []
+"""
+
+
+class TestValidateCwl(TestBase):
+
+    def make_shared_import_tools(self):
+        tools_dir = Path(self.test_dir.name)
+        (tools_dir / 'types.yaml').write_text(shared_types)
+        tool_paths = []
+        for base_command in ('cat', 'sort', 'wc'):
+            tool_path = tools_dir / f"{base_command}.cwl"
+            tool_path.write_text(tool_template.format(base_command=base_command))
+            tool_paths.append(tool_path)
+        return tool_paths
+
+    def test_validate_repo_tools_in_session(self):
+        session = CwlValidationSession()
+        cwl_paths = [get_tool_sources(tool_name, '8.x', subtool_name, base_dir=self.test_content_dir)['cwl'] for
+                     tool_name, subtool_name in (('cat', None), ('sort', None), ('md5sum', 'check'))]
+        for cwl_path in cwl_paths + cwl_paths:  # Validating a document again re-reads it.
+            session.validate(cwl_path)
+        self.assertEqual(len(session.document_uris), 3)
+        return
+
+    def test_validate_shared_imports(self):
+        tool_paths = self.make_shared_import_tools()
+        session = CwlValidationSession(max_documents=2)
+        for tool_path in tool_paths:
+            validate_cwl_doc(tool_path, session=session)
+        self.assertEqual([Path(uri).name for uri in session.document_uris], ['sort.cwl', 'wc.cwl'])
+        index_keys = set(session.loading_context.loader.idx)
+        self.assertFalse(any(key.endswith('/cat.cwl') for key in index_keys))
+        session.validate(tool_paths[2])  # Still valid after the document that first imported types.yaml was evicted.
+        return
+
+    def test_validate_changed_import(self):
+        tool_paths = self.make_shared_import_tools()
+        session = CwlValidationSession()
+        for tool_path in tool_paths:
+            session.validate(tool_path)
+        (tool_paths[0].parent / 'types.yaml').write_text(shared_types.replace('type: File', 'type: NotAType'))
+        session.validate(tool_paths[1])  # Files aren't checked for changes until evict_changed_files is called.
+        session.evict_changed_files()
+        self.assertNotIn(tool_paths[0].as_uri(), session.document_uris)  # The tool that read types.yaml is evicted.
+        with self.assertRaises(ValidationException):
+            session.validate(tool_paths[1])
+        session.clear()
+        self.assertEqual(session.document_uris, [])
+        return
+
+    def test_cwl_document_parsed_once(self):
+        cwl_path = get_tool_sources('sort', '8.x', base_dir=self.test_content_dir)['cwl']
+        cwl_document = CwlDocument(cwl_path, session=CwlValidationSession())
+        profiler.clear()
+        profiler.enable()
+        try:
+            cwl_document.validate()
+            validate_all_inputs_for_tool(cwl_path, inputs_schema=InputsSchema(cwl_document.tool))
+        finally:
+            profiler.disable()
+        stages = [record['stage'] for record in profiler.pop_records()]
+        self.assertEqual(stages.count('cwl.parse'), 1)
+        self.assertNotIn('inputs.load_document', stages)
+        return
+
+    def test_cwl_document_load_error(self):
+        tool_path = self.make_shared_import_tools()[0]
+        tool_path.write_text(tool_path.read_text().replace('type: types.yaml#Sample', 'type: 5'))
+        cwl_document = CwlDocument(tool_path, session=CwlValidationSession())
+        with self.assertRaises(ValidationException):
+            cwl_document.validate()
+        with self.assertRaises(ValidationException):
+            cwl_document.tool
+        return
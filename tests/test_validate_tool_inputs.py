@@ -1,9 +1,16 @@
 import os
+import shutil
+import tempfile
 import unittest
+from pathlib import Path
+from schema_salad.exceptions import ValidationException
 from tests.test_base import TestBase
+from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
 from capanno_utils.repo_config import config
 from ruamel.yaml import safe_load
-from capanno_utils.validate_inputs import validate_inputs_for_instance
+from capanno_utils.helpers.file_checks import FileChecker
+from capanno_utils.helpers.validation_report import ValidationReport
+from capanno_utils.validate_inputs import validate_inputs_for_instance, validate_instances
 from capanno_utils.helpers.get_paths import get_tool_instance_path, get_tool_sources
 
 class TestValidateInputs(TestBase):
@@ -29,6 +36,86 @@ class TestValidateInputs(TestBase):
         instance_path = get_tool_instance_path(tool_name, tool_version, instance_hash, subtool_name=subtool, base_dir=self.test_content_dir)
         validate_inputs_for_instance(instance_path, tool_sources['cwl'])
         return
+
+    def test_reuse_compiled_inputs_schema(self):
+        tool_sources = get_tool_sources('sort', '8.x', base_dir=self.test_content_dir)
+        instance_path = get_tool_instance_path('sort', '8.x', '2933', base_dir=self.test_content_dir)
+        job_path = Path(self.test_dir.name) / '2933.yaml'
+        shutil.copy(instance_path, job_path)
+        inputs_schema = InputsSchema(tool_sources['cwl'])
+        inputs_schema.validate_inputs(job_path)
+        compiled_schema = inputs_schema.compiled_schema
+        job_path.write_text(job_path.read_text().replace('bufferSize: 60G', 'bufferSize: [60G]'))
+        with self.assertRaises(ValidationException):  # Changed document is read again.
+            inputs_schema.validate_inputs(job_path)
+        shutil.copy(instance_path, job_path)
+        inputs_schema.validate_inputs(job_path)
+        self.assertIs(inputs_schema.compiled_schema, compiled_schema)
+        return
+
+    def test_compile_inputs_schema_without_temp_files(self):
+        tool_sources = get_tool_sources('samtools', '1.x', subtool_name='flagstat', base_dir=self.test_content_dir)
+        instance_path = get_tool_instance_path('samtools', '1.x', '395d', subtool_name='flagstat', base_dir=self.test_content_dir)
+        original_tempdir = tempfile.tempdir
+        tempfile.tempdir = str(Path(self.test_dir.name) / 'does_not_exist')  # Any temp file would fail to be written.
+        try:
+            validate_inputs_for_instance(instance_path, tool_sources['cwl'])
+        finally:
+            tempfile.tempdir = original_tempdir
+        return
+
+    def test_validate_instances(self):
+        tool_sources = get_tool_sources('sort', '8.x', base_dir=self.test_content_dir)
+        instance_path = get_tool_instance_path('sort', '8.x', '2933', base_dir=self.test_content_dir)
+        instance_paths = []
+        for job_name, replacement in (('a.yaml', '60G'), ('b.yaml', '[60G]'), ('c.yaml', '70G'), ('d.yaml', '{size: 60G}')):
+            job_path = Path(self.test_dir.name) / job_name
+            job_path.write_text(instance_path.read_text().replace('60G', replacement))
+            instance_paths.append(job_path)
+        inputs_schema = InputsSchema(tool_sources['cwl'])
+        for jobs, use_processes in ((1, False), (2, False), (2, True)):
+            results = validate_instances(tool_sources['cwl'], instance_paths, inputs_schema=inputs_schema, jobs=jobs,
+                                         use_processes=use_processes)
+            self.assertEqual([result['valid'] for result in results.results], [True, False, True, False])
+            self.assertEqual({failure['exceptionType'] for failure in results.failures}, {'ValidationException'})
+            with self.assertRaises(ValidationException):  # After every instance is validated.
+                results.raise_first_failure()
+        report = ValidationReport()
+        results.add_to_report(report)
+        self.assertEqual(report.summary()['failedItems'], 2)
+        self.assertTrue(validate_instances(tool_sources['cwl'], instance_paths[::2]).passed)
+        return
+
+    def test_validate_instances_check_files(self):
+        tool_sources = get_tool_sources('sort', '8.x', base_dir=self.test_content_dir)
+        jobs_dir = Path(self.test_dir.name)
+        (jobs_dir / 'a.txt').write_text('a\n')
+        job_texts = {'found.yaml': "inputFile: {class: File, path: a.txt, secondaryFiles: [{class: File, location: a.txt}]}\n"
+                                   "temporaryDirectory: {class: Directory, path: ./}\n",
+                     'missing.yaml': "inputFile: {class: File, location: b.txt, secondaryFiles: [{class: File, path: a.txt}]}\n",
+                     'remote.yaml': "inputFile: {class: File, location: 'https://example.com/a.txt'}\n",
+                     'invalid.yaml': "inputFile: {class: File, location: c.txt}\nnotAnInput: 1\n"}
+        instance_paths = []
+        for job_name, job_text in job_texts.items():
+            instance_paths.append(jobs_dir / job_name)
+            instance_paths[-1].write_text(job_text + "outputFile: sorted.txt\n")
+        remote_checks = []
+
+        def check_remote(locations):
+            remote_checks.append(locations)
+            return {location: False for location in locations}
+
+        results = validate_instances(tool_sources['cwl'], instance_paths, check_files=True,
+                                     file_checker=FileChecker({'https': check_remote}))
+        self.assertEqual([result['valid'] for result in results.results], [True, False, False, False])
+        self.assertEqual([result['missingFiles'] for result in results.results],
+                         [[], [str(jobs_dir / 'b.txt')], ['https://example.com/a.txt'], [str(jobs_dir / 'c.txt')]])
+        self.assertEqual(results.results[3]['exceptionType'], 'ValidationException')  # Validation errors come first.
+        self.assertEqual(remote_checks, [['https://example.com/a.txt']])
+        with self.assertRaises(FileNotFoundError):
+            results.raise_first_failure()
+        self.assertTrue(validate_instances(tool_sources['cwl'], instance_paths[2:3], check_files=True).passed)  # https isn't checked by default.
+        return
     #
     # # @unittest.skip('')
     # def test_validate_all_tool_inputs(self):
@@ -0,0 +1,117 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+from tests.test_base import TestBase
+from capanno_utils.classes.schema_salad.schema_salad import InputsSchema
+from capanno_utils.helpers.get_paths import get_tool_metadata, get_tool_sources
+from capanno_utils.helpers.inputs_schema_cache import InputsSchemaCache
+from capanno_utils.helpers import validation_cache
+from capanno_utils.helpers.validation_cache import ValidationCache, get_package_version, get_package_versions, \
+    get_source_hash
+from capanno_utils.validate_inputs import validate_all_inputs_for_tool
+from capanno_utils.validate import validate_tool_version_dir
+
+
+class TestValidationCache(TestBase):
+
+    def test_validate_with_cache(self):
+        cache_path = Path(self.test_dir.name) / 'validation_cache.json'
+        inputs_schema_cache_dir = Path(self.test_dir.name) / 'inputs_schemas'
+        cache = ValidationCache(self.test_content_dir, cache_path=cache_path, inputs_schema_cache_dir=inputs_schema_cache_dir)
+        validate_tool_version_dir('md5sum', '8.x', base_dir=self.test_content_dir, cache=cache)
+        assert cache_path.exists()
+        self.assertEqual(len(list(inputs_schema_cache_dir.glob('*.json'))), 2)  # md5sum check and md5sum.
+
+        reloaded_cache = ValidationCache(self.test_content_dir, cache_path=cache_path, inputs_schema_cache_dir=inputs_schema_cache_dir)
+        metadata_path = get_tool_metadata('md5sum', '8.x', subtool_name='check', base_dir=self.test_content_dir)
+        parent_metadata_path = get_tool_metadata('md5sum', '8.x', parent=True, base_dir=self.test_content_dir)
+        self.assertTrue(reloaded_cache.is_valid('metadata', metadata_path, (parent_metadata_path,)))
+        self.assertTrue(reloaded_cache.is_valid('metadata', parent_metadata_path))
+        cwl_path = get_tool_sources('md5sum', '8.x', subtool_name='check', base_dir=self.test_content_dir)['cwl']
+        self.assertTrue(reloaded_cache.is_valid('cwl', cwl_path))
+        validate_tool_version_dir('md5sum', '8.x', base_dir=self.test_content_dir, cache=reloaded_cache)
+        return
+
+    def test_changed_file_is_not_valid(self):
+        test_dir = Path(self.test_dir.name)
+        cache = ValidationCache(test_dir)
+        content_file = test_dir / 'content.yaml'
+        dependency_file = test_dir / 'dependency.yaml'
+        content_file.write_text('name: test\n')
+        dependency_file.write_text('name: parent\n')
+        cache.mark_valid('metadata', content_file, (dependency_file,))
+        self.assertTrue(cache.is_valid('metadata', content_file, (dependency_file,)))
+        self.assertFalse(cache.is_valid('cwl', content_file))
+
+        dependency_file.write_text('name: changed parent\n')
+        self.assertFalse(cache.is_valid('metadata', content_file, (dependency_file,)))
+        cache.mark_valid('metadata', content_file, (dependency_file,))
+        content_file.unlink()
+        self.assertFalse(cache.is_valid('metadata', content_file, (dependency_file,)))
+        return
+
+    def test_package_versions_without_importlib_metadata(self):
+        get_package_version.cache_clear()
+        with patch.object(validation_cache, 'importlib_metadata', None):
+            versions = get_package_versions(('cwltool', 'schema-salad', 'miniwdl'))
+            with self.assertLogs(level='WARNING'):
+                self.assertEqual(get_package_version('not-a-capanno-package'), 'unknown')
+        get_package_version.cache_clear()
+        self.assertEqual(versions, get_package_versions(('cwltool', 'schema-salad', 'miniwdl')))
+        self.assertNotIn('unknown', versions.values())
+        return
+
+    def test_source_hash_in_version(self):
+        self.assertNotIn('unknown', get_package_versions()['capanno_utils'])
+        package_dir = Path(self.test_dir.name) / 'package'
+        (package_dir / '__pycache__').mkdir(parents=True)
+        source_path = package_dir / 'module.py'
+        source_path.write_text('value = 1\n')
+        source_hash = get_source_hash(package_dir)
+        (package_dir / '__pycache__' / 'module.cpython.pyc').write_bytes(b'compiled')
+        self.assertEqual(get_source_hash(package_dir), source_hash)
+        source_path.write_text('value = 2\n')
+        self.assertNotEqual(get_source_hash(package_dir), source_hash)
+        return
+
+    def test_inputs_schema_cache(self):
+        cache_dir = Path(self.test_dir.name) / 'inputs_schemas'
+        cwl_path = get_tool_sources('md5sum', '8.x', subtool_name='check', base_dir=self.test_content_dir)['cwl']
+        inputs_schema = InputsSchemaCache(cache_dir).get_inputs_schema(cwl_path)
+        self.assertEqual(len(list(cache_dir.glob('*.json'))), 1)
+
+        def load_tool():
+            raise AssertionError("Tool should not be loaded for a cached schema.")
+
+        cached_schema = InputsSchemaCache(cache_dir).get_inputs_schema(cwl_path, load_tool=load_tool)
+        self.assertEqual(cached_schema.inputs_fields, inputs_schema.inputs_fields)
+        validate_all_inputs_for_tool(cwl_path, inputs_schema=cached_schema)
+        cached_schema.compiled_schema  # The schema-salad schema is made from the cached fields too.
+        self.assertEqual(cached_schema.make_template(), inputs_schema.make_template())  # Loads the tool.
+        with self.assertRaises(ValueError):
+            InputsSchema.from_inputs_fields(inputs_schema.inputs_fields).make_template()
+        return
+
+    def test_inputs_schema_cache_keys_and_eviction(self):
+        test_dir = Path(self.test_dir.name)
+        inputs_schema_cache = InputsSchemaCache(test_dir / 'inputs_schemas', max_bytes=100)
+        cwl_path = get_tool_sources('md5sum', '8.x', subtool_name='check', base_dir=self.test_content_dir)['cwl']
+        changed_cwl_path = test_dir / 'check.cwl'
+        changed_cwl_path.write_text(cwl_path.read_text() + '\n# Changed\n')
+        self.assertNotEqual(inputs_schema_cache.get_key(cwl_path), inputs_schema_cache.get_key(changed_cwl_path))
+        copied_cwl_path = test_dir / 'copy' / cwl_path.name
+        copied_cwl_path.parent.mkdir()
+        copied_cwl_path.write_bytes(cwl_path.read_bytes())
+        self.assertNotEqual(inputs_schema_cache.get_key(cwl_path), inputs_schema_cache.get_key(copied_cwl_path))
+        importing_cwl_path = test_dir / 'importing.cwl'
+        importing_cwl_path.write_text(cwl_path.read_text() + '\n$namespaces:\n  $import: namespaces.yaml\n')
+        self.assertIsNone(inputs_schema_cache.get_key(importing_cwl_path))
+
+        for key in ('a', 'b', 'c'):
+            inputs_schema_cache.put_inputs_fields(key, {'input': {'type': 'string'}})  # About 45 bytes each.
+        self.assertIsNotNone(inputs_schema_cache.get_inputs_fields('a'))  # Not evicted until evict is called.
+        os.utime(inputs_schema_cache._entry_path('a'), ns=(0, 0))  # Least recently used.
+        inputs_schema_cache.evict()
+        self.assertIsNone(inputs_schema_cache.get_inputs_fields('a'))
+        self.assertIsNotNone(inputs_schema_cache.get_inputs_fields('c'))
+        return
@@ -0,0 +1,66 @@
+import json
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from tests.test_base import TestBase
+from capanno_utils.helpers.get_paths import get_tool_sources
+from capanno_utils.helpers.validation_report import ValidationReport
+from capanno_utils.validate import validate_tool_version_dir
+from capanno_utils.validate_content import main as validate_content
+
+
+class TestValidationReport(TestBase):
+
+    def make_invalid_md5sum_repo(self):
+        content_repo = self.make_temp_content_repo('tools/md5sum')
+        for subtool_name in (None, 'check'):
+            cwl_path = get_tool_sources('md5sum', '8.x', subtool_name=subtool_name, base_dir=content_repo)['cwl']
+            cwl_path.write_text(cwl_path.read_text().replace('class: CommandLineTool', 'class: NotATool'))
+        return content_repo
+
+    def test_report_collects_all_failures(self):
+        content_repo = self.make_invalid_md5sum_repo()
+        report = ValidationReport()
+        validate_tool_version_dir('md5sum', '8.x', base_dir=content_repo, report=report)
+        self.assertFalse(report.passed)
+        self.assertEqual(len(report.items), 3)
+        failed_identifiers = {failure['identifier'] for failure in report.failures if failure['stage'] == 'cwl'}
+        self.assertEqual(failed_identifiers, {'TL_c8f1ee_d4.47', 'TL_c8f1ee_0b.47'})
+        with self.assertRaises(Exception):
+            validate_tool_version_dir('md5sum', '8.x', base_dir=content_repo)
+        return
+
+    def test_write_reports(self):
+        content_repo = self.make_invalid_md5sum_repo()
+        json_path = Path(self.test_dir.name) / 'report.json'
+        junit_path = Path(self.test_dir.name) / 'report.xml'
+        exit_code = validate_content([str(content_repo / 'tools' / 'md5sum'), '-p', str(content_repo), '-q',
+                                      '--report-json', str(json_path), '--junit-xml', str(junit_path)])
+        self.assertEqual(exit_code, 1)
+        with json_path.open('r') as json_file:
+            report_dict = json.load(json_file)
+        self.assertEqual(report_dict['summary']['items'], 3)
+        self.assertEqual(report_dict['summary']['failedItems'], 2)
+        for item in report_dict['items']:
+            self.assertIn('wallTime', item)
+        testsuites = ET.parse(str(junit_path)).getroot()
+        self.assertEqual(testsuites.get('tests'), '3')
+        self.assertEqual(len(testsuites.findall('./testsuite/testcase')), 3)
+        self.assertTrue(testsuites.findall('./testsuite/testcase/failure'))
+
+        exit_code = validate_content([str(self.test_content_dir / 'tools' / 'md5sum'), '-p', str(self.test_content_dir),
+                                      '-q', '--keep-going'])
+        self.assertEqual(exit_code, 0)
+        return
+
+    def test_report_single_file(self):
+        content_repo = self.make_invalid_md5sum_repo()
+        junit_path = Path(self.test_dir.name) / 'report.xml'
+        cwl_path = get_tool_sources('md5sum', '8.x', subtool_name='check', base_dir=content_repo)['cwl']
+        exit_code = validate_content([str(cwl_path), '-p', str(content_repo), '-q', '--junit-xml', str(junit_path)])
+        self.assertEqual(exit_code, 1)
+        testcases = ET.parse(str(junit_path)).getroot().findall('./testsuite/testcase')
+        self.assertEqual(len(testcases), 1)
+        self.assertIsNotNone(testcases[0].find('failure'))
+        with self.assertRaises(Exception):
+            validate_content([str(cwl_path), '-p', str(content_repo), '-q'])
+        return
@@ -0,0 +1,39 @@
+import stat
+import time
+from pathlib import Path
+from threading import Thread
+from tests.test_base import TestBase
+from capanno_utils.helpers.get_paths import get_tool_dir
+from capanno_utils.validation_server import serve, request_validation, client_main
+
+
+class TestValidationServer(TestBase):
+
+    def test_serve_requests(self):
+        socket_path = Path(self.test_dir.name) / 'validate.sock'
+        server_thread = Thread(target=serve, args=(socket_path,), kwargs={'quiet': True})
+        server_thread.start()
+        try:
+            for _ in range(600):
+                if socket_path.exists():
+                    break
+                time.sleep(0.1)
+            subtool_dir = get_tool_dir('md5sum', '8.x', 'check', base_dir=self.test_content_dir)
+            response = request_validation([str(subtool_dir), '-p', str(self.test_content_dir)], socket_path)
+            self.assertEqual(response['exitCode'], 0, response['error'])
+            self.assertIn('is valid', response['output'])
+            self.assertEqual(stat.S_IMODE(socket_path.stat().st_mode), 0o600)
+
+            relative_subtool_dir = subtool_dir.relative_to(self.test_content_dir)
+            response = request_validation([str(relative_subtool_dir)], socket_path, cwd=self.test_content_dir)
+            self.assertEqual(response['exitCode'], 0, response['error'])
+            self.assertIn(str(subtool_dir), response['output'])
+
+            response = request_validation([str(self.test_content_dir / 'not_content'), '-p', str(self.test_content_dir)],
+                                          socket_path)
+            self.assertNotEqual(response['exitCode'], 0)
+        finally:
+            self.assertEqual(client_main(['--socket', str(socket_path), '--stop']), 0)
+            server_thread.join(timeout=60)
+        self.assertFalse(socket_path.exists())
+        return
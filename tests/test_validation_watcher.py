@@ -0,0 +1,76 @@
+from unittest import skipUnless
+from tests.test_base import TestBase
+from capanno_utils.helpers.get_paths import get_tool_metadata, get_tool_sources, get_tool_instances_dir
+from capanno_utils.helpers.file_events import inotify_available
+from capanno_utils.validation_watcher import ContentWatcher
+
+
+class TestValidationWatcher(TestBase):
+
+    def append_comment(self, file_path):
+        with file_path.open('a') as file:
+            file.write('\n# changed\n')
+        return
+
+    def check_validate_changes(self, use_inotify):
+        content_repo = self.make_temp_content_repo('tools/sort')
+        watcher = ContentWatcher(content_repo, use_inotify=use_inotify)
+        self.addCleanup(watcher.close)
+        self.assertEqual(watcher.watch_paths, [(content_repo / 'tools').resolve()])
+        self.assertEqual(watcher.poll_changes(), [])
+
+        cwl_path = get_tool_sources('sort', '8.x', base_dir=content_repo)['cwl'].resolve()
+        self.append_comment(cwl_path)
+        self.assertEqual(watcher.poll_changes(), [cwl_path])
+        validated, failures = watcher.validate_changes([cwl_path])
+        self.assertEqual(validated, [('cwl', cwl_path), ('inputs', cwl_path)])
+        self.assertEqual(failures, [])
+
+        instance_path = next(get_tool_instances_dir('sort', '8.x', base_dir=content_repo).glob('????.yaml')).resolve()
+        inputs_schema = watcher.get_inputs_schema(cwl_path)
+        validated, failures = watcher.validate_changes([instance_path])
+        self.assertEqual((validated, failures), ([('inputs', instance_path)], []))
+        self.assertIs(watcher.get_inputs_schema(cwl_path), inputs_schema)  # cwl file didn't change.
+
+        metadata_path = get_tool_metadata('sort', '8.x', base_dir=content_repo).resolve()
+        parent_metadata_path = get_tool_metadata('sort', '8.x', parent=True, base_dir=content_repo).resolve()
+        self.append_comment(metadata_path)
+        validated, failures = watcher.validate_changes(watcher.poll_changes())
+        self.assertEqual((validated, failures), ([('metadata', metadata_path)], []))
+        parent_metadata = watcher.get_parent_metadata(parent_metadata_path)
+        watcher.validate_changes([metadata_path])
+        self.assertIs(watcher.get_parent_metadata(parent_metadata_path), parent_metadata)
+
+        self.append_comment(parent_metadata_path)
+        validated, failures = watcher.validate_changes(watcher.poll_changes())
+        self.assertEqual(validated, [('metadata', parent_metadata_path), ('metadata', metadata_path)])  # The subtool inherits from the parent.
+        self.assertEqual(failures, [])
+
+        cwl_path.write_text(cwl_path.read_text().replace('class: CommandLineTool', 'class: NotATool'))
+        validated, failures = watcher.validate_changes(watcher.poll_changes())
+        self.assertEqual({failure['stage'] for failure in failures}, {'cwl', 'inputs'})
+        return
+
+    def test_validate_changes(self):
+        self.check_validate_changes(use_inotify=False)
+        return
+
+    @skipUnless(inotify_available(), "inotify is only available on Linux.")
+    def test_validate_changes_with_inotify(self):
+        self.check_validate_changes(use_inotify=True)
+        return
+
+    @skipUnless(inotify_available(), "inotify is only available on Linux.")
+    def test_inotify_watches_new_directories(self):
+        content_repo = self.make_temp_content_repo('tools/sort')
+        watcher = ContentWatcher(content_repo, use_inotify=True)
+        self.addCleanup(watcher.close)
+        metadata_path = get_tool_metadata('sort', '8.x', base_dir=content_repo).resolve()
+        new_dir = metadata_path.parents[1] / 'sort_new'
+        new_dir.mkdir()
+        new_metadata_path = new_dir / 'sort-new-metadata.yaml'
+        new_metadata_path.write_text(metadata_path.read_text())
+        self.assertEqual(watcher.poll_changes(), [new_metadata_path])
+        self.append_comment(new_metadata_path)
+        self.assertEqual(watcher.poll_changes(), [new_metadata_path])
+        return